@@ -10,10 +10,16 @@ __author__ = "ClipSage Team"
 __email__ = "contact@clipsage.org"
 __description__ = "Advanced Clipboard Manager with Semantic Search"
 
-# Public API exports
-from .core.semantic_search import ClipboardSemanticSearch
+# Public API exports; the search engine is only imported when used
 from .core.config import Config
 
+
+def __getattr__(name):
+    if name == "ClipboardSemanticSearch":
+        from .core.semantic_search import ClipboardSemanticSearch
+        return ClipboardSemanticSearch
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "ClipboardSemanticSearch",
     "Config",
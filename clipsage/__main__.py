@@ -0,0 +1,176 @@
+"""
+ClipSage main application entry point
+
+Installed as the ``clipsage`` and ``clipsage-gui`` commands and run by
+``python -m clipsage``.
+"""
+
+import sys
+import time
+import argparse
+import importlib
+from contextlib import contextmanager
+
+# Only the configuration is imported up front; Qt, the GUI and the search
+# engine are imported in main() once the arguments are known
+from clipsage.core.config import config
+
+
+class StartupProfile:
+    """Wall-clock breakdown of startup phases for --profile-startup"""
+    
+    # Imported one by one when profiling, to show what each costs; numpy,
+    # PIL and the search engine load on the worker pool after the window
+    HEAVY_IMPORTS = ("PyQt6.QtWidgets",)
+    
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.phases = []
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block"""
+        started = time.perf_counter()
+        yield
+        self.phases.append((name, time.perf_counter() - started))
+    
+    def mark(self, name: str) -> None:
+        """Record a milestone, timed from process start"""
+        self.phases.append((f"@ {name}", time.perf_counter() - self.start))
+    
+    def import_modules(self) -> None:
+        """Import the heavy dependencies separately when profiling"""
+        if self.enabled:
+            for module in self.HEAVY_IMPORTS:
+                with self.phase(f"import {module}"):
+                    importlib.import_module(module)
+    
+    def report(self) -> None:
+        """Print the breakdown"""
+        if not self.enabled:
+            return
+        print("Startup profile (ms; @ = since start, "
+              "use python -X importtime for per-module detail):")
+        for name, seconds in self.phases:
+            print(f"  {name:<36} {seconds * 1000:9.1f}")
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="ClipSage - Advanced Clipboard Manager with Semantic Search",
+        epilog="Without the GUI: clipsage search QUERY [-k N] [--json], "
+               "clipsage list [--since 1h] [--json]"
+    )
+    parser.add_argument(
+        "--config", "-c",
+        type=str,
+        help="Path to configuration file"
+    )
+    parser.add_argument(
+        "--no-backend",
+        action="store_true",
+        help="Don't start the clipboard manager backend"
+    )
+    parser.add_argument(
+        "--debug", "-d",
+        action="store_true",
+        help="Enable debug output"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time and startup phase breakdown"
+    )
+    parser.add_argument(
+        "--version", "-v",
+        action="version",
+        version="ClipSage 1.0.0"
+    )
+    
+    return parser.parse_args()
+
+
+def ensure_backend_running():
+    """Ensure the clipboard manager backend is running"""
+    from clipsage.backend.clipboard_manager import clipboard_manager
+    if not clipboard_manager.is_running():
+        print("Starting clipboard manager backend...")
+        if not clipboard_manager.start():
+            print("Warning: Failed to start clipboard manager backend")
+            print("You may need to start it manually")
+        else:
+            print("Clipboard manager backend started successfully")
+    else:
+        print("Clipboard manager backend is already running")
+
+
+def main():
+    """Main application entry point"""
+    # Headless subcommands never touch Qt
+    from clipsage import cli
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+    
+    args = parse_arguments()
+    profile = StartupProfile(args.profile_startup)
+    
+    # Load custom config if specified
+    if args.config:
+        from clipsage.core.config import Config
+        global config
+        config = Config(args.config)
+    
+    profile.import_modules()
+    with profile.phase("import GUI"):
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+        from clipsage.gui.main_window import ClipboardManagerUI
+    
+    # Create Qt application
+    with profile.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName("ClipSage")
+        app.setApplicationVersion("1.0.0")
+        app.setOrganizationName("ClipSage")
+        app.setOrganizationDomain("clipsage.org")
+    
+    # Start backend if requested
+    if not args.no_backend:
+        with profile.phase("start backend"):
+            ensure_backend_running()
+    
+    # Create and show main window; the index warms up in the background
+    try:
+        with profile.phase("create window"):
+            window = ClipboardManagerUI()
+        window.show()
+        if profile.enabled:
+            QTimer.singleShot(0, lambda: profile.mark("window shown"))
+            
+            def on_history_ready(*_):
+                window.search_service.refreshFinished.disconnect(
+                    on_history_ready
+                )
+                profile.mark("index ready")
+                profile.report()
+            
+            window.search_service.refreshFinished.connect(on_history_ready)
+        
+        # Run the application
+        sys.exit(app.exec())
+        
+    except KeyboardInterrupt:
+        print("\nApplication interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        print(f"Error starting application: {e}")
+        if args.debug:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,10 +3,13 @@ Clipboard manager backend interface
 """
 
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Deque, List, Optional
 
 from ..core.config import config
+from .events import ClipEvent, EventCallback, EventReader, drain
 
 
 class ClipboardManager:
@@ -15,6 +18,10 @@ class ClipboardManager:
     def __init__(self, binary_path: Optional[Path] = None):
         self.binary_path = binary_path or self._find_binary()
         self.process: Optional[subprocess.Popen] = None
+        self.events: Optional[EventReader] = None
+        self.log: Deque[str] = deque(maxlen=50)
+        self._listeners: List[EventCallback] = []
+        self._lock = threading.Lock()
         
     def _find_binary(self) -> Path:
         """Find the clipboard manager binary"""
@@ -64,13 +71,22 @@ class ClipboardManager:
                 print(f"Clipboard manager binary not found: {self.binary_path}")
                 return False
                 
-            # Start the process
+            # Start the process; with --events it reports every saved clip
+            # on stdout, and its log on stderr is drained so a chatty
+            # monitor never blocks on a full pipe
+            command = [str(self.binary_path)]
+            if config.get("monitor.events", True):
+                command.append("--events")
             self.process = subprocess.Popen(
-                [str(self.binary_path)],
+                command,
+                stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 start_new_session=True
             )
+            self.events = EventReader(self.process.stdout, self._dispatch)
+            self.events.start()
+            drain(self.process.stderr, self.log)
             
             print(f"Started clipboard manager (PID: {self.process.pid})")
             return True
@@ -79,6 +95,32 @@ class ClipboardManager:
             print(f"Error starting clipboard manager: {e}")
             return False
     
+    @property
+    def streaming(self) -> bool:
+        """Whether clip events are arriving from a monitor we started"""
+        return self.events is not None and self.events.running
+    
+    def subscribe(self, callback: EventCallback) -> None:
+        """Call callback (on the reader thread) for every new clip"""
+        with self._lock:
+            self._listeners.append(callback)
+    
+    def unsubscribe(self, callback: EventCallback) -> None:
+        """Stop calling a callback registered with subscribe"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+    
+    def _dispatch(self, event: ClipEvent) -> None:
+        """Hand a clip event to every listener"""
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error handling clipboard event: {e}")
+    
     def stop(self) -> bool:
         """Stop the clipboard manager"""
         try:
@@ -89,6 +131,9 @@ class ClipboardManager:
                 except subprocess.TimeoutExpired:
                     self.process.kill()
                 self.process = None
+            if self.events is not None:
+                self.events.join(timeout=2)
+                self.events = None
                 
             # Also kill any other clipboard manager processes
             subprocess.run(["pkill", "-f", "clipboard_manager"], 
@@ -121,6 +166,8 @@ class ClipboardManager:
             status["managed_process"] = True
         else:
             status["managed_process"] = False
+        status["streaming_events"] = self.streaming
+        status["recent_log"] = list(self.log)
             
         return status
 
@@ -0,0 +1,99 @@
+"""
+Event stream from the C++ clipboard monitor
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import IO, Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from ..core.catalog import parse_entry_key
+
+
+class ClipEvent(NamedTuple):
+    """A clip the monitor finished writing"""
+    entry_id: str
+    types: Tuple[str, ...]
+    paths: Dict[str, Path]
+
+
+EventCallback = Callable[[ClipEvent], None]
+
+
+def parse_event(line: bytes) -> Optional[ClipEvent]:
+    """Decode one NDJSON line, None for other events and malformed lines"""
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("event") != "clip":
+        return None
+
+    paths = {kind: Path(path)
+             for kind, path in (data.get("paths") or {}).items()
+             if isinstance(path, str)}
+    entry_id = data.get("entry_id")
+    if not entry_id:
+        # Older monitors may leave it out; every path carries it too
+        entry_id = next((parse_entry_key(path.name)
+                         for path in paths.values()), None)
+    if not entry_id:
+        return None
+    types = tuple(data.get("types") or paths)
+    return ClipEvent(entry_id, types, paths)
+
+
+class EventReader:
+    """Reads the monitor's stdout event stream on a daemon thread
+
+    Each line is one JSON object. Clip events are handed to the callback
+    on the reader thread; the thread ends when the monitor closes its end
+    of the pipe.
+    """
+
+    def __init__(self, stream: IO[bytes], callback: EventCallback):
+        self.stream = stream
+        self.callback = callback
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the reader thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start reading on a daemon thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="clipsage-monitor-events")
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the stream to end"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        for line in iter(self.stream.readline, b""):
+            event = parse_event(line)
+            if event is None:
+                continue
+            try:
+                self.callback(event)
+            except Exception as e:
+                print(f"Error handling clipboard monitor event: {e}")
+
+
+def drain(stream: IO[bytes], tail: Deque[str]) -> threading.Thread:
+    """Keep reading a pipe so the writer never blocks on it
+
+    The last lines are kept in ``tail`` (a bounded deque) for diagnostics.
+    """
+    def run():
+        for line in iter(stream.readline, b""):
+            tail.append(line.decode("utf-8", errors="replace").rstrip())
+
+    thread = threading.Thread(target=run, daemon=True,
+                              name="clipsage-monitor-log")
+    thread.start()
+    return thread
+
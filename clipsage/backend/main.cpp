@@ -10,18 +10,23 @@
 #include <QImageWriter>
 #include <QBuffer>
 #include <QCryptographicHash>
+#include <QJsonArray>
+#include <QJsonDocument>
+#include <QJsonObject>
+#include <cstdio>
 
 class ClipboardManager : public QObject
 {
     Q_OBJECT
 
 public:
-    explicit ClipboardManager(QObject *parent = nullptr)
+    explicit ClipboardManager(bool emitEvents = false, QObject *parent = nullptr)
         : QObject(parent)
         , m_clipboard(QApplication::clipboard())
         , m_lastText("")
         , m_lastHtml("")
         , m_counter(0)
+        , m_emitEvents(emitEvents)
     {
         // Create tmp directory for clipboard data
         QString tmpPath = QStandardPaths::writableLocation(QStandardPaths::TempLocation);
@@ -39,6 +44,14 @@ public:
         qDebug() << "Clipboard manager started. Monitoring clipboard changes...";
         qDebug() << "Saving to:" << m_clipboardDir.absolutePath();
         
+        if (m_emitEvents) {
+            QJsonObject ready;
+            ready["event"] = "ready";
+            ready["dir"] = m_clipboardDir.absolutePath();
+            ready["pid"] = static_cast<qint64>(QCoreApplication::applicationPid());
+            emitEvent(ready);
+        }
+        
         // Save initial clipboard content if any
         onClipboardChanged();
     }
@@ -55,6 +68,7 @@ private slots:
         
         QString timestamp = QDateTime::currentDateTime().toString("yyyy-MM-dd_hh-mm-ss-zzz");
         bool contentSaved = false;
+        QJsonObject paths;
         
         // Handle text data
         if (mimeData->hasText()) {
@@ -63,7 +77,7 @@ private slots:
             // Skip if it's the same as last text to avoid duplicates
             if (text != m_lastText && !text.isEmpty()) {
                 m_counter++;
-                saveTextClip(text, timestamp);
+                addPath(paths, "text", saveTextClip(text, timestamp));
                 m_lastText = text;
                 contentSaved = true;
             }
@@ -77,7 +91,7 @@ private slots:
                 QImage image = qvariant_cast<QImage>(mimeData->imageData());
                 if (!image.isNull()) {
                     m_counter++;
-                    saveImageClip(image, timestamp);
+                    addPath(paths, "image", saveImageClip(image, timestamp));
                     contentSaved = true;
                 }
             }
@@ -87,7 +101,7 @@ private slots:
                 QString html = mimeData->html();
                 if (!html.isEmpty() && html != m_lastHtml) {
                     m_counter++;
-                    saveHtmlClip(html, timestamp);
+                    addPath(paths, "html", saveHtmlClip(html, timestamp));
                     m_lastHtml = html;
                     contentSaved = true;
                 }
@@ -98,7 +112,7 @@ private slots:
                 QList<QUrl> urls = mimeData->urls();
                 if (!urls.isEmpty()) {
                     m_counter++;
-                    saveUrlsClip(urls, timestamp);
+                    addPath(paths, "urls", saveUrlsClip(urls, timestamp));
                     contentSaved = true;
                 }
             }
@@ -106,12 +120,42 @@ private slots:
         
         // Only save formats info if we actually saved some content
         if (contentSaved) {
-            saveFormatsInfo(mimeData, timestamp);
+            addPath(paths, "formats", saveFormatsInfo(mimeData, timestamp));
+            
+            // Files are closed by now, so readers never see partial clips
+            if (m_emitEvents && !paths.isEmpty()) {
+                QJsonObject event;
+                event["event"] = "clip";
+                event["entry_id"] = QString("%1_%2")
+                                    .arg(m_counter, 6, 10, QChar('0'))
+                                    .arg(timestamp);
+                event["counter"] = m_counter;
+                event["timestamp"] = timestamp;
+                event["types"] = QJsonArray::fromStringList(paths.keys());
+                event["paths"] = paths;
+                emitEvent(event);
+            }
         }
     }
 
 private:
-    void saveTextClip(const QString &text, const QString &timestamp)
+    static void addPath(QJsonObject &paths, const QString &type, const QString &path)
+    {
+        if (!path.isEmpty()) {
+            paths[type] = path;
+        }
+    }
+    
+    // One compact JSON object per line on stdout (NDJSON); logs go to stderr
+    static void emitEvent(const QJsonObject &event)
+    {
+        QByteArray line = QJsonDocument(event).toJson(QJsonDocument::Compact);
+        line.append('\n');
+        std::fwrite(line.constData(), 1, line.size(), stdout);
+        std::fflush(stdout);
+    }
+    
+    QString saveTextClip(const QString &text, const QString &timestamp)
     {
         QString filename = QString("clip_%1_%2_text.txt")
                           .arg(m_counter, 6, 10, QChar('0'))
@@ -121,11 +165,15 @@ private:
         if (file.open(QIODevice::WriteOnly | QIODevice::Text)) {
             QTextStream stream(&file);
             stream << text;
+            stream.flush();
+            file.close();
             qDebug() << "Saved text clip:" << filename << "(" << text.length() << "chars)";
+            return file.fileName();
         }
+        return QString();
     }
     
-    void saveImageClip(const QImage &image, const QString &timestamp)
+    QString saveImageClip(const QImage &image, const QString &timestamp)
     {
         QString filename = QString("clip_%1_%2_image.png")
                           .arg(m_counter, 6, 10, QChar('0'))
@@ -135,10 +183,12 @@ private:
         if (image.save(filepath, "PNG")) {
             qDebug() << "Saved image clip:" << filename 
                      << QString("(%1x%2)").arg(image.width()).arg(image.height());
+            return filepath;
         }
+        return QString();
     }
     
-    void saveHtmlClip(const QString &html, const QString &timestamp)
+    QString saveHtmlClip(const QString &html, const QString &timestamp)
     {
         QString filename = QString("clip_%1_%2_html.html")
                           .arg(m_counter, 6, 10, QChar('0'))
@@ -148,11 +198,15 @@ private:
         if (file.open(QIODevice::WriteOnly | QIODevice::Text)) {
             QTextStream stream(&file);
             stream << html;
+            stream.flush();
+            file.close();
             qDebug() << "Saved HTML clip:" << filename << "(" << html.length() << "chars)";
+            return file.fileName();
         }
+        return QString();
     }
     
-    void saveUrlsClip(const QList<QUrl> &urls, const QString &timestamp)
+    QString saveUrlsClip(const QList<QUrl> &urls, const QString &timestamp)
     {
         QString filename = QString("clip_%1_%2_urls.txt")
                           .arg(m_counter, 6, 10, QChar('0'))
@@ -165,11 +219,15 @@ private:
             for (const QUrl &url : urls) {
                 stream << url.toString() << "\n";
             }
+            stream.flush();
+            file.close();
             qDebug() << "Saved URLs clip:" << filename << "(" << urls.size() << "URLs)";
+            return file.fileName();
         }
+        return QString();
     }
     
-    void saveFormatsInfo(const QMimeData *mimeData, const QString &timestamp)
+    QString saveFormatsInfo(const QMimeData *mimeData, const QString &timestamp)
     {
         QString filename = QString("clip_%1_%2_formats.txt")
                           .arg(m_counter, 6, 10, QChar('0'))
@@ -193,7 +251,11 @@ private:
             stream << "Has HTML: " << (mimeData->hasHtml() ? "Yes" : "No") << "\n";
             stream << "Has image: " << (mimeData->hasImage() ? "Yes" : "No") << "\n";
             stream << "Has URLs: " << (mimeData->hasUrls() ? "Yes" : "No") << "\n";
+            stream.flush();
+            file.close();
+            return file.fileName();
         }
+        return QString();
     }
 
 private:
@@ -202,6 +264,7 @@ private:
     QString m_lastText;
     QString m_lastHtml;
     int m_counter;
+    bool m_emitEvents;
 };
 
 int main(int argc, char *argv[])
@@ -218,7 +281,8 @@ int main(int argc, char *argv[])
     
     qDebug() << "Starting clipboard manager on platform:" << app.platformName();
     
-    ClipboardManager manager;
+    // --events streams one NDJSON line per saved clip on stdout
+    ClipboardManager manager(app.arguments().contains("--events"));
     
     // Keep the application running
     return app.exec();
@@ -0,0 +1,194 @@
+"""
+Headless command line interface for searching the clipboard history
+"""
+
+import argparse
+import contextlib
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    # Imported by the commands themselves, not at startup
+    from .core.semantic_search import ClipboardSemanticSearch
+
+# Subcommands handled here instead of by the GUI
+COMMANDS = ("search", "list")
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhdw])$")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days",
+          "w": "weeks"}
+
+
+def parse_since(value: str, now: Optional[datetime] = None) -> str:
+    """Catalog time bound from a duration ("90m", "1h", "2d") or a date
+
+    Dates are passed through, so ``2025-09-28`` and
+    ``2025-09-28 10:30:00`` work as they do for the catalog.
+    """
+    match = _DURATION.match(value.strip().lower())
+    if match is None:
+        try:
+            return datetime.fromisoformat(value.strip()).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"expected a duration such as 1h or 2d, or a date: {value}"
+            )
+    amount, unit = match.groups()
+    delta = timedelta(**{_UNITS[unit]: float(amount)})
+    return ((now or datetime.now()) - delta).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Parser for the search and list subcommands"""
+    parser = argparse.ArgumentParser(
+        prog="clipsage",
+        description="Search the ClipSage clipboard history without the GUI"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Search the history")
+    search.add_argument("query", help="What to look for")
+    search.add_argument("-k", type=int, default=10,
+                        help="Number of results (default: 10)")
+    search.add_argument("--mode", choices=("hybrid", "semantic", "lexical"),
+                        help="Ranking to use (default: search.mode)")
+    search.add_argument("--embed", action="store_true",
+                        help="Embed entries that have no vector yet before "
+                             "searching (slow with a large backlog)")
+    search.add_argument("--json", action="store_true",
+                        help="Print results as JSON")
+    search.add_argument("--no-daemon", action="store_true",
+                        help="Search locally even if a daemon is running")
+
+    listing = commands.add_parser("list", help="List recent entries")
+    listing.add_argument("--since", type=parse_since,
+                         help="Only entries newer than a duration (1h, 2d) "
+                              "or a date")
+    listing.add_argument("--type", choices=("text", "image"),
+                         help="Only entries of this type")
+    listing.add_argument("-n", "--limit", type=int, default=20,
+                         help="Maximum number of entries (default: 20, "
+                              "0 for all)")
+    listing.add_argument("--json", action="store_true",
+                         help="Print entries as JSON")
+    listing.add_argument("--no-daemon", action="store_true",
+                         help="Read the history locally even if a daemon "
+                              "is running")
+    return parser
+
+
+def _print_items(items: List[Dict[str, Any]], as_json: bool) -> None:
+    if as_json:
+        json.dump(items, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return
+    for item in items:
+        preview = " ".join(item["preview"].split())
+        if len(preview) > 80:
+            preview = preview[:77] + "..."
+        score = f"{item['score']:.3f}  " if "score" in item else ""
+        print(f"{score}{item['timestamp']}  {item['type']:<5}  "
+              f"{item['entry_id']}  {preview}")
+
+
+def _ask_daemon(args: argparse.Namespace, method: str,
+                **params: Any) -> Optional[List[Dict[str, Any]]]:
+    """Result from a running daemon, None when there is none"""
+    if args.no_daemon:
+        return None
+    from .daemon import DaemonClient, DaemonError
+    try:
+        with DaemonClient() as client:
+            return client.request(method, **params)
+    except (OSError, DaemonError) as e:
+        if not isinstance(e, (FileNotFoundError, ConnectionRefusedError)):
+            print(f"Daemon unavailable, searching locally: {e}",
+                  file=sys.stderr)
+        return None
+
+
+def _refresh(search: "ClipboardSemanticSearch", embed: bool) -> None:
+    """Bring the index up to date, starting from the saved snapshot
+
+    Only entries changed since the last run are read, and vectors come
+    from the persisted vector index, so a warm query does no embedding
+    work beyond the query itself.
+    """
+    loaded = search.load_snapshot()
+    if search.refresh_data(embed=embed) or not loaded:
+        search.save_snapshot()
+
+
+def run_search(args: argparse.Namespace) -> int:
+    """Handle ``clipsage search``"""
+    results = _ask_daemon(args, "search", query=args.query, k=args.k,
+                          mode=args.mode)
+    if results is not None:
+        _print_items(results, args.json)
+        return 0 if results else 1
+
+    from .core.semantic_search import ClipboardSemanticSearch
+    from .daemon import item_to_json
+
+    # A one-shot search only embeds the query; entries without a vector
+    # yet are still found lexically and get embedded by the GUI or daemon
+    embed = args.embed and args.mode != "lexical"
+    # Progress and errors go to stderr, stdout is for the results
+    with contextlib.redirect_stdout(sys.stderr):
+        search = ClipboardSemanticSearch(load_data=False)
+        try:
+            _refresh(search, embed)
+            found = search.search(args.query, k=args.k, mode=args.mode)
+            if not found and args.mode != "lexical":
+                # Hybrid ranking already degrades to lexical on its own
+                print("No semantic matches (is the embedding backend "
+                      "running?), showing lexical matches")
+                found = search.search(args.query, k=args.k, mode="lexical")
+            results = [item_to_json(item) for item in found]
+        finally:
+            search.cleanup()
+    _print_items(results, args.json)
+    return 0 if results else 1
+
+
+def run_list(args: argparse.Namespace) -> int:
+    """Handle ``clipsage list``"""
+    items = _ask_daemon(args, "list", limit=args.limit or None,
+                        since=args.since, type=args.type)
+    if items is not None:
+        _print_items(items, args.json)
+        return 0
+
+    from .core.semantic_search import ClipboardSemanticSearch
+    from .daemon import item_to_json
+
+    with contextlib.redirect_stdout(sys.stderr):
+        search = ClipboardSemanticSearch(load_data=False)
+        try:
+            # Bring the catalog up to date; listing needs no vectors
+            _refresh(search, False)
+            items = [item_to_json(item) for item in search.iter_items(
+                limit=args.limit or None, since=args.since,
+                types=[args.type] if args.type else None
+            )]
+        finally:
+            search.cleanup()
+    _print_items(items, args.json)
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a subcommand, returning the exit status"""
+    args = build_parser().parse_args(argv)
+    if args.command == "search":
+        return run_search(args)
+    return run_list(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
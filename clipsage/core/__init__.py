@@ -2,7 +2,34 @@
 Core functionality for ClipSage
 """
 
+import importlib
+
 from .config import Config, config
-from .semantic_search import ClipboardSemanticSearch
+from .journal import ChangeJournal, RefreshDiff
+
+# Heavier modules (the search engine pulls in langchain and numpy) are
+# imported on first access, so ``import clipsage.core.config`` stays cheap
+_LAZY = {
+    "RetentionManager": ".retention",
+    "RetentionPolicy": ".retention",
+    "ClipboardSemanticSearch": ".semantic_search",
+    "ClipboardWatcher": ".watcher",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["Config", "config", "ClipboardSemanticSearch"]
\ No newline at end of file
+__all__ = [
+    "Config",
+    "config",
+    "ChangeJournal",
+    "RefreshDiff",
+    "RetentionManager",
+    "RetentionPolicy",
+    "ClipboardSemanticSearch",
+    "ClipboardWatcher",
+]
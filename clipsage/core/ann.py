@@ -0,0 +1,95 @@
+"""
+Approximate nearest neighbour search for large clipboard archives
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file (IVF-flat) partitioning of normalized vectors
+
+    Rows are clustered with spherical k-means; a query only scores the rows
+    of the ``nprobe`` clusters whose centroids are closest to it. The row
+    vectors themselves stay in the owning ``VectorIndex``; this class only
+    keeps the centroids and one cluster number per row.
+    """
+
+    def __init__(self, nlist: int, iterations: int = 10,
+                 sample_per_list: int = 32, seed: int = 0):
+        self.nlist = max(1, nlist)
+        self.iterations = iterations
+        self.sample_per_list = sample_per_list
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self.trained_rows = 0
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether centroids have been computed"""
+        return self.centroids is not None
+
+    def train(self, matrix: np.ndarray, live_rows: np.ndarray) -> None:
+        """Cluster a sample of the live rows and assign every row"""
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(live_rows))
+        sample_size = min(len(live_rows), nlist * self.sample_per_list)
+        sample = matrix[np.sort(rng.choice(live_rows, sample_size,
+                                           replace=False))]
+        sample = np.asarray(sample, dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(self.iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            # Re-seed empty clusters so every list stays useful
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.centroids = centroids
+        self.nlist = nlist
+        self._assignments = self.assign(matrix)
+        self.trained_rows = len(live_rows)
+
+    def assign(self, rows: np.ndarray,
+               chunk_size: int = 8192) -> np.ndarray:
+        """Return the nearest centroid of every row"""
+        labels = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), chunk_size):
+            chunk = np.asarray(rows[start:start + chunk_size])
+            labels[start:start + len(chunk)] = np.argmax(
+                chunk @ self.centroids.T, axis=1
+            )
+        return labels
+
+    def append(self, start: int, rows: np.ndarray) -> None:
+        """Assign rows appended to the owning index at ``start``"""
+        if not self.is_trained:
+            return
+        if len(self._assignments) != start:
+            # Lost track of the owning index; force a retrain
+            self.centroids = None
+            return
+        self._assignments = np.concatenate(
+            [self._assignments, self.assign(rows)]
+        )
+
+    def remap(self, live_rows: np.ndarray) -> None:
+        """Follow a compaction that kept only ``live_rows``"""
+        self._assignments = self._assignments[live_rows]
+
+    def candidates(self, query: np.ndarray, nprobe: int,
+                   count: int) -> np.ndarray:
+        """Row numbers in the ``nprobe`` clusters closest to the query"""
+        scores = self.centroids @ query
+        nprobe = min(max(1, nprobe), self.nlist)
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self._assignments[:count], probes))
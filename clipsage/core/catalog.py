@@ -0,0 +1,309 @@
+"""
+Persistent metadata catalog of clipboard entries
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .config import config
+
+
+# Clipboard files that make up an entry, by kind
+ENTRY_SUFFIXES = {"text": "_text.txt", "image": "_image.png"}
+
+
+def parse_entry_key(filename: str) -> Optional[str]:
+    """Extract the counter_date_time entry key from a clip filename"""
+    if not filename.startswith("clip_"):
+        return None
+
+    # clip_{counter}_{date}_{time}_{type}.{ext}
+    parts = filename.split("_")
+    if len(parts) < 5:
+        return None
+
+    counter, date_part, time_part = parts[1:4]
+    return f"{counter}_{date_part}_{time_part}"
+
+
+def entry_kind(filename: str) -> Optional[str]:
+    """Kind of clipboard file, or None for files that are not indexed"""
+    for kind, suffix in ENTRY_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return kind
+    return None
+
+
+def parse_entry_time(entry_key: str) -> str:
+    """Sortable ``YYYY-MM-DD HH:MM:SS`` creation time of an entry key"""
+    parts = entry_key.split("_")
+    if len(parts) < 3:
+        return ""
+    return f"{parts[1]} {parts[2].replace('-', ':')}"
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    """Metadata of one clipboard entry
+
+    Also the in-memory record the search layer keeps per entry, so it holds
+    the preview and file locations but never the full content.
+    """
+    entry_id: str
+    counter: int
+    created: str  # YYYY-MM-DD HH:MM:SS, sorts chronologically
+    type: str
+    preview: str
+    text_bytes: int = 0
+    image_bytes: int = 0
+    text_path: Optional[str] = None
+    image_path: Optional[str] = None
+    fingerprint: str = ""  # Content fingerprint, empty without dedup
+
+    @property
+    def files(self) -> Dict[str, Path]:
+        """Paths of the entry's files, by kind"""
+        files = {}
+        if self.text_path:
+            files["text"] = Path(self.text_path)
+        if self.image_path:
+            files["image"] = Path(self.image_path)
+        return files
+
+
+_COLUMNS = ("entry_id", "counter", "created", "type", "preview",
+            "text_bytes", "image_bytes", "text_path", "image_path",
+            "fingerprint")
+
+
+class ClipCatalog:
+    """SQLite (WAL) table of clipboard entries with indexed listing
+
+    The catalog belongs to one clipboard directory; opening it for another
+    directory starts it over.
+    """
+
+    def __init__(self, db_path: Path, clipboard_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                entry_id TEXT PRIMARY KEY,
+                counter INTEGER NOT NULL,
+                created TEXT NOT NULL,
+                type TEXT NOT NULL,
+                preview TEXT NOT NULL,
+                text_bytes INTEGER NOT NULL DEFAULT 0,
+                image_bytes INTEGER NOT NULL DEFAULT 0,
+                text_path TEXT,
+                image_path TEXT,
+                fingerprint TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # Catalogs created before fingerprints lack the column
+        columns = {row[1] for row in
+                   self._conn.execute("PRAGMA table_info(entries)")}
+        if "fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN "
+                               "fingerprint TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_entries_created
+            ON entries (created, counter)
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_entries_type_created
+            ON entries (type, created, counter)
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+        root = str(Path(clipboard_path).resolve())
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'clipboard_path'"
+        ).fetchone()
+        if row is None or row[0] != root:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('clipboard_path', ?)",
+                (root,)
+            )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()[0]
+
+    def __contains__(self, entry_id: str) -> bool:
+        return self.get(entry_id) is not None
+
+    def upsert_many(self, entries: Iterable[CatalogEntry]) -> None:
+        """Insert entries, replacing earlier versions"""
+        rows = [tuple(getattr(entry, column) for column in _COLUMNS)
+                for entry in entries]
+        if not rows:
+            return
+        placeholders = ",".join("?" * len(_COLUMNS))
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO entries VALUES ({placeholders})",
+                rows
+            )
+            self._conn.commit()
+
+    def remove_many(self, entry_ids: Iterable[str]) -> None:
+        """Delete entries if present"""
+        rows = [(entry_id,) for entry_id in entry_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM entries WHERE entry_id = ?", rows
+            )
+            self._conn.commit()
+
+    def retain(self, entry_ids: Iterable[str]) -> int:
+        """Delete every entry not in entry_ids, returning how many"""
+        keep = set(entry_ids)
+        stale = [entry_id for entry_id in self.entry_ids()
+                 if entry_id not in keep]
+        self.remove_many(stale)
+        return len(stale)
+
+    def get(self, entry_id: str) -> Optional[CatalogEntry]:
+        """Look up one entry by id"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM entries "
+                f"WHERE entry_id = ?",
+                (entry_id,)
+            ).fetchone()
+        return CatalogEntry(*row) if row else None
+
+    def entry_ids(self) -> List[str]:
+        """Ids of every entry, in no particular order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id FROM entries"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _where(self, types: Optional[Sequence[str]],
+               since: Optional[str], until: Optional[str]):
+        """WHERE clause and parameters for the listing filters"""
+        clauses, params = [], []
+        if types:
+            clauses.append(f"type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        if since:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def list(self, offset: int = 0, limit: Optional[int] = None,
+             types: Optional[Sequence[str]] = None,
+             since: Optional[str] = None,
+             until: Optional[str] = None) -> List[CatalogEntry]:
+        """Entries newest first, optionally filtered and paginated
+
+        ``since`` and ``until`` compare against the ``created`` column, so
+        a plain date such as ``2025-09-28`` works as a bound too.
+        """
+        where, params = self._where(types, since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM entries {where} "
+                f"ORDER BY created DESC, counter DESC "
+                f"LIMIT ? OFFSET ?",
+                [*params, -1 if limit is None else limit, offset]
+            ).fetchall()
+        return [CatalogEntry(*row) for row in rows]
+
+    def iter(self, offset: int = 0, limit: Optional[int] = None,
+             types: Optional[Sequence[str]] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             chunk_size: int = 500) -> Iterator[CatalogEntry]:
+        """Stream entries newest first, fetching chunk_size rows at a time
+
+        Chunks after the first continue from the last row seen (keyset
+        pagination), so every chunk is a short index range scan no matter
+        how deep into the history the iteration gets.
+        """
+        remaining = limit
+        last = None
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size,
+                                                             remaining)
+            where, params = self._where(types, since, until)
+            if last is not None:
+                keyset = "(created, counter) < (?, ?)"
+                where = (f"{where} AND {keyset}" if where
+                         else f"WHERE {keyset}")
+                params.extend(last)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM entries {where} "
+                    f"ORDER BY created DESC, counter DESC "
+                    f"LIMIT ? OFFSET ?",
+                    [*params, size, offset if last is None else 0]
+                ).fetchall()
+            for row in rows:
+                yield CatalogEntry(*row)
+            if len(rows) < size:
+                return
+            last = (rows[-1][2], rows[-1][1])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def count(self, types: Optional[Sequence[str]] = None,
+              since: Optional[str] = None,
+              until: Optional[str] = None) -> int:
+        """Number of entries matching the listing filters"""
+        where, params = self._where(types, since, until)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM entries {where}", params
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        """Delete every entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def open_default_catalog(clipboard_path: Path) -> ClipCatalog:
+    """Open the catalog in the cache directory, falling back to memory
+
+    Every clipboard directory gets its own database, so opening another
+    one (from tests, or a second history) leaves this one intact.
+    """
+    name = f"catalog-{config.history_key(clipboard_path)}.sqlite3"
+    try:
+        return ClipCatalog(config.cache_path / name, clipboard_path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error opening clipboard catalog: {e}")
+        return ClipCatalog(Path(":memory:"), clipboard_path)
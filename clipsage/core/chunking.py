@@ -0,0 +1,76 @@
+"""
+Splitting of long clipboard entries into overlapping passages
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from .config import config
+
+
+# Rough approximation of model tokens: words and single punctuation marks
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+class Chunk(NamedTuple):
+    """A passage of a document, with its character offsets"""
+    text: str
+    start: int
+    end: int
+
+
+def chunk_id(doc_id: str, index: int) -> str:
+    """Vector id of a document's chunk"""
+    return f"{doc_id}#{index}"
+
+
+def split_vector_id(vector_id: str) -> Tuple[str, int]:
+    """Document id and chunk number of a vector id"""
+    doc_id, _, index = vector_id.partition("#")
+    return doc_id, int(index) if index.isdigit() else 0
+
+
+class TextChunker:
+    """Token-aware sliding window splitter
+
+    Windows hold ``window`` tokens and overlap by ``overlap`` tokens, so a
+    phrase cut at one boundary is whole in the neighbouring chunk. Chunks
+    start and end on token boundaries. Texts that fit in one window stay a
+    single chunk; at most ``max_chunks`` chunks are produced per text, the
+    rest of a huge clip is left to lexical search.
+    """
+
+    def __init__(self, window: Optional[int] = None,
+                 overlap: Optional[int] = None,
+                 max_chunks: Optional[int] = None):
+        self.window = max(1, window if window is not None
+                          else config.get("chunking.window_tokens", 256))
+        overlap = (overlap if overlap is not None
+                   else config.get("chunking.overlap_tokens", 32))
+        self.overlap = min(max(0, overlap), self.window - 1)
+        self.max_chunks = (max_chunks if max_chunks is not None
+                           else config.get("chunking.max_chunks", 256))
+
+    def split(self, text: str) -> List[Chunk]:
+        """Split text into chunks; short texts come back whole"""
+        spans = []
+        for match in _TOKEN_RE.finditer(text):
+            spans.append(match.span())
+            # Only count tokens as far as the last chunk can reach
+            if len(spans) > self.window + (self.max_chunks - 1) * (
+                    self.window - self.overlap):
+                break
+        if len(spans) <= self.window:
+            return [Chunk(text, 0, len(text))]
+
+        chunks = []
+        step = self.window - self.overlap
+        for first in range(0, len(spans), step):
+            if len(chunks) == self.max_chunks:
+                break
+            last = min(first + self.window, len(spans)) - 1
+            start, end = spans[first][0], spans[last][1]
+            chunks.append(Chunk(text[start:end], start, end))
+            if last == len(spans) - 1:
+                break
+        return chunks
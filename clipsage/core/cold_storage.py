@@ -0,0 +1,295 @@
+"""
+Compressed cold storage tier for old clipboard entries
+"""
+
+import gzip
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from .config import config
+from .catalog import CatalogEntry
+
+try:
+    import zstandard
+except ImportError:  # Optional; gzip is used without it
+    zstandard = None
+
+
+class StoredFile(NamedTuple):
+    """A clipboard file kept in a segment, with its original signature"""
+    name: str
+    entry_id: str
+    kind: str
+    segment: int
+    offset: int
+    length: int
+    size: int
+    mtime_ns: int
+    codec: str
+
+
+_FIELDS = StoredFile._fields
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, mtime=0)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is needed to read this archive")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class ColdStorage:
+    """Packs clipboard files into compressed, append-only segment files
+
+    Each file becomes one independently compressed record, so a single
+    entry is read back with one seek. An SQLite index maps file names to
+    (segment, offset, length) and keeps the original size and mtime, which
+    lets a refresh treat a packed entry exactly like the files it replaced.
+    Text is compressed with zstd when the ``zstandard`` package is
+    installed and gzip otherwise; PNG images are stored as they are.
+    """
+
+    def __init__(self, path: Path, codec: Optional[str] = None,
+                 segment_bytes: Optional[int] = None):
+        self.path = Path(path)
+        codec = codec or config.get("cold_storage.codec", "auto")
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "gzip"
+        self.codec = codec
+        self.segment_bytes = (
+            segment_bytes if segment_bytes is not None
+            else config.get("cold_storage.segment_bytes", 64 << 20)
+        )
+        self._lock = threading.Lock()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path / "index.sqlite3"),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                name TEXT PRIMARY KEY,
+                entry_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                codec TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_files_entry
+            ON files (entry_id)
+        """)
+        self._conn.commit()
+
+        segments = [int(p.stem.split("_")[1])
+                    for p in self.path.glob("segment_*.seg")]
+        self._segment = max(segments, default=1)
+
+    def __len__(self) -> int:
+        """Number of entries in storage"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(DISTINCT entry_id) FROM files"
+            ).fetchone()[0]
+
+    def __contains__(self, entry_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM files WHERE entry_id = ? LIMIT 1", (entry_id,)
+            ).fetchone() is not None
+
+    def entry_ids(self) -> Set[str]:
+        """Ids of every stored entry"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT entry_id FROM files"
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def files(self, entry_ids: Optional[Iterable[str]] = None
+              ) -> List[StoredFile]:
+        """Stored files of the given entries, or of every entry"""
+        query = f"SELECT {', '.join(_FIELDS)} FROM files"
+        with self._lock:
+            if entry_ids is None:
+                rows = self._conn.execute(query).fetchall()
+            else:
+                keys = list(entry_ids)
+                rows = []
+                # Stay below SQLite's bound parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    rows.extend(self._conn.execute(
+                        f"{query} WHERE entry_id IN "
+                        f"({','.join('?' * len(batch))})", batch
+                    ).fetchall())
+        return [StoredFile(*row) for row in rows]
+
+    def get(self, name: str) -> Optional[StoredFile]:
+        """Index record of a stored file"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM files WHERE name = ?",
+                (name,)
+            ).fetchone()
+        return StoredFile(*row) if row else None
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Original content of a stored file, None if it is not stored"""
+        stored = self.get(name)
+        if stored is None:
+            return None
+        with open(self._segment_path(stored.segment), "rb") as f:
+            f.seek(stored.offset)
+            data = f.read(stored.length)
+        return _decompress(data, stored.codec)
+
+    def pack(self, entries: Iterable[CatalogEntry]) -> List[str]:
+        """Move the files of the given entries into storage
+
+        Records are appended and synced to disk and the index committed
+        before the original files are deleted, so a crash never loses an
+        entry. Returns the ids of the entries packed.
+        """
+        with self._lock:
+            known = {row[0] for row in self._conn.execute(
+                "SELECT DISTINCT entry_id FROM files"
+            )}
+            rows, originals, packed = [], [], []
+            segment = self._open_segment()
+            try:
+                for entry in entries:
+                    if entry.entry_id in known:
+                        continue
+                    for kind, path in entry.files.items():
+                        try:
+                            stat = path.stat()
+                            data = path.read_bytes()
+                        except OSError:
+                            continue  # Deleted meanwhile
+                        codec = self.codec if kind == "text" else "raw"
+                        record = _compress(data, codec)
+                        if (segment.tell() and segment.tell() +
+                                len(record) > self.segment_bytes):
+                            self._sync(segment)
+                            segment.close()
+                            self._segment += 1
+                            segment = self._open_segment()
+                        rows.append((path.name, entry.entry_id, kind,
+                                     self._segment, segment.tell(),
+                                     len(record), stat.st_size,
+                                     stat.st_mtime_ns, codec))
+                        segment.write(record)
+                        originals.append(path)
+                    if originals and rows[-1][1] == entry.entry_id:
+                        packed.append(entry.entry_id)
+                self._sync(segment)
+            finally:
+                segment.close()
+
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO files VALUES "
+                f"({','.join('?' * len(_FIELDS))})", rows
+            )
+            self._conn.commit()
+
+        for path in originals:
+            try:
+                path.unlink()
+            except OSError as e:
+                print(f"Error removing packed clipboard file {path}: {e}")
+        return packed
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        """Forget entries; their space is reclaimed by compact"""
+        rows = [(entry_id,) for entry_id in entry_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM files WHERE entry_id = ?",
+                                   rows)
+            self._conn.commit()
+
+    def compact(self, min_live_ratio: float = 0.5) -> int:
+        """Rewrite segments that are mostly dead space, returning how many
+
+        The segment being appended to is left alone.
+        """
+        rewritten = 0
+        with self._lock:
+            live: Dict[int, int] = dict(self._conn.execute(
+                "SELECT segment, SUM(length) FROM files GROUP BY segment"
+            ).fetchall())
+            for path in sorted(self.path.glob("segment_*.seg")):
+                number = int(path.stem.split("_")[1])
+                size = path.stat().st_size
+                if (number == self._segment or
+                        live.get(number, 0) >= size * min_live_ratio):
+                    continue
+                rows = self._conn.execute(
+                    "SELECT name, offset, length FROM files "
+                    "WHERE segment = ? ORDER BY offset", (number,)
+                ).fetchall()
+                moved = []
+                with open(path, "rb") as src:
+                    segment = self._open_segment()
+                    try:
+                        for name, offset, length in rows:
+                            src.seek(offset)
+                            moved.append((self._segment, segment.tell(),
+                                          name))
+                            segment.write(src.read(length))
+                        self._sync(segment)
+                    finally:
+                        segment.close()
+                self._conn.executemany(
+                    "UPDATE files SET segment = ?, offset = ? "
+                    "WHERE name = ?", moved
+                )
+                self._conn.commit()
+                path.unlink()
+                rewritten += 1
+        return rewritten
+
+    def close(self) -> None:
+        """Close the index database"""
+        with self._lock:
+            self._conn.close()
+
+    def _segment_path(self, number: int) -> Path:
+        return self.path / f"segment_{number:06d}.seg"
+
+    def _open_segment(self):
+        """Open the current segment for appending"""
+        return open(self._segment_path(self._segment), "ab")
+
+    @staticmethod
+    def _sync(segment) -> None:
+        segment.flush()
+        os.fsync(segment.fileno())
+
+
+def open_default_cold_storage(clipboard_path: Path) -> ColdStorage:
+    """Open the cold storage of a clipboard directory in the cache"""
+    # One store per clipboard directory, entries of others never mix in
+    return ColdStorage(config.cache_path / "cold" /
+                       config.history_key(clipboard_path))
@@ -2,6 +2,7 @@
 Configuration management for ClipSage
 """
 
+import hashlib
 import os
 import tempfile
 from pathlib import Path
@@ -53,10 +54,73 @@ class Config:
         defaults = {
             "clipboard_path": str(Path(tempfile.gettempdir()) /
                                   "clipboard_manager"),
-            "embedding_model": "all-minilm:22m",
+            "cache_path": str(Path.home() / ".cache" / "clipsage"),
+            "embedding_model": "all-minilm:22m",  # Ollama model
+            "embeddings": {
+                # "ollama" (local server), "hashing" (in-process n-grams,
+                # works offline) or "fake" (tests and benchmarks)
+                "backend": "ollama",
+                "dimension": 512  # Vector size of hashing and fake
+            },
+            "embedding_cache": {
+                "enabled": True,
+                "max_entries": 50000
+            },
+            "vector_index": {
+                "persist": True
+            },
+            "embedding_pipeline": {
+                "batch_size": 32,
+                "max_in_flight": 2,
+                "max_retries": 3,
+                "retry_delay": 0.5
+            },
+            "chunking": {
+                "window_tokens": 256,  # Passage length for long clips
+                "overlap_tokens": 32,
+                "max_chunks": 256  # Per clip; the rest is lexical only
+            },
             "max_items": 500,  # Reduced for performance
-            "refresh_interval": 15000,  # 15 seconds - more reasonable
+            "refresh_interval": 15000,  # Only used without the watcher
             "auto_refresh": True,
+            "watcher": {
+                "enabled": True,
+                "backend": "auto",  # "auto" (inotify if available), "polling"
+                "settle_ms": 150,  # Quiet time before a batch is indexed
+                "max_delay_ms": 1000,  # Upper bound while events keep coming
+                "poll_interval": 2.0  # Seconds, when inotify is missing
+            },
+            "monitor": {
+                "events": True  # Clip events on the monitor's stdout
+            },
+            "daemon": {
+                # Empty: $XDG_RUNTIME_DIR/clipsage.sock, else in cache_path
+                "socket_path": "",
+                "workers": 4  # Threads answering requests
+            },
+            "retention": {
+                "enabled": True,
+                # max_items above is the count budget; 0 disables a budget
+                "max_age_days": 0,
+                "max_bytes": 0,
+                "action": "archive",  # "archive" or "delete" old files
+                "interval": 600  # Seconds between checks
+            },
+            "cold_storage": {
+                "enabled": True,
+                "after_days": 30,  # Pack entries older than this, 0 = never
+                "codec": "auto",  # "zstd" (needs zstandard), "gzip"
+                "segment_bytes": 67108864
+            },
+            "images": {
+                "thumbnails": True,  # Cached under cache_path/thumbnails
+                "thumbnail_size": 256,
+                "workers": 0,  # Image decoding processes, 0 = automatic
+                "parallel_threshold": 4  # Smaller batches stay in-process
+            },
+            "dedup": {
+                "enabled": True  # Index identical clips only once
+            },
             "window": {
                 "width": 1200,
                 "height": 800,
@@ -65,18 +129,33 @@ class Config:
             },
             "search": {
                 "max_results": 10,
-                "enable_semantic": True
+                "enable_semantic": True,
+                "mode": "hybrid",  # "semantic", "lexical" or "hybrid"
+                "rrf_k": 60,  # Reciprocal-rank fusion constant
+                "query_cache_size": 256,
+                "debounce_ms": 300,  # Delay before as-you-type search
+                "ann_mode": "ivf",  # "exact" disables approximate search
+                "ann_threshold": 20000,  # Exact search below this size
+                "nlist": 0,  # IVF clusters, 0 = sqrt(number of vectors)
+                "nprobe": 8,  # Clusters scanned per query
+                "mmap_threshold": 1048576  # Map text files of this size
             },
             "ui": {
                 "theme": "light",
                 "font_size": 12,
-                "show_preview": True
+                "show_preview": True,
+                "page_size": 200  # Items loaded per scroll page
             }
         }
         
         for key, value in defaults.items():
             if key not in self._config:
                 self._config[key] = value
+            elif (isinstance(value, dict) and
+                    isinstance(self._config[key], dict)):
+                # Pick up options added to existing sections
+                for sub_key, sub_value in value.items():
+                    self._config[key].setdefault(sub_key, sub_value)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
@@ -109,6 +188,17 @@ class Config:
         """Get clipboard storage path"""
         return Path(self.get("clipboard_path"))
     
+    @property
+    def cache_path(self) -> Path:
+        """Get directory for caches and persisted indexes"""
+        return Path(self.get("cache_path",
+                             str(Path.home() / ".cache" / "clipsage")))
+    
+    def history_key(self, clipboard_path: Path) -> str:
+        """Short name of a clipboard directory for per-history caches"""
+        root = str(Path(clipboard_path).resolve())
+        return hashlib.sha1(root.encode("utf-8")).hexdigest()[:12]
+    
     @property
     def embedding_model(self) -> str:
         """Get embedding model name"""
@@ -0,0 +1,53 @@
+"""
+Content fingerprints used to fold duplicate clipboard entries together
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+from PIL import Image
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text clip: NFC, whitespace runs collapsed"""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def image_dhash(image: Image.Image, size: int = 8) -> str:
+    """Difference hash of an image as a hex string
+
+    Robust against re-encoding and small rescales, so the same screenshot
+    copied twice hashes the same even if the PNG bytes differ.
+    """
+    gray = image.convert("L").resize((size + 1, size),
+                                     Image.Resampling.BILINEAR)
+    pixels = gray.tobytes()  # One byte per pixel in "L" mode
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+
+def fingerprint(text: Optional[str],
+                image_hash: Optional[str]) -> str:
+    """Fingerprint of an entry from its text and image hash"""
+    parts = []
+    if text:
+        parts.append("t:" + normalize_text(text))
+    if image_hash:
+        parts.append("i:" + image_hash)
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def group_id(entry_fingerprint: str) -> str:
+    """Index id shared by every entry with the given fingerprint"""
+    return f"dup_{entry_fingerprint[:32]}"
@@ -0,0 +1,195 @@
+"""
+Persistent embedding cache for ClipSage
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from .config import config
+
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingBackend
+
+
+def content_hash(text: str) -> str:
+    """Return the sha256 hex digest used as cache key for a text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by content hash and model name
+
+    Vectors are stored as packed float32 blobs. Once the cache holds more
+    than ``max_entries`` vectors the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 50000):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, hash)
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used
+            ON embeddings (last_used)
+        """)
+        self._conn.commit()
+        self._count = self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_many(self, model: str,
+                 hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Look up cached vectors, returning only the hashes that hit"""
+        found: Dict[str, List[float]] = {}
+        if not hashes:
+            return found
+
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model = ? AND hash = ?",
+                    [(now, model, key) for key in found]
+                )
+                self._conn.commit()
+
+        return found
+
+    def put_many(self, model: str, hashes: Sequence[str],
+                 vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors and evict the least recently used overflow"""
+        if not hashes:
+            return
+
+        now = time.time()
+        rows = [
+            (model, key, len(vector), array("f", vector).tobytes(), now)
+            for key, vector in zip(hashes, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, hash, dim, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._count = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used vectors above the size bound"""
+        overflow = self._count - self.max_entries
+        if overflow <= 0:
+            return
+
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN ("
+            "SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,)
+        )
+        self._count -= overflow
+
+    def clear(self) -> None:
+        """Remove every cached vector"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings:
+    """Embeddings wrapper that only sends unseen content to the backend"""
+
+    def __init__(self, embeddings: "EmbeddingBackend", cache: EmbeddingCache,
+                 model_name: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, reusing cached vectors where possible"""
+        hashes = [content_hash(text) for text in texts]
+        vectors: Dict[str, List[float]] = self.cache.get_many(
+            self.model_name, hashes
+        )
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            new_vectors = self.embeddings.embed_documents(
+                list(missing.values())
+            )
+            self.cache.put_many(self.model_name, list(missing),
+                                new_vectors)
+            vectors.update(zip(missing, new_vectors))
+
+        return [vectors[key] for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query without caching it on disk"""
+        return self.embeddings.embed_query(text)
+
+
+def open_default_cache() -> Optional[EmbeddingCache]:
+    """Open the embedding cache configured in the user's config"""
+    if not config.get("embedding_cache.enabled", True):
+        return None
+
+    try:
+        return EmbeddingCache(
+            config.cache_path / "embeddings.sqlite3",
+            max_entries=config.get("embedding_cache.max_entries", 50000)
+        )
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error opening embedding cache: {e}")
+        return None
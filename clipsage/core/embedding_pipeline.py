@@ -0,0 +1,159 @@
+"""
+Batched, concurrent embedding pipeline for ClipSage
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+)
+
+from .config import config
+
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingBackend
+
+
+@dataclass
+class Document:
+    """Text to embed under an id, with metadata about its clip"""
+    id: str
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+VectorSink = Callable[[List[Document], List[List[float]]], None]
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class PipelineStats:
+    """Outcome of one pipeline run"""
+    submitted: int = 0
+    embedded: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed_ids: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class EmbeddingPipeline:
+    """Embeds documents in concurrent batches and streams vectors to a sink
+
+    Batches are handed to ``max_in_flight`` worker threads through a bounded
+    queue, so the producer blocks instead of buffering the whole backlog.
+    Each finished batch is passed to ``sink`` as soon as it is embedded,
+    which lets searches see new vectors while a large backlog is running.
+    """
+
+    _STOP = object()
+
+    def __init__(self, embeddings: "EmbeddingBackend", sink: VectorSink,
+                 batch_size: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 max_retries: Optional[int] = None,
+                 retry_delay: Optional[float] = None):
+        self.embeddings = embeddings
+        self.sink = sink
+        self.batch_size = max(1, batch_size or config.get(
+            "embedding_pipeline.batch_size", 32))
+        self.max_in_flight = max(1, max_in_flight or config.get(
+            "embedding_pipeline.max_in_flight", 2))
+        self.max_retries = (max_retries if max_retries is not None
+                            else config.get(
+                                "embedding_pipeline.max_retries", 3))
+        self.retry_delay = (retry_delay if retry_delay is not None
+                            else config.get(
+                                "embedding_pipeline.retry_delay", 0.5))
+        self._sink_lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop the running pipeline after the batches in flight"""
+        self._cancelled.set()
+
+    def run(self, documents: Sequence[Document],
+            progress: Optional[ProgressCallback] = None) -> PipelineStats:
+        """Embed documents and block until every batch was handled"""
+        self._cancelled.clear()
+        stats = PipelineStats(submitted=len(documents))
+        if not documents:
+            return stats
+
+        start_time = time.perf_counter()
+        batches: "queue.Queue" = queue.Queue(maxsize=self.max_in_flight)
+        stats_lock = threading.Lock()
+
+        def worker() -> None:
+            while True:
+                batch = batches.get()
+                if batch is self._STOP:
+                    return
+                if self._cancelled.is_set():
+                    with stats_lock:
+                        stats.failed_ids.extend(doc.id for doc in batch)
+                    continue
+
+                vectors, retries = self._embed_with_retry(batch)
+                with stats_lock:
+                    stats.batches += 1
+                    stats.retries += retries
+                    if vectors is None:
+                        stats.failed_ids.extend(doc.id for doc in batch)
+                        continue
+
+                try:
+                    with self._sink_lock:
+                        self.sink(batch, vectors)
+                except Exception as e:
+                    print(f"Error storing embedding batch: {e}")
+                    with stats_lock:
+                        stats.failed_ids.extend(doc.id for doc in batch)
+                    continue
+
+                with stats_lock:
+                    stats.embedded += len(batch)
+                    done = stats.embedded
+                if progress is not None:
+                    progress(done, stats.submitted)
+
+        workers = [
+            threading.Thread(target=worker, name=f"clipsage-embed-{i}",
+                             daemon=True)
+            for i in range(self.max_in_flight)
+        ]
+        for thread in workers:
+            thread.start()
+
+        # Blocks whenever max_in_flight batches are already waiting
+        for start in range(0, len(documents), self.batch_size):
+            batches.put(list(documents[start:start + self.batch_size]))
+        for _ in workers:
+            batches.put(self._STOP)
+        for thread in workers:
+            thread.join()
+
+        stats.elapsed = time.perf_counter() - start_time
+        return stats
+
+    def _embed_with_retry(
+        self, batch: List[Document]
+    ) -> Tuple[Optional[List[List[float]]], int]:
+        """Embed one batch, retrying transient failures with backoff"""
+        texts = [doc.page_content for doc in batch]
+        delay = self.retry_delay
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(texts), attempt
+            except Exception as e:
+                if attempt == self.max_retries or self._cancelled.is_set():
+                    print(f"Error embedding batch of {len(batch)} "
+                          f"documents: {e}")
+                    return None, attempt
+                time.sleep(delay)
+                delay *= 2
+
+        return None, self.max_retries
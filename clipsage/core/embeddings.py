@@ -0,0 +1,159 @@
+"""
+Embedding backends for semantic search
+"""
+
+import hashlib
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Type
+
+import numpy as np
+
+from .config import config
+
+
+class EmbeddingBackend(Protocol):
+    """What the search index needs from an embedding model
+
+    ``model_id`` keys the persisted vector index and the embedding cache,
+    so vectors of different models never mix. ``dimension`` is None when
+    it is only known after the first call.
+    """
+    model_id: str
+    dimension: Optional[int]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    def embed_query(self, text: str) -> List[float]:
+        ...
+
+
+class OllamaBackend:
+    """Embeddings from a local Ollama server, over HTTP
+
+    langchain_ollama (and langchain_core with it) takes about a second to
+    import, so it is imported on the first call, which runs on a worker
+    thread, and not at startup.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.model_id = model or config.embedding_model
+        self.dimension: Optional[int] = None
+        self._embeddings: Any = None
+        self._lock = threading.Lock()
+
+    def _client(self) -> Any:
+        with self._lock:
+            if self._embeddings is None:
+                from langchain_ollama import OllamaEmbeddings
+                self._embeddings = OllamaEmbeddings(model=self.model_id)
+            return self._embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._client().embed_documents(texts)
+        if vectors and self.dimension is None:
+            self.dimension = len(vectors[0])
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._client().embed_query(text)
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingBackend:
+    """In-process embeddings from hashed character n-grams and words
+
+    Every n-gram of the lowercased words (padded with spaces, so word
+    boundaries count) and every whole word is hashed into one of
+    ``dimension`` signed buckets; counts are log-scaled and the vector is
+    L2-normalized. Needs no model files or server, so it works offline and
+    costs microseconds per clip. It captures spelling and vocabulary
+    overlap, including partial words and typos, but not synonyms.
+    """
+
+    def __init__(self, dimension: Optional[int] = None,
+                 ngram_range: Tuple[int, int] = (3, 5)):
+        self.dimension = dimension or config.get("embeddings.dimension", 512)
+        self.ngram_range = ngram_range
+        low, high = ngram_range
+        self.model_id = f"hashing-v1-{low}{high}-d{self.dimension}"
+
+    def _features(self, text: str) -> List[int]:
+        """Hashes of the words and character n-grams of a text"""
+        low, high = self.ngram_range
+        features = []
+        for word in _WORD_RE.findall(text.lower()):
+            features.append(zlib.crc32(word.encode("utf-8")) ^ 0x5bd1e995)
+            padded = f" {word} ".encode("utf-8")
+            for n in range(low, high + 1):
+                for start in range(len(padded) - n + 1):
+                    features.append(zlib.crc32(padded[start:start + n]))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        hashes = np.array(self._features(text), dtype=np.uint32)
+        # The top bit picks the sign, so collisions tend to cancel out
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        counts = np.bincount(hashes % self.dimension, weights=signs,
+                             minlength=self.dimension)
+        vector = np.sign(counts) * np.log1p(np.abs(counts))
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.astype(np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class FakeBackend:
+    """Deterministic random unit vectors, for tests and benchmarks
+
+    The same text always gets the same vector, in every process, and
+    different texts get unrelated ones. Costs next to nothing, so
+    benchmarks measure the index rather than a model.
+    """
+
+    def __init__(self, dimension: Optional[int] = None):
+        self.dimension = dimension or config.get("embeddings.dimension", 512)
+        self.model_id = f"fake-d{self.dimension}"
+
+    def _embed(self, text: str) -> List[float]:
+        seed = hashlib.sha256(text.encode("utf-8")).digest()[:8]
+        rng = np.random.default_rng(int.from_bytes(seed, "little"))
+        vector = rng.standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    "ollama": OllamaBackend,
+    "hashing": HashingBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name: Optional[str] = None,
+                   model: Optional[str] = None) -> EmbeddingBackend:
+    """Backend chosen by ``embeddings.backend`` (or ``name``)
+
+    ``model`` is the Ollama model; the in-process backends ignore it.
+    """
+    name = name or config.get("embeddings.backend", "ollama")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}")
+    if name == "ollama":
+        return OllamaBackend(model)
+    return BACKENDS[name]()
@@ -0,0 +1,192 @@
+"""
+Image metadata extraction and thumbnail cache for clipboard images
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import struct
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from PIL import Image
+
+from .config import config
+from .dedup import image_dhash
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IHDR = struct.Struct(">I4sII")
+
+# A file on disk, or the bytes of one kept in cold storage
+ImageSource = Union[str, bytes]
+
+
+def png_size(source: Union[Path, bytes]) -> Optional[Tuple[int, int]]:
+    """Width and height from a PNG's IHDR chunk, without decoding it"""
+    if isinstance(source, bytes):
+        header = source[:24]
+    else:
+        try:
+            with open(source, "rb") as f:
+                header = f.read(24)
+        except OSError:
+            return None
+    if len(header) < 24 or not header.startswith(_PNG_SIGNATURE):
+        return None
+    _, chunk, width, height = _IHDR.unpack_from(header, 8)
+    if chunk != b"IHDR":
+        return None
+    return width, height
+
+
+class ImageInfo(NamedTuple):
+    """What the index needs to know about an image"""
+    width: int
+    height: int
+    dhash: Optional[str]
+    thumbnail: Optional[str]
+
+
+class ImageJob(NamedTuple):
+    """One image for the image stage"""
+    name: str
+    source: ImageSource
+    thumbnail: Optional[str]  # Where to write the thumbnail, if anywhere
+    want_hash: bool
+
+
+def analyze_image(job: ImageJob, thumbnail_size: int) -> Optional[ImageInfo]:
+    """Size, hash and thumbnail of one image
+
+    The hash is taken from the thumbnail when there is one (dHash does not
+    care about scale), so an image whose thumbnail is already cached is not
+    decoded at all. Runs in the worker processes, so it only takes
+    picklable arguments.
+    """
+    source = job.source
+    thumbnail = job.thumbnail
+    try:
+        if thumbnail is not None and os.path.exists(thumbnail):
+            size = png_size(source if isinstance(source, bytes)
+                            else Path(source))
+            if size is None:
+                with Image.open(_open(source)) as img:
+                    size = img.size  # Header only, no decode
+            dhash = None
+            if job.want_hash:
+                with Image.open(thumbnail) as thumb:
+                    dhash = image_dhash(thumb)
+            return ImageInfo(size[0], size[1], dhash, thumbnail)
+
+        with Image.open(_open(source)) as img:
+            width, height = img.size
+            if thumbnail is None:
+                dhash = image_dhash(img) if job.want_hash else None
+                return ImageInfo(width, height, dhash, None)
+            img.thumbnail((thumbnail_size, thumbnail_size))
+            if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA")
+            dhash = image_dhash(img) if job.want_hash else None
+            # Write under a temporary name so readers never see a
+            # half-written thumbnail
+            partial = f"{thumbnail}.{os.getpid()}.tmp"
+            img.save(partial, format="PNG")
+            os.replace(partial, thumbnail)
+    except Exception as e:
+        print(f"Error processing image {job.name}: {e}")
+        return None
+    return ImageInfo(width, height, dhash, thumbnail)
+
+
+def _open(source: ImageSource):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+class ThumbnailCache:
+    """On-disk thumbnails keyed by image file name and mtime
+
+    A changed image gets a new key, so a cached thumbnail is never stale.
+    """
+
+    def __init__(self, path: Optional[Path] = None,
+                 size: Optional[int] = None):
+        self.path = Path(path if path is not None
+                         else config.cache_path / "thumbnails")
+        self.size = size or config.get("images.thumbnail_size", 256)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, name: str, mtime_ns: int) -> Path:
+        """Location of the thumbnail of one version of an image"""
+        key = hashlib.sha1(f"{name}:{mtime_ns}:{self.size}".encode("utf-8"))
+        return self.path / f"{key.hexdigest()[:20]}.png"
+
+    def get(self, name: str, mtime_ns: int) -> Optional[Path]:
+        """Cached thumbnail, or None if it was not generated yet"""
+        path = self.path_for(name, mtime_ns)
+        return path if path.exists() else None
+
+
+class ImageStage:
+    """Extracts image metadata and thumbnails on a process pool
+
+    Decoding screenshots is CPU bound, so batches are spread over worker
+    processes. Small batches, below ``parallel_threshold`` images, are
+    handled in-process to avoid the round-trip.
+    """
+
+    def __init__(self, thumbnails: Optional[ThumbnailCache] = None,
+                 workers: Optional[int] = None,
+                 parallel_threshold: Optional[int] = None):
+        self.thumbnails = thumbnails
+        self.workers = (workers or config.get("images.workers", 0) or
+                        min(4, os.cpu_count() or 1))
+        self.parallel_threshold = (
+            parallel_threshold if parallel_threshold is not None
+            else config.get("images.parallel_threshold", 4)
+        )
+        self._pool: Optional[Executor] = None
+
+    @property
+    def thumbnail_size(self) -> int:
+        return self.thumbnails.size if self.thumbnails is not None else 0
+
+    def job(self, name: str, source: ImageSource, mtime_ns: int,
+            want_hash: bool) -> ImageJob:
+        """Describe an image to analyze"""
+        thumbnail = None
+        if self.thumbnails is not None:
+            thumbnail = str(self.thumbnails.path_for(name, mtime_ns))
+        return ImageJob(name, source, thumbnail, want_hash)
+
+    def analyze(self, jobs: Iterable[ImageJob]) -> Dict[str, ImageInfo]:
+        """Run jobs, returning the results by image file name"""
+        jobs = list(jobs)
+        if len(jobs) < self.parallel_threshold or self.workers < 2:
+            results: Iterable[Optional[ImageInfo]] = [
+                analyze_image(job, self.thumbnail_size) for job in jobs
+            ]
+        else:
+            results = self._executor().map(
+                analyze_image, jobs, [self.thumbnail_size] * len(jobs),
+                chunksize=max(1, len(jobs) // (self.workers * 4))
+            )
+        return {job.name: info for job, info in zip(jobs, results)
+                if info is not None}
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            # Workers are spawned, not forked, as the GUI runs threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self) -> None:
+        """Shut the worker processes down"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
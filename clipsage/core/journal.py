@@ -0,0 +1,86 @@
+"""
+Change journal for incremental clipboard refreshes
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class FileSignature(NamedTuple):
+    """Cheap identity of a clipboard file taken from a single stat call"""
+    name: str
+    mtime_ns: int
+    size: int
+
+
+EntrySignature = Tuple[FileSignature, ...]
+
+
+@dataclass
+class RefreshDiff:
+    """Entry keys that changed between two refreshes"""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    @property
+    def changed(self) -> List[str]:
+        """Entry keys whose content has to be (re)processed"""
+        return self.added + self.updated
+
+    def __str__(self) -> str:
+        return (f"+{len(self.added)} ~{len(self.updated)} "
+                f"-{len(self.removed)}")
+
+
+class ChangeJournal:
+    """Remembers the file signatures of every processed clipboard entry"""
+
+    def __init__(self):
+        self._signatures: Dict[str, EntrySignature] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, entry_key: str) -> bool:
+        return entry_key in self._signatures
+
+    def diff(self, snapshot: Dict[str, EntrySignature],
+             force: bool = False,
+             keys: Optional[Iterable[str]] = None) -> RefreshDiff:
+        """Compare a directory snapshot with the journal and record it
+
+        With ``force`` every known entry is reported as updated even if its
+        signature did not change. When ``keys`` is given the snapshot only
+        covers those entries, and only they can be reported as removed.
+        """
+        result = RefreshDiff()
+
+        for entry_key, signature in snapshot.items():
+            previous = self._signatures.get(entry_key)
+            if previous is None:
+                result.added.append(entry_key)
+            elif force or previous != signature:
+                result.updated.append(entry_key)
+
+        scope = self._signatures if keys is None else keys
+        result.removed = [key for key in scope
+                          if key in self._signatures and key not in snapshot]
+
+        for entry_key in result.removed:
+            del self._signatures[entry_key]
+        self._signatures.update(snapshot)
+
+        return result
+
+    def discard(self, entry_keys: Iterable[str]) -> None:
+        """Forget entries so the next refresh reports them as added again"""
+        for entry_key in entry_keys:
+            self._signatures.pop(entry_key, None)
+
+    def clear(self) -> None:
+        """Forget every recorded entry"""
+        self._signatures.clear()
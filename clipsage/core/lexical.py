@@ -0,0 +1,113 @@
+"""
+Lexical (BM25) search over clipboard entries
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+
+# Words plus compound tokens such as hostnames, paths and error codes
+_TOKEN_RE = re.compile(r"[0-9a-z_]+(?:[.:/@\-][0-9a-z_]+)*")
+_SPLIT_RE = re.compile(r"[._:/@\-]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms
+
+    Compound tokens like ``db-01.prod.local`` or ``ERR_CONN_RESET`` are
+    indexed whole and additionally as their parts, so both exact and
+    partial queries match.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        parts = [part for part in _SPLIT_RE.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]],
+                           k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists into one, best first"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Incrementally updated inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing an earlier version with the same id"""
+        self.remove(doc_id)
+        terms = dict(Counter(tokenize(text)))
+        self._doc_terms[doc_id] = terms
+        self._lengths[doc_id] = sum(terms.values())
+        self._total_length += self._lengths[doc_id]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index if present"""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        """Remove every document"""
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._lengths.clear()
+        self._total_length = 0
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to k (id, BM25 score) pairs, best first"""
+        doc_count = len(self._doc_terms)
+        if k <= 0 or not doc_count:
+            return []
+
+        average_length = self._total_length / doc_count or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) /
+                           (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b *
+                                  self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + (
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+                )
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,415 @@
+"""
+Memory-mapped, persistent vector index for ClipSage
+
+The index lives in two files next to each other:
+
+``<name>.vec``
+    A fixed 256 byte header (magic, format version, dimension, row count,
+    generation and model name) followed by the float32 matrix, one
+    normalized row per vector. Rows are only ever appended.
+
+``<name>.ids``
+    An append-only journal. The first line names the generation of the
+    matching ``.vec`` file, every following line either binds a row to an
+    id (``+``) or deletes an id (``-``).
+
+Appends write the rows first, then bump the row count in the header and
+only then journal the ids, so a crash leaves at worst a few unreferenced
+rows behind. Compaction writes both files under temporary names and
+renames them into place; a generation mismatch between the two files is
+detected on open and the index is rebuilt instead of trusted.
+
+The GUI, the daemon and the command line can all open the same index, so
+every change holds an exclusive ``flock`` on ``<name>.lock`` and first
+catches up with whatever other processes appended or compacted since.
+"""
+
+import contextlib
+import fcntl
+import os
+import re
+import struct
+from pathlib import Path
+from typing import (
+    BinaryIO, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+)
+
+import numpy as np
+
+from .config import config
+from .vector_index import VectorIndex
+
+
+MAGIC = b"CLIPSVEC"
+FORMAT_VERSION = 1
+HEADER_SIZE = 256
+_HEADER = struct.Struct("<8sIIQQ128s")
+
+
+class IndexFormatError(Exception):
+    """Raised when an index file cannot be used"""
+
+
+class MappedVectorIndex(VectorIndex):
+    """Vector index persisted to disk and opened with ``np.memmap``
+
+    Opening an existing index only parses the header and the id journal;
+    matrix pages are faulted in by the operating system as queries touch
+    them, so startup cost does not depend on the number of vectors.
+    """
+
+    def __init__(self, path: Path, model_name: str,
+                 compact_ratio: float = 0.25):
+        super().__init__(compact_ratio=compact_ratio)
+        self.path = Path(path)
+        self.ids_path = self.path.with_suffix(".ids")
+        self.lock_path = self.path.with_suffix(".lock")
+        self.model_name = model_name
+        self._generation = 0
+        self._journal_offset = 0
+        self._ids_file: Optional[TextIO] = None
+        self._lock_file: Optional[BinaryIO] = None
+        self._lock_depth = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock, self._file_lock():
+            if self.path.exists():
+                self._load_or_discard()
+
+    # Locking
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the lock file shared by every process using the index"""
+        if self._lock_depth == 0:
+            if self._lock_file is None:
+                self._lock_file = open(self.lock_path, "ab")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and self._lock_file is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Lock the files and catch up with other writers"""
+        with self._file_lock():
+            if self._lock_depth == 1:
+                self._sync()
+            yield
+
+    def _sync(self) -> None:
+        """Pick up rows and journal records written by other processes"""
+        if not self.path.exists() or not self.ids_path.exists():
+            if self._journal_offset:
+                # Cleared by another process
+                self._close_journal()
+                self._reset_state()
+            return
+
+        try:
+            dim, rows, generation = self._read_header()
+        except (IndexFormatError, OSError, ValueError):
+            dim, rows, generation = None, 0, -1
+        if (generation != self._generation or dim != self.dim or
+                not self._journal_offset):
+            # Compacted or created elsewhere: start over from the files
+            self._close_journal()
+            self._reset_state()
+            self._load_or_discard()
+            return
+
+        count = len(self._row_ids)
+        if rows > count:
+            self._reserve(rows)
+            self._row_ids.extend([None] * (rows - count))
+            self._map(rows)
+            self._ivf = None
+        with open(self.ids_path, "rb") as f:
+            self._replay_tail(f, len(self._row_ids))
+        self._tombstones = len(self._row_ids) - len(self._rows)
+
+    # Loading
+
+    def _load_or_discard(self) -> None:
+        """Load the files, deleting them if they cannot be used"""
+        try:
+            self._load()
+        except (IndexFormatError, OSError, ValueError) as e:
+            print(f"Discarding vector index {self.path}: {e}")
+            self._reset_state()
+            self._remove_files()
+
+    def _read_header(self) -> Tuple[int, int, int]:
+        """Dimension, usable row count and generation of the matrix file"""
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise IndexFormatError("truncated header")
+
+        magic, version, dim, rows, generation, model = _HEADER.unpack(
+            header[:_HEADER.size]
+        )
+        if magic != MAGIC:
+            raise IndexFormatError("not a ClipSage vector index")
+        if dim == 0:
+            raise IndexFormatError("index has no dimension")
+        if version != FORMAT_VERSION:
+            raise IndexFormatError(f"unsupported format version {version}")
+        if model.rstrip(b"\0").decode("utf-8") != self.model_name:
+            raise IndexFormatError("built with a different embedding model")
+
+        # Rows past the end of the file were never fully written
+        file_rows = (self.path.stat().st_size - HEADER_SIZE) // (dim * 4)
+        return dim, min(rows, file_rows), generation
+
+    def _load(self) -> None:
+        """Map the matrix and replay the id journal"""
+        dim, rows, generation = self._read_header()
+        self.dim = dim
+        self._generation = generation
+        self._map(rows)
+        self._row_ids = [None] * rows
+        self._alive = np.zeros(rows, dtype=bool)
+        self._replay_ids(rows)
+        self._tombstones = rows - len(self._rows)
+
+    def _replay_ids(self, rows: int) -> None:
+        """Rebuild the row table from the id journal"""
+        if not self.ids_path.exists():
+            raise IndexFormatError("missing id journal")
+
+        with open(self.ids_path, "rb") as f:
+            first = f.readline()
+            fields = first.decode("utf-8", "replace").split()
+            if fields[:1] != ["CLIPSIDS"] or len(fields) != 2:
+                raise IndexFormatError("bad id journal header")
+            if int(fields[1]) != self._generation:
+                raise IndexFormatError("id journal from another generation")
+            self._journal_offset = len(first)
+            self._replay_tail(f, rows)
+
+    def _replay_tail(self, f: BinaryIO, rows: int) -> None:
+        """Apply the journal records past the ones already replayed"""
+        f.seek(self._journal_offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # Torn or still being written
+            self._journal_offset += len(raw)
+            # Lines left over from torn writes are skipped
+            fields = raw.decode("utf-8", "replace").rstrip("\n").split("\t")
+            if fields[0] == "+" and len(fields) == 4:
+                if not fields[1].isdigit():
+                    continue
+                row = int(fields[1])
+                if row >= rows:
+                    continue
+                doc_id, content_hash = fields[2], fields[3]
+                old_row = self._rows.get(doc_id)
+                if old_row is not None:
+                    self._alive[old_row] = False
+                    self._row_ids[old_row] = None
+                self._rows[doc_id] = row
+                self._row_ids[row] = doc_id
+                self._alive[row] = True
+                if content_hash:
+                    self._hashes[doc_id] = content_hash
+            elif fields[0] == "-" and len(fields) == 2:
+                row = self._rows.pop(fields[1], None)
+                self._hashes.pop(fields[1], None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._row_ids[row] = None
+
+    def _map(self, rows: int) -> None:
+        """(Re)map the first ``rows`` rows of the matrix read-only"""
+        if rows == 0 or self.dim is None:
+            self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+            return
+        self._matrix = np.memmap(self.path, dtype=np.float32, mode="r",
+                                 offset=HEADER_SIZE, shape=(rows, self.dim))
+
+    def _reset_state(self) -> None:
+        """Forget everything held in memory"""
+        super().clear()
+        self.dim = None
+        self._generation = 0
+        self._journal_offset = 0
+
+    # Writing
+
+    def _header_bytes(self, rows: int, generation: int) -> bytes:
+        """Pack a file header"""
+        model = self.model_name.encode("utf-8")[:128]
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self.dim or 0, rows,
+                              generation, model)
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _create_files(self) -> None:
+        """Start an empty index on disk"""
+        with open(self.path, "wb") as f:
+            f.write(self._header_bytes(0, self._generation))
+        with open(self.ids_path, "w", encoding="utf-8") as f:
+            f.write(f"CLIPSIDS {self._generation}\n")
+            self._journal_offset = f.tell()
+
+    def _journal(self) -> TextIO:
+        """Return the id journal opened for appending"""
+        if self._ids_file is None:
+            # Terminate a torn last line so it cannot swallow new records
+            torn = False
+            with open(self.ids_path, "rb") as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._ids_file = open(self.ids_path, "a", encoding="utf-8")
+            if torn:
+                self._ids_file.write("\n")
+        return self._ids_file
+
+    def _reserve(self, rows: int) -> None:
+        """Only the alive mask lives in memory; the matrix grows on disk"""
+        if rows <= len(self._alive):
+            return
+        alive = np.zeros(max(rows, len(self._alive) * 2), dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def _write_rows(self, start: int, rows: np.ndarray) -> None:
+        """Append rows to the matrix file and bump the header row count"""
+        if not self.path.exists() or not self.ids_path.exists():
+            self._create_files()
+
+        with open(self.path, "r+b") as f:
+            f.seek(HEADER_SIZE + start * self.dim * 4)
+            f.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+            f.flush()
+            f.seek(0)
+            f.write(self._header_bytes(start + len(rows), self._generation))
+        self._map(start + len(rows))
+
+    def _record_added(self, start: int, ids: Sequence[str],
+                      hashes: Optional[Sequence[str]]) -> None:
+        """Bind the new rows to their ids in the journal"""
+        journal = self._journal()
+        for offset, doc_id in enumerate(ids):
+            content_hash = hashes[offset] if hashes is not None else ""
+            journal.write(f"+\t{start + offset}\t{doc_id}\t{content_hash}\n")
+        self._flush_journal(journal)
+
+    def _tombstone(self, ids: Iterable[str]) -> None:
+        """Delete ids in memory and in the journal"""
+        removed = [doc_id for doc_id in ids if doc_id in self._rows]
+        super()._tombstone(removed)
+        if removed and self.ids_path.exists():
+            journal = self._journal()
+            for doc_id in removed:
+                journal.write(f"-\t{doc_id}\n")
+            self._flush_journal(journal)
+
+    def _flush_journal(self, journal: TextIO) -> None:
+        """Flush our records; the file lock makes them the last ones"""
+        journal.flush()
+        self._journal_offset = os.fstat(journal.fileno()).st_size
+
+    def _close_journal(self) -> None:
+        """Close the append handle of the id journal"""
+        if self._ids_file is not None:
+            self._ids_file.close()
+            self._ids_file = None
+
+    def compact(self) -> None:
+        """Rewrite both files without tombstones and swap them in"""
+        with self._lock, self._writing():
+            if self.dim is None:
+                return
+
+            count = len(self._row_ids)
+            live = np.flatnonzero(self._alive[:count])
+            row_ids = [self._row_ids[row] for row in live]
+            generation = self._generation + 1
+
+            vec_tmp = self.path.with_name(self.path.name + ".tmp")
+            ids_tmp = self.ids_path.with_name(self.ids_path.name + ".tmp")
+            with open(vec_tmp, "wb") as f:
+                f.write(self._header_bytes(len(live), generation))
+                for start in range(0, len(live), 4096):
+                    rows = np.asarray(self._matrix[live[start:start + 4096]])
+                    f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(ids_tmp, "w", encoding="utf-8") as f:
+                f.write(f"CLIPSIDS {generation}\n")
+                for row, doc_id in enumerate(row_ids):
+                    f.write(f"+\t{row}\t{doc_id}\t"
+                            f"{self._hashes.get(doc_id, '')}\n")
+                f.flush()
+                os.fsync(f.fileno())
+                journal_size = f.tell()
+
+            self._close_journal()
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            os.replace(vec_tmp, self.path)
+            os.replace(ids_tmp, self.ids_path)
+
+            self._generation = generation
+            self._journal_offset = journal_size
+            if self._ivf is not None:
+                self._ivf.remap(live)
+            self._row_ids = row_ids
+            self._rows = {doc_id: row for row, doc_id in enumerate(row_ids)}
+            self._alive = np.ones(len(row_ids), dtype=bool)
+            self._tombstones = 0
+            self._map(len(row_ids))
+
+    def clear(self) -> None:
+        """Remove every vector, on disk as well"""
+        with self._lock, self._file_lock():
+            self._close_journal()
+            self._reset_state()
+            self._remove_files()
+
+    def close(self) -> None:
+        """Release the file handles and the memory map"""
+        with self._lock:
+            self._close_journal()
+            self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+            if self._lock_file is not None and not self._lock_depth:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _remove_files(self) -> None:
+        """Delete the index files if they exist"""
+        for path in (self.path, self.ids_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def index_path_for(model_name: str, clipboard_path: Path) -> Path:
+    """Location of the persisted index of a clipboard directory
+
+    Loading a history prunes vectors of entries it does not have, so
+    every directory needs an index of its own.
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_")
+    return (config.cache_path / "index" /
+            config.history_key(clipboard_path) / f"{slug or 'default'}.vec")
+
+
+def open_default_index(model_name: str,
+                       clipboard_path: Path) -> VectorIndex:
+    """Open the persisted index, falling back to an in-memory one"""
+    if not config.get("vector_index.persist", True):
+        return VectorIndex()
+
+    try:
+        return MappedVectorIndex(index_path_for(model_name, clipboard_path),
+                                 model_name)
+    except OSError as e:
+        print(f"Error opening vector index: {e}")
+        return VectorIndex()
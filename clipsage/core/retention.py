@@ -0,0 +1,232 @@
+"""
+Retention policy that keeps the clipboard history within its budgets
+"""
+
+import gzip
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+
+from .config import config
+from .catalog import CatalogEntry, ClipCatalog
+from .cold_storage import ColdStorage
+
+
+# Called with the keys of the entries that were just evicted
+EvictionCallback = Callable[[Set[str]], None]
+
+
+@dataclass
+class RetentionPolicy:
+    """Budgets for the clipboard history; 0 disables a budget
+
+    ``action`` says what happens to the files of evicted entries:
+    "archive" moves them to the archive directory (text gzip-compressed),
+    "delete" removes them.
+    """
+    max_items: int = 0
+    max_age_days: float = 0
+    max_bytes: int = 0
+    action: str = "archive"
+
+    @classmethod
+    def from_config(cls) -> "RetentionPolicy":
+        """Policy from the ``max_items`` and ``retention.*`` settings"""
+        return cls(
+            max_items=config.get("retention.max_items",
+                                 config.get("max_items", 0)) or 0,
+            max_age_days=config.get("retention.max_age_days", 0) or 0,
+            max_bytes=config.get("retention.max_bytes", 0) or 0,
+            action=config.get("retention.action", "archive")
+        )
+
+    @property
+    def active(self) -> bool:
+        """Whether any budget is set"""
+        return bool(self.max_items or self.max_age_days or self.max_bytes)
+
+
+def select_evictions(entries: Iterable[CatalogEntry],
+                     policy: RetentionPolicy,
+                     now: Optional[datetime] = None) -> List[CatalogEntry]:
+    """Entries to evict, given all entries newest first
+
+    The newest entries that fit every budget are kept; the first entry
+    that exceeds one, and everything older, is evicted. An entry larger
+    than the whole byte budget is kept without counting against it, as
+    evicting everything older would still not make it fit.
+    """
+    cutoff = None
+    if policy.max_age_days:
+        cutoff = ((now or datetime.now()) -
+                  timedelta(days=policy.max_age_days)
+                  ).strftime("%Y-%m-%d %H:%M:%S")
+
+    evicted = []
+    kept = total_bytes = 0
+    for entry in entries:
+        if not evicted:
+            kept += 1
+            size = entry.text_bytes + entry.image_bytes
+            if not policy.max_bytes or size <= policy.max_bytes:
+                total_bytes += size
+            within = ((not policy.max_items or kept <= policy.max_items) and
+                      (not policy.max_bytes or
+                       total_bytes <= policy.max_bytes) and
+                      (cutoff is None or entry.created >= cutoff))
+            if within:
+                continue
+        evicted.append(entry)
+    return evicted
+
+
+class RetentionManager:
+    """Enforces a RetentionPolicy against the catalog in the background
+
+    Every ``interval`` seconds the catalog is checked against the policy.
+    Evicted entries lose their catalog rows and their files are archived
+    or deleted; ``on_evicted`` then gets their keys so the search index
+    can drop them too (a partial refresh). Entries older than
+    ``cold_after_days`` that are kept are packed into ``cold_storage``,
+    where they stay listed and searchable.
+    """
+
+    def __init__(self, catalog: ClipCatalog,
+                 policy: Optional[RetentionPolicy] = None,
+                 archive_path: Optional[Path] = None,
+                 on_evicted: Optional[EvictionCallback] = None,
+                 interval: Optional[float] = None,
+                 cold_storage: Optional[ColdStorage] = None,
+                 cold_after_days: Optional[float] = None):
+        self.catalog = catalog
+        self.policy = policy or RetentionPolicy.from_config()
+        self.archive_path = Path(
+            archive_path if archive_path is not None
+            else config.get("retention.archive_path",
+                            str(config.cache_path / "archive"))
+        )
+        self.on_evicted = on_evicted
+        self.interval = (interval if interval is not None
+                         else config.get("retention.interval", 600))
+        self.cold_storage = cold_storage
+        self.cold_after_days = (
+            cold_after_days if cold_after_days is not None
+            else config.get("cold_storage.after_days", 30)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def active(self) -> bool:
+        """Whether there is anything to enforce"""
+        return self.policy.active or (self.cold_storage is not None and
+                                      bool(self.cold_after_days))
+
+    def enforce(self) -> List[str]:
+        """Apply the policy once, returning the evicted entry keys"""
+        keys = self._evict() if self.policy.active else []
+        if self.cold_storage is not None and self.cold_after_days:
+            self.pack_old_entries()
+        return keys
+
+    def pack_old_entries(self) -> List[str]:
+        """Move entries older than cold_after_days to cold storage"""
+        cutoff = (datetime.now() - timedelta(days=self.cold_after_days)
+                  ).strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            packed = self.cold_storage.pack(self.catalog.iter(until=cutoff))
+        if packed:
+            print(f"Moved {len(packed)} clipboard entries to cold storage")
+        return packed
+
+    def _evict(self) -> List[str]:
+        """Evict the entries outside the policy's budgets"""
+        with self._lock:
+            evicted = select_evictions(self.catalog.iter(), self.policy)
+            keys = []
+            for entry in evicted:
+                try:
+                    if self.policy.action == "delete":
+                        self._delete(entry)
+                    else:
+                        self._archive(entry)
+                except OSError as e:
+                    print(f"Error evicting clipboard entry "
+                          f"{entry.entry_id}: {e}")
+                    continue
+                keys.append(entry.entry_id)
+            self.catalog.remove_many(keys)
+            if self.cold_storage is not None and keys:
+                self.cold_storage.remove(keys)
+                self.cold_storage.compact()
+
+        if keys:
+            print(f"Evicted {len(keys)} clipboard entries "
+                  f"({self.policy.action})")
+            if self.on_evicted is not None:
+                self.on_evicted(set(keys))
+        return keys
+
+    def _archive(self, entry: CatalogEntry) -> None:
+        """Move an entry's files to the archive, compressing its text"""
+        self.archive_path.mkdir(parents=True, exist_ok=True)
+        for kind, path in entry.files.items():
+            if not path.exists():
+                data = (self.cold_storage.read(path.name)
+                        if self.cold_storage is not None else None)
+                if data is None:
+                    continue
+                # Packed entries are archived from cold storage
+                if kind == "text":
+                    with gzip.open(self.archive_path / f"{path.name}.gz",
+                                   "wb") as dst:
+                        dst.write(data)
+                else:
+                    (self.archive_path / path.name).write_bytes(data)
+            elif kind == "text":
+                target = self.archive_path / f"{path.name}.gz"
+                with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                path.unlink()
+            else:
+                # Images are already compressed
+                shutil.move(str(path), str(self.archive_path / path.name))
+
+    @staticmethod
+    def _delete(entry: CatalogEntry) -> None:
+        """Remove an entry's files"""
+        for path in entry.files.values():
+            path.unlink(missing_ok=True)
+
+    def start(self) -> None:
+        """Enforce now and then every interval, on a daemon thread"""
+        if self.running or not self.active:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="clipsage-retention")
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.enforce()
+            except Exception as e:
+                print(f"Error enforcing clipboard retention: {e}")
+            self._stop.wait(self.interval)
@@ -2,132 +2,677 @@
 Semantic search functionality for clipboard manager
 """
 
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_core.documents import Document
-from langchain_ollama import OllamaEmbeddings
-from PIL import Image
+from typing import (
+    List, Dict, Any, Iterable, Iterator, Optional, Sequence, Set, Tuple
+)
 
 from .config import config
+from .chunking import TextChunker, chunk_id, split_vector_id
+from .cold_storage import ColdStorage, open_default_cold_storage
+from .dedup import fingerprint, group_id
+from .embeddings import EmbeddingBackend, create_backend
+from .images import ImageInfo, ImageStage, ThumbnailCache, png_size
+from .embedding_pipeline import Document, EmbeddingPipeline, ProgressCallback
+from .embedding_cache import (
+    CachedEmbeddings, EmbeddingCache, content_hash, open_default_cache
+)
+from .vector_index import VectorIndex
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .query_cache import LRUCache
+from .mapped_index import MappedVectorIndex, open_default_index
+from .catalog import (
+    ENTRY_SUFFIXES, CatalogEntry, ClipCatalog, entry_kind,
+    open_default_catalog, parse_entry_key, parse_entry_time
+)
+from .journal import (
+    ChangeJournal, EntrySignature, FileSignature, RefreshDiff
+)
+
+# Bumped whenever the layout of a saved index snapshot changes
+SNAPSHOT_VERSION = 1
 
 
 class ClipboardSemanticSearch:
     """Semantic search functionality for clipboard manager"""
     
     def __init__(self, model_name: Optional[str] = None,
-                 clipboard_path: Optional[Path] = None):
-        self.model_name = model_name or config.embedding_model
-        self.embed = OllamaEmbeddings(model=self.model_name)
-        self.vector_store = InMemoryVectorStore(self.embed)
+                 clipboard_path: Optional[Path] = None,
+                 embeddings: Optional[EmbeddingBackend] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 vector_index: Optional[VectorIndex] = None,
+                 catalog: Optional[ClipCatalog] = None,
+                 cold_storage: Optional[ColdStorage] = None,
+                 images: Optional[ImageStage] = None,
+                 load_data: bool = True):
+        # The backend comes from embeddings.backend unless one is given;
+        # its model id keys the persisted vectors and cached embeddings
+        self.backend: EmbeddingBackend = (embeddings or
+                                          create_backend(model=model_name))
+        self.model_name = (getattr(self.backend, "model_id", None) or
+                           model_name or config.embedding_model)
+        self.embed = self.backend
+        
+        # Only content that was never embedded reaches the backend
+        if embedding_cache is None:
+            embedding_cache = open_default_cache()
+        self.embedding_cache = embedding_cache
+        if self.embedding_cache is not None:
+            self.embed = CachedEmbeddings(self.embed, self.embedding_cache,
+                                          self.model_name)
+        
         self.clipboard_path = clipboard_path or config.clipboard_path
-        self.documents = []
-        self.file_mapping = {}  # Maps document ids to file paths
+        # Persisted vectors survive restarts, so startup only maps a file
+        if vector_index is None:
+            vector_index = open_default_index(self.model_name,
+                                              self.clipboard_path)
+        self.vector_index = vector_index
+        self.lexical_index = BM25Index()
+        self.vector_index.configure_ann(
+            mode=config.get("search.ann_mode", "ivf"),
+            threshold=config.get("search.ann_threshold", 20000),
+            nlist=config.get("search.nlist", 0),
+            nprobe=config.get("search.nprobe", 8)
+        )
+        self.pipeline = EmbeddingPipeline(self.embed, self._store_vectors)
+        # Listing and lookups are indexed queries against the catalog
+        if catalog is None:
+            catalog = open_default_catalog(self.clipboard_path)
+        self.catalog = catalog
+        # Old entries may live in compressed segments instead of files
+        if (cold_storage is None and
+                config.get("cold_storage.enabled", True)):
+            cold_storage = open_default_cold_storage(self.clipboard_path)
+        self.cold_storage = cold_storage
+        # Images are decoded on a process pool, thumbnails cached on disk
+        if images is None:
+            images = ImageStage(ThumbnailCache()
+                                if config.get("images.thumbnails", True)
+                                else None)
+        self.images = images
+        # Lean per-entry records keyed by document id; content stays on
+        # disk and is read by load_content when it is actually needed
+        self.entries: Dict[str, CatalogEntry] = {}
+        # Entries with the same content share one group id under which
+        # the lexical and vector indexes hold a single copy
+        self.groups: Dict[str, List[str]] = {}
+        # Long entries are embedded as several passages; their character
+        # spans are kept here (single-passage groups are not listed)
+        self.chunker = TextChunker()
+        self.chunk_spans: Dict[str, List[Tuple[int, int]]] = {}
+        self.journal = ChangeJournal()  # Tracks processed entry files
+        # Groups a refresh without embedding left without vectors
+        self.unembedded: Set[str] = set()
+        
+        # Bumped on every index change; cached results carry it in the key
+        self.generation = 0
+        cache_size = config.get("search.query_cache_size", 256)
+        self.query_vectors = LRUCache(cache_size)
+        self.query_results = LRUCache(cache_size)
+        
+        # Searches may run on other threads while a refresh is embedding;
+        # _lock guards the document tables, _refresh_lock serializes
+        # refreshes themselves
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
         
         # Ensure clipboard directory exists
         if not self.clipboard_path.exists():
             self.clipboard_path.mkdir(parents=True, exist_ok=True)
         
-        # Load existing clipboard data
-        self.refresh_data()
+        # Load existing clipboard data unless the caller defers it
+        if load_data:
+            self.refresh_data()
     
-    def refresh_data(self):
-        """Refresh clipboard data from the filesystem"""
+    def refresh_data(self, force: bool = False,
+                     progress: Optional[ProgressCallback] = None,
+                     entry_keys: Optional[Iterable[str]] = None,
+                     embed: bool = True) -> RefreshDiff:
+        """Incrementally refresh clipboard data from the filesystem
+
+        Only entries whose files were added, modified or deleted since the
+        previous refresh are re-read and re-embedded. The returned diff is
+        empty when nothing changed, so callers can skip their own work.
+        ``progress`` is called with (0, total) once the changed entries are
+        listed, before embedding starts, and with (embedded, total) after
+        every batch.
+        ``entry_keys`` limits the refresh to those entries, e.g. the ones a
+        filesystem watcher saw change, instead of scanning the directory.
+        With ``embed`` False nothing is sent to the embedding backend:
+        vectors persisted earlier are reused, and entries without one are
+        listed and lexically searchable until a later refresh embeds them.
+        Safe to call from a worker thread while searches are running.
+        """
+        with self._refresh_lock:
+            return self._refresh(force, progress, entry_keys, embed)
+    
+    def _refresh(self, force: bool, progress: Optional[ProgressCallback],
+                 entry_keys: Optional[Iterable[str]],
+                 embed: bool = True) -> RefreshDiff:
+        """Body of refresh_data, run with the refresh lock held"""
         if not self.clipboard_path.exists():
-            return
+            return RefreshDiff()
+        
+        initial_load = len(self.journal) == 0
+        if initial_load:
+            entry_keys = None  # Nothing known yet, scan everything
+        if entry_keys is not None:
+            entry_keys = set(entry_keys)
+        if embed and self.unembedded:
+            # Catch up on the groups an earlier refresh did not embed
+            with self._lock:
+                skipped = [self.entries[doc_id].entry_id
+                           for group in self.unembedded
+                           for doc_id in self.groups.get(group, [])]
+                self.journal.discard(skipped)
+                self.unembedded.clear()
+            if entry_keys is not None:
+                entry_keys.update(skipped)
+        entries, snapshot = self._scan_entries(entry_keys)
+        diff = self.journal.diff(snapshot, force=force, keys=entry_keys)
+        if not diff:
+            return diff
         
-        self.documents = []
-        self.file_mapping = {}
+        # Process new and modified entries, oldest first so that the same
+        # entry represents a group of duplicates on every run
         text_documents = []
+        chunk_documents: Dict[str, List[Document]] = {}
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        image_info = self._analyze_images(diff.changed, entries, snapshot)
+        for entry_key in sorted(diff.changed):
+            doc = self._build_document(entry_key, entries[entry_key],
+                                       images=image_info)
+            if doc is None:
+                continue
+            text_documents.append(doc)
+            group = self._group_id(doc.id, doc.metadata.get("fingerprint"))
+            if group in chunk_documents:
+                continue  # Duplicate of an entry earlier in this batch
+            chunks = self.chunker.split(doc.page_content)
+            if len(chunks) == 1:
+                chunk_documents[group] = [
+                    Document(id=group, page_content=doc.page_content)
+                ]
+                continue
+            spans[group] = [(chunk.start, chunk.end) for chunk in chunks]
+            chunk_documents[group] = [
+                Document(id=chunk_id(group, index), page_content=chunk.text)
+                for index, chunk in enumerate(chunks)
+            ]
         
-        # Get all clipboard files
-        clipboard_files = list(self.clipboard_path.glob("*"))
-        
-        # Group files by clipboard entry
-        entries = {}
-        for file_path in clipboard_files:
-            filename = file_path.name
-            # Extract counter and timestamp from filename
-            if filename.startswith("clip_"):
-                parts = filename.split("_")
-                if len(parts) >= 3:
-                    counter = parts[1]
-                    # Get date and time parts
-                    timestamp = "_".join(parts[2:]).split("_")[0:3]
-                    timestamp_str = "_".join(timestamp)
-                    
-                    entry_key = f"{counter}_{timestamp_str}"
-                    if entry_key not in entries:
-                        entries[entry_key] = {}
-                    
-                    # Only process text and image files
-                    if filename.endswith("_text.txt"):
-                        entries[entry_key]["text"] = file_path
-                    elif filename.endswith("_image.png"):
-                        entries[entry_key]["image"] = file_path
-                    # Skip HTML, URLs, and formats files
-        
-        # Process each clipboard entry
-        for entry_key, files in entries.items():
-            doc_id = f"clip_{entry_key}"
-            content = ""
-            metadata = {
-                "entry_id": entry_key,
-                "files": files,
-                "timestamp": self._extract_timestamp(entry_key),
-                "type": "mixed"
-            }
+        with self._lock:
+            self._bump_generation()
+            
+            # Detach deleted and modified entries from their groups
+            touched = set()
+            for entry_key in diff.removed + diff.updated + diff.added:
+                doc_id = f"clip_{entry_key}"
+                entry = self.entries.pop(doc_id, None)
+                if entry is None:
+                    continue
+                group = self._group_id(doc_id, entry.fingerprint)
+                self.groups[group].remove(doc_id)
+                touched.add(group)
+            # Without deduplication a group is keyed by its entry, not its
+            # content, so an edited entry rejoining it must be re-indexed
+            emptied = {group for group in touched if not self.groups[group]}
+            
+            # Groups seen for the first time are indexed with the content
+            # of their first entry; duplicates only join the member list
+            records = []
+            pending_groups = []
+            for doc in text_documents:
+                entry = self._catalog_entry(
+                    doc, snapshot[doc.metadata["entry_id"]]
+                )
+                records.append(entry)
+                self.entries[doc.id] = entry
+                group = self._group_id(doc.id, entry.fingerprint)
+                if group not in self.lexical_index or group in emptied:
+                    emptied.discard(group)
+                    old_vectors = set(self._vector_ids(group))
+                    self.lexical_index.add(group, doc.page_content)
+                    self.chunk_spans.pop(group, None)
+                    if group in spans:
+                        self.chunk_spans[group] = spans[group]
+                    self.vector_index.remove(
+                        old_vectors - set(self._vector_ids(group))
+                    )
+                    pending_groups.append(group)
+                elif (group not in pending_groups and
+                        self.vector_index.content_hash(
+                            self._vector_ids(group)[0]) is None):
+                    pending_groups.append(group)  # Embedding failed before
+                self.groups.setdefault(group, []).append(doc.id)
+            
+            # Groups without members left lose their index entries
+            stale_vectors = []
+            for group in touched:
+                if self.groups.get(group):
+                    continue
+                self.groups.pop(group, None)
+                self.lexical_index.remove(group)
+                stale_vectors.extend(self._vector_ids(group))
+                self.chunk_spans.pop(group, None)
+            self.vector_index.remove(stale_vectors)
+            
+            self.catalog.remove_many(diff.removed + diff.updated)
+            self.catalog.upsert_many(records)
+            
+            # Persisted indexes may still hold deleted entries
+            if initial_load:
+                live = {vector_id for group in self.groups
+                        for vector_id in self._vector_ids(group)}
+                self.vector_index.remove([vector_id for vector_id
+                                          in self.vector_index.ids
+                                          if vector_id not in live])
+                self.catalog.retain(entry.entry_id
+                                    for entry in self.entries.values())
+        
+        # Vectors persisted by an earlier run are reused as they are; only
+        # passages still to be embedded keep their content past this point
+        pending = [doc for group in pending_groups
+                   for doc in chunk_documents.get(group, [])
+                   if self.vector_index.content_hash(doc.id) !=
+                   content_hash(doc.page_content)]
+        del text_documents, chunk_documents
+        
+        # Entries are listed and lexically searchable from here on
+        if progress is not None:
+            progress(0, len(pending))
+        
+        # Embed in batches; vectors become searchable as batches finish
+        if pending:
+            if embed:
+                stats = self.pipeline.run(pending, progress=progress)
+                failed_ids = stats.failed_ids
+                if stats.embedded:
+                    print(f"Embedded {stats.embedded} passages for "
+                          f"semantic search")
+                if failed_ids:
+                    print(f"Failed to embed {len(failed_ids)} passages")
+            else:
+                # Left for the next refresh that embeds
+                with self._lock:
+                    self.unembedded.update(split_vector_id(doc.id)[0]
+                                           for doc in pending)
+                failed_ids = []
+            if failed_ids:
+                # Retry these entries on the next refresh
+                failed = {split_vector_id(doc_id)[0]
+                          for doc_id in failed_ids}
+                with self._lock:
+                    self.journal.discard([
+                        self.entries[doc_id].entry_id
+                        for group in failed
+                        for doc_id in self.groups.get(group, [])
+                    ])
+        
+        return diff
+    
+    @property
+    def snapshot_path(self) -> Path:
+        """Default location of this history's index snapshot"""
+        key = f"{self.clipboard_path.resolve()}:{self.model_name}"
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        return config.cache_path / "snapshots" / f"{name}.pickle"
+    
+    def _snapshot_key(self) -> Tuple[Any, ...]:
+        """Settings a snapshot is only valid for"""
+        return (SNAPSHOT_VERSION, str(self.clipboard_path.resolve()),
+                self.model_name, config.get("dedup.enabled", True),
+                self.chunker.window, self.chunker.overlap,
+                self.chunker.max_chunks)
+    
+    def save_snapshot(self, path: Optional[Path] = None) -> None:
+        """Save the in-memory index tables so a later process can skip
+        re-reading the whole history
+        
+        Vectors are persisted by the vector index itself; the snapshot
+        holds the journal, entry records, duplicate groups, passage spans
+        and the lexical index.
+        """
+        path = Path(path or self.snapshot_path)
+        with self._lock:
+            data = pickle.dumps({
+                "key": self._snapshot_key(),
+                "journal": self.journal,
+                "entries": self.entries,
+                "groups": self.groups,
+                "chunk_spans": self.chunk_spans,
+                "lexical_index": self.lexical_index,
+                "unembedded": self.unembedded,
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            partial.write_bytes(data)
+            os.replace(partial, path)
+        except OSError as e:
+            print(f"Error saving index snapshot: {e}")
+    
+    def load_snapshot(self, path: Optional[Path] = None) -> bool:
+        """Restore the tables saved by save_snapshot before the first
+        refresh, which then only processes entries changed since
+        
+        Returns False, leaving the index empty, if there is no usable
+        snapshot for the current settings.
+        """
+        path = Path(path or self.snapshot_path)
+        if len(self.journal) or not path.exists():
+            return False
+        try:
+            data = pickle.loads(path.read_bytes())
+        except Exception as e:
+            print(f"Error loading index snapshot: {e}")
+            return False
+        if (not isinstance(data, dict) or
+                data.get("key") != self._snapshot_key()):
+            return False  # Taken with other settings, rebuild instead
+        
+        with self._lock:
+            self.journal = data["journal"]
+            self.entries = data["entries"]
+            self.groups = data["groups"]
+            self.chunk_spans = data["chunk_spans"]
+            self.lexical_index = data["lexical_index"]
+            self.unembedded = data["unembedded"]
+            # The vector index may have been reset since the snapshot
+            self.unembedded.update(
+                group for group in self.groups
+                if self.vector_index.content_hash(
+                    self._vector_ids(group)[0]) is None
+            )
+            self._bump_generation()
+        return True
+    
+    def _store_vectors(self, documents: List[Document],
+                       vectors: List[List[float]]) -> None:
+        """Pipeline sink writing finished batches into the vector index"""
+        self.vector_index.add(
+            [doc.id for doc in documents], vectors,
+            hashes=[content_hash(doc.page_content) for doc in documents]
+        )
+        with self._lock:
+            self._bump_generation()
+    
+    def _group_id(self, doc_id: str, entry_fingerprint: Optional[str]) -> str:
+        """Index id of the duplicate group a document belongs to"""
+        if entry_fingerprint:
+            return group_id(entry_fingerprint)
+        return doc_id  # Deduplication disabled, every entry stands alone
+    
+    def _vector_ids(self, group: str) -> List[str]:
+        """Ids under which a group's vectors are stored"""
+        spans = self.chunk_spans.get(group)
+        if not spans:
+            return [group]
+        return [chunk_id(group, index) for index in range(len(spans))]
+    
+    def _bump_generation(self) -> None:
+        """Invalidate cached search results after an index change"""
+        self.generation += 1
+        self.query_results.clear()
+    
+    def _scan_entries(self, entry_keys: Optional[Set[str]] = None
+                      ) -> Tuple[Dict[str, Dict[str, Path]],
+                                 Dict[str, EntrySignature]]:
+        """Group clipboard files by entry and collect their signatures
+        
+        With ``entry_keys`` only the files of those entries are stat'ed
+        and the directory is not listed at all.
+        """
+        entries: Dict[str, Dict[str, Path]] = {}
+        signatures: Dict[str, List[FileSignature]] = {}
+        
+        if entry_keys is None:
+            with os.scandir(self.clipboard_path) as it:
+                candidates = [(dir_entry.name, dir_entry) for dir_entry in it]
+        else:
+            candidates = [(f"clip_{key}{suffix}", None)
+                          for key in entry_keys
+                          for suffix in ENTRY_SUFFIXES.values()]
+        
+        for filename, dir_entry in candidates:
+            # Only process text and image files
+            # Skip HTML, URLs, and formats files
+            kind = entry_kind(filename)
+            if kind is None:
+                continue
             
-            # Process text content
-            if "text" in files:
-                try:
-                    text_file = files["text"]
-                    with open(text_file, "r", encoding="utf-8",
-                              errors="ignore") as f:
-                        text_content = f.read().strip()
-                        if text_content:
-                            content += f"Text: {text_content}\n"
-                            metadata["type"] = "text"
-                            metadata["preview"] = text_content[:100]
-                except Exception as e:
-                    print(f"Error reading text file {files['text']}: {e}")
+            entry_key = parse_entry_key(filename)
+            if entry_key is None:
+                continue
             
-            # Handle image content
-            if "image" in files:
-                try:
-                    # For images, we'll add a description
-                    image_path = files["image"]
-                    with Image.open(image_path) as img:
-                        width, height = img.size
-                        img_desc = f"Image: {width}x{height} pixels"
-                        content += f"{img_desc} from {image_path.name}\n"
-                        # If we have no text content, make this an image type
-                        if (not metadata.get("type") or
-                                metadata["type"] == "mixed"):
-                            metadata["type"] = "image"
-                            metadata["preview"] = f"Image ({width}x{height})"
-                        metadata["image_path"] = str(image_path)
-                except Exception as e:
-                    print(f"Error processing image file {files['image']}: {e}")
+            path = self.clipboard_path / filename
+            try:
+                stat = dir_entry.stat() if dir_entry else path.stat()
+            except OSError:
+                # File vanished between listing and stat
+                continue
             
-            # Only add if we have content
-            if content.strip():
-                doc = Document(
-                    page_content=content.strip(),
-                    metadata=metadata
+            entries.setdefault(entry_key, {})[kind] = path
+            signatures.setdefault(entry_key, []).append(
+                FileSignature(filename, stat.st_mtime_ns, stat.st_size)
+            )
+        
+        # Packed entries keep the signatures of the files they replaced,
+        # so moving an entry to cold storage is not seen as a change
+        if self.cold_storage is not None:
+            for stored in self.cold_storage.files(entry_keys):
+                files = entries.setdefault(stored.entry_id, {})
+                if stored.kind in files:
+                    continue  # Not yet deleted after packing
+                files[stored.kind] = self.clipboard_path / stored.name
+                signatures.setdefault(stored.entry_id, []).append(
+                    FileSignature(stored.name, stored.mtime_ns, stored.size)
                 )
-                self.documents.append(doc)
-                self.file_mapping[doc_id] = files
-                text_documents.append(doc)
         
-        # Add documents to vector store if we have any
-        if text_documents:
+        snapshot = {key: tuple(sorted(sigs))
+                    for key, sigs in signatures.items()}
+        return entries, snapshot
+    
+    def _build_document(self, entry_key: str, files: Dict[str, Path],
+                        with_fingerprint: bool = True,
+                        images: Optional[Dict[str, ImageInfo]] = None
+                        ) -> Optional[Document]:
+        """Read the files of one clipboard entry into a document
+        
+        With ``with_fingerprint`` (and ``dedup.enabled``) the metadata also
+        carries the entry's content fingerprint. ``images`` holds results
+        of the image stage by file name; images without one only have
+        their size read from the header.
+        """
+        doc_id = f"clip_{entry_key}"
+        with_fingerprint = (with_fingerprint and
+                            config.get("dedup.enabled", True))
+        text_content = None
+        image_hash = None
+        content = ""
+        metadata = {
+            "entry_id": entry_key,
+            "files": files,
+            "timestamp": self._extract_timestamp(entry_key),
+            "type": "mixed"
+        }
+        
+        # Process text content
+        if "text" in files:
             try:
-                self.vector_store.add_documents(documents=text_documents)
-                count = len(text_documents)
-                print(f"Loaded {count} clipboard entries for semantic search")
+                text_content = self._load_text(files["text"]).strip()
+                if text_content:
+                    content += f"Text: {text_content}\n"
+                    metadata["type"] = "text"
+                    metadata["preview"] = text_content[:100]
             except Exception as e:
-                print(f"Error adding documents to vector store: {e}")
+                print(f"Error reading text file {files['text']}: {e}")
+        
+        # Handle image content
+        if "image" in files:
+            try:
+                # For images, we'll add a description
+                image_path = files["image"]
+                info = (images or {}).get(image_path.name)
+                if info is not None:
+                    width, height = info.width, info.height
+                else:
+                    width, height = self._image_size(image_path)
+                img_desc = f"Image: {width}x{height} pixels"
+                content += f"{img_desc} from {image_path.name}\n"
+                # If we have no text content, make this an image type
+                if (not metadata.get("type") or
+                        metadata["type"] == "mixed"):
+                    metadata["type"] = "image"
+                    metadata["preview"] = f"Image ({width}x{height})"
+                metadata["image_path"] = str(image_path)
+                if with_fingerprint:
+                    # Without a hash the image only matches itself
+                    image_hash = ((info.dhash if info is not None else None)
+                                  or f"file:{image_path.name}")
+            except Exception as e:
+                print(f"Error processing image file {files['image']}: {e}")
+        
+        # Only add if we have content
+        if not content.strip():
+            return None
+        
+        if with_fingerprint:
+            metadata["fingerprint"] = fingerprint(text_content, image_hash)
+        
+        return Document(
+            id=doc_id,
+            page_content=content.strip(),
+            metadata=metadata
+        )
+    
+    def read_file(self, path: Path) -> Optional[bytes]:
+        """Content of a clipboard file, from disk or cold storage"""
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            if self.cold_storage is None:
+                return None
+            return self.cold_storage.read(path.name)
+    
+    def _load_text(self, path: Path) -> str:
+        """Text of a clipboard file, falling back to cold storage"""
+        try:
+            return self._read_text(path)
+        except FileNotFoundError:
+            data = (self.cold_storage.read(path.name)
+                    if self.cold_storage is not None else None)
+            if data is None:
+                raise
+            return data.decode("utf-8", errors="ignore")
+    
+    def _image_source(self, path: Path):
+        """Path of an image file, or its bytes when it was packed"""
+        if path.exists() or self.cold_storage is None:
+            return path
+        data = self.cold_storage.read(path.name)
+        return io.BytesIO(data) if data is not None else path
+    
+    def _image_size(self, path: Path) -> Tuple[int, int]:
+        """Dimensions of an image without decoding its pixels"""
+        size = png_size(path)
+        if size is None and not path.exists():
+            size = png_size(self.read_file(path) or b"")
+        if size is None:
+            # Not a PNG; Pillow reads the header lazily as well
+            from PIL import Image
+            with Image.open(self._image_source(path)) as img:
+                size = img.size
+        return size
+    
+    def _file_mtime(self, path: Path) -> Optional[int]:
+        """Modification time of a clipboard file, also when it was packed"""
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            if self.cold_storage is None:
+                return None
+            stored = self.cold_storage.get(path.name)
+            return stored.mtime_ns if stored is not None else None
+    
+    def _analyze_images(self, entry_keys: Iterable[str],
+                        entries: Dict[str, Dict[str, Path]],
+                        snapshot: Dict[str, EntrySignature]
+                        ) -> Dict[str, ImageInfo]:
+        """Run the image stage over the images of the given entries"""
+        want_hash = config.get("dedup.enabled", True)
+        jobs = []
+        for entry_key in entry_keys:
+            path = entries[entry_key].get("image")
+            if path is None:
+                continue
+            mtime = next(sig.mtime_ns for sig in snapshot[entry_key]
+                         if sig.name == path.name)
+            source = str(path)
+            if not path.exists():
+                source = self.read_file(path)
+                if source is None:
+                    continue
+            jobs.append(self.images.job(path.name, source, mtime,
+                                        want_hash))
+        return self.images.analyze(jobs)
+    
+    def thumbnail(self, path: Path) -> Optional[Path]:
+        """Cached thumbnail of a clipboard image, made now if missing"""
+        thumbnails = self.images.thumbnails
+        mtime = self._file_mtime(path)
+        if thumbnails is None or mtime is None:
+            return None
+        cached = thumbnails.get(path.name, mtime)
+        if cached is not None:
+            return cached
+        source = str(path) if path.exists() else self.read_file(path)
+        if source is None:
+            return None
+        info = self.images.analyze(
+            [self.images.job(path.name, source, mtime, False)]
+        ).get(path.name)
+        if info is None or info.thumbnail is None:
+            return None
+        return Path(info.thumbnail)
+    
+    @staticmethod
+    def _read_text(path: Path) -> str:
+        """Read a clipboard text file, memory-mapping large ones"""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < config.get("search.mmap_threshold", 1 << 20):
+                return f.read().decode("utf-8", errors="ignore")
+            # Decode straight from the mapped pages, skipping a bytes copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return str(view, "utf-8", "ignore")
+    
+    @staticmethod
+    def _catalog_entry(doc: Document,
+                       signature: EntrySignature) -> CatalogEntry:
+        """Catalog row describing a document's entry"""
+        entry_key = doc.metadata["entry_id"]
+        files = doc.metadata.get("files", {})
+        sizes = {entry_kind(sig.name): sig.size for sig in signature}
+        counter = entry_key.split("_")[0]
+        return CatalogEntry(
+            entry_id=entry_key,
+            counter=int(counter) if counter.isdigit() else 0,
+            created=parse_entry_time(entry_key),
+            type=doc.metadata.get("type", "text"),
+            preview=doc.metadata.get("preview", doc.page_content[:100]),
+            text_bytes=sizes.get("text", 0),
+            image_bytes=sizes.get("image", 0),
+            text_path=str(files["text"]) if "text" in files else None,
+            image_path=str(files["image"]) if "image" in files else None,
+            fingerprint=doc.metadata.get("fingerprint", "")
+        )
     
     def _extract_timestamp(self, entry_key: str) -> str:
         """Extract readable timestamp from entry key"""
@@ -147,77 +692,244 @@ class ClipboardSemanticSearch:
             pass
         return entry_key
     
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Perform semantic search on clipboard data"""
+    def search(self, query: str, k: int = 5,
+               mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search clipboard data
+
+        ``mode`` is "semantic" (embeddings), "lexical" (BM25 only, no
+        embedding call) or "hybrid", which fuses both rankings with
+        reciprocal-rank fusion. Defaults to ``search.mode`` from the config.
+        """
         if not query.strip():
             return []
         
-        try:
-            results = self.vector_store.similarity_search(query, k=k)
-            
+        if mode is None:
+            mode = config.get("search.mode", "hybrid")
+            if not config.get("search.enable_semantic", True):
+                mode = "lexical"
+        
+        cache_key = (query, k, mode, self.generation)
+        cached = self.query_results.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        passages: Dict[str, int] = {}  # Best matching chunk per group
+        if mode == "lexical":
+            hits = self._lexical_hits(query, k)
+            semantic_ok = True
+        elif mode == "semantic":
+            semantic = self._semantic_hits(query, k)
+            semantic_ok = semantic is not None
+            hits = [(doc_id, score) for doc_id, score, _ in semantic or []]
+            passages = {doc_id: chunk for doc_id, _, chunk in semantic or []}
+        elif mode == "hybrid":
+            # Rank deeper than k so fusion can promote items from both
+            depth = max(k * 4, 20)
+            semantic = self._semantic_hits(query, depth)
+            semantic_ok = semantic is not None
+            passages = {doc_id: chunk for doc_id, _, chunk in semantic or []}
+            rankings = [
+                [doc_id for doc_id, _ in self._lexical_hits(query, depth)],
+                [doc_id for doc_id, _, _ in semantic or []],
+            ]
+            hits = reciprocal_rank_fusion(
+                rankings, k=config.get("search.rrf_k", 60)
+            )[:k]
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        with self._lock:
             search_results = []
-            for doc in results:
-                preview = doc.metadata.get("preview", doc.page_content[:100])
-                result = {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "preview": preview,
-                    "type": doc.metadata.get("type", "text"),
-                    "timestamp": doc.metadata.get("timestamp", "Unknown"),
-                    "files": doc.metadata.get("files", {})
-                }
-                search_results.append(result)
+            for group, score in hits:
+                members = [self.entries[doc_id]
+                           for doc_id in self.groups.get(group, [])
+                           if doc_id in self.entries]
+                if not members:
+                    continue
+                # Duplicates show up once, as their most recent copy
+                members.sort(key=lambda entry: (entry.created, entry.counter),
+                             reverse=True)
+                item = self._entry_item(members[0], score)
+                if len(members) > 1:
+                    item["duplicates"] = [entry.entry_id
+                                          for entry in members[1:]]
+                    item["timestamps"] = [
+                        self._extract_timestamp(entry.entry_id)
+                        for entry in members
+                    ]
+                # Point at the passage that matched, offsets into content
+                chunk = passages.get(group)
+                spans = self.chunk_spans.get(group)
+                if spans and chunk is not None and chunk < len(spans):
+                    start, end = spans[chunk]
+                    item["passage"] = {"chunk": chunk, "start": start,
+                                       "end": end}
+                search_results.append(item)
             
-            return search_results
+            # Don't remember degraded results of a failed embedding call,
+            # nor results computed against an index that changed since
+            if semantic_ok and cache_key[-1] == self.generation:
+                self.query_results.put(cache_key, search_results)
+        return list(search_results)
+    
+    def _lexical_hits(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Best BM25 matches for the query"""
+        with self._lock:
+            return self.lexical_index.search(query, k=k)
+    
+    def _semantic_hits(self, query: str,
+                       k: int) -> Optional[List[Tuple[str, float, int]]]:
+        """Groups nearest to the query embedding, None on failure
+        
+        Returns (group id, score, chunk number) triples. An entry split
+        into passages scores as its best passage.
+        """
+        try:
+            query_vector = self.query_vectors.get(query)
+            if query_vector is None:
+                query_vector = self.embed.embed_query(query)
+                self.query_vectors.put(query, query_vector)
+            # Several passages of one entry may rank high; look further
+            depth = k * 4 if self.chunk_spans else k
+            vector_hits = self.vector_index.search(query_vector, k=depth)
         except Exception as e:
             print(f"Error performing semantic search: {e}")
-            return []
+            return None
+        
+        best: Dict[str, Tuple[float, int]] = {}
+        for vector_id, score in vector_hits:
+            doc_id, chunk = split_vector_id(vector_id)
+            if doc_id not in best:  # Hits come best first
+                best[doc_id] = (score, chunk)
+        return [(doc_id, score, chunk)
+                for doc_id, (score, chunk) in best.items()][:k]
     
     def get_all_items(self) -> List[Dict[str, Any]]:
-        """Get all clipboard items"""
+        """Get all clipboard items, including their content
+        
+        Content is read from disk for every item; prefer ``iter_items``
+        plus ``load_content`` for anything that does not need it all.
+        """
         items = []
-        for doc in self.documents:
-            preview = doc.metadata.get("preview", doc.page_content[:100])
-            item = {
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "preview": preview,
-                "type": doc.metadata.get("type", "text"),
-                "timestamp": doc.metadata.get("timestamp", "Unknown"),
-                "files": doc.metadata.get("files", {})
-            }
-            items.append(item)
-        
-        # Sort by timestamp (newest first)
-        items.sort(key=lambda x: x["timestamp"], reverse=True)
+        for item in self.iter_items():
+            content = self.load_content(item["metadata"]["entry_id"])
+            if content is not None:
+                item["content"] = content
+                items.append(item)
         return items
     
+    def iter_items(self, offset: int = 0, limit: Optional[int] = None,
+                   since: Optional[str] = None, until: Optional[str] = None,
+                   types: Optional[Sequence[str]] = None
+                   ) -> Iterator[Dict[str, Any]]:
+        """Stream lightweight clipboard items, newest first
+        
+        Items come straight from the catalog's time index and carry no
+        ``content``; fetch it with ``get_item_content`` when needed.
+        ``since`` (inclusive) and ``until`` (exclusive) are
+        ``YYYY-MM-DD[ HH:MM:SS]`` bounds.
+        """
+        for entry in self.catalog.iter(offset=offset, limit=limit,
+                                       types=types, since=since,
+                                       until=until):
+            yield self._entry_item(entry)
+    
+    def count_items(self, since: Optional[str] = None,
+                    until: Optional[str] = None,
+                    types: Optional[Sequence[str]] = None) -> int:
+        """Number of clipboard items matching the iter_items filters"""
+        return self.catalog.count(types=types, since=since, until=until)
+    
+    def _entry_item(self, entry: CatalogEntry,
+                    score: Optional[float] = None) -> Dict[str, Any]:
+        """Convert an entry record into a content-less item dict"""
+        timestamp = self._extract_timestamp(entry.entry_id)
+        files = entry.files
+        item = {
+            "metadata": {
+                "entry_id": entry.entry_id,
+                "files": files,
+                "timestamp": timestamp,
+                "type": entry.type
+            },
+            "preview": entry.preview,
+            "type": entry.type,
+            "timestamp": timestamp,
+            "files": files
+        }
+        if score is not None:
+            item["score"] = score
+        return item
+    
+    def load_content(self, entry_id: str) -> Optional[str]:
+        """Read the full content of an entry from its files"""
+        entry = self.entries.get(f"clip_{entry_id}")
+        if entry is None:
+            entry = self.catalog.get(entry_id)
+        if entry is None:
+            return None
+        doc = self._build_document(entry.entry_id, entry.files,
+                                   with_fingerprint=False)
+        return doc.page_content if doc is not None else None
+    
+    def cleanup(self) -> None:
+        """Stop background work and release persisted resources"""
+        self.pipeline.cancel()
+        if isinstance(self.vector_index, MappedVectorIndex):
+            self.vector_index.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+        if self.cold_storage is not None:
+            self.cold_storage.close()
+        self.images.close()
+        self.catalog.close()
+    
     def get_item_content(self, entry_id: str) -> Optional[Dict[str, Any]]:
         """Get full content of a specific clipboard item"""
-        for doc in self.documents:
-            if doc.metadata.get("entry_id") == entry_id:
-                return {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "files": doc.metadata.get("files", {})
-                }
-        return None
+        entry = self.entries.get(f"clip_{entry_id}")
+        content = self.load_content(entry_id)
+        if entry is None or content is None:
+            return None
+        item = self._entry_item(entry)
+        return {
+            "content": content,
+            "metadata": item["metadata"],
+            "files": item["files"]
+        }
+
+
+# Shared instance for the convenience functions, built on first use rather
+# than at import time (which used to embed the whole history on import)
+_clipboard_search: Optional[ClipboardSemanticSearch] = None
+_clipboard_search_lock = threading.Lock()
+
+
+def get_clipboard_search() -> ClipboardSemanticSearch:
+    """Shared search instance, created and loaded on first call"""
+    global _clipboard_search
+    with _clipboard_search_lock:
+        if _clipboard_search is None:
+            _clipboard_search = ClipboardSemanticSearch()
+        return _clipboard_search
 
 
-# Global instance for backward compatibility
-clipboard_search = ClipboardSemanticSearch()
+def __getattr__(name: str) -> Any:
+    # Backward compatibility for the former module-level instance
+    if name == "clipboard_search":
+        return get_clipboard_search()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def search_clipboard(query: str, k: int = 5) -> List[Dict[str, Any]]:
     """Convenience function for searching clipboard"""
-    return clipboard_search.search(query, k)
+    return get_clipboard_search().search(query, k)
 
 
-def refresh_clipboard_data():
+def refresh_clipboard_data() -> RefreshDiff:
     """Convenience function to refresh clipboard data"""
-    clipboard_search.refresh_data()
+    return get_clipboard_search().refresh_data()
 
 
 def get_all_clipboard_items() -> List[Dict[str, Any]]:
     """Convenience function to get all clipboard items"""
-    return clipboard_search.get_all_items()
\ No newline at end of file
+    return get_clipboard_search().get_all_items()
\ No newline at end of file
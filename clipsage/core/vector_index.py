@@ -0,0 +1,275 @@
+"""
+Contiguous NumPy vector index for ClipSage
+"""
+
+import contextlib
+import math
+import threading
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+import numpy as np
+
+from .ann import IVFIndex
+
+
+class VectorIndex:
+    """Exact cosine-similarity index over a growable float32 matrix
+
+    Rows are normalized on insert so a query is a single matrix-vector
+    product followed by ``argpartition``. Removed rows become tombstones
+    and are compacted away once they exceed ``compact_ratio`` of the rows.
+
+    With ``ann_mode="ivf"`` indexes holding at least ``ann_threshold``
+    vectors are searched approximately through an ``IVFIndex``; smaller
+    ones always use the exact scan.
+    """
+
+    def __init__(self, dim: Optional[int] = None,
+                 initial_capacity: int = 1024,
+                 compact_ratio: float = 0.25):
+        self.dim = dim
+        self.initial_capacity = max(1, initial_capacity)
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+        self._tombstones = 0
+        self.ann_mode = "exact"
+        self.ann_threshold = 20000
+        self.ann_nlist = 0
+        self.nprobe = 8
+        self._ivf: Optional[IVFIndex] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    @property
+    def ids(self) -> List[str]:
+        """Ids of all live vectors"""
+        return list(self._rows)
+
+    def content_hash(self, doc_id: str) -> Optional[str]:
+        """Hash of the content a stored vector was computed from"""
+        return self._hashes.get(doc_id)
+
+    def configure_ann(self, mode: str = "exact", threshold: int = 20000,
+                      nlist: int = 0, nprobe: int = 8) -> None:
+        """Choose between exact and IVF search and tune the IVF knobs
+
+        ``nlist`` of 0 picks roughly sqrt(n) clusters at training time.
+        Raising ``nprobe`` trades latency for recall.
+        """
+        if mode not in ("exact", "ivf"):
+            raise ValueError(f"Unknown ANN mode: {mode}")
+        with self._lock:
+            self.ann_mode = mode
+            self.ann_threshold = threshold
+            self.ann_nlist = nlist
+            self.nprobe = nprobe
+            self._ivf = None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length, leaving zero vectors untouched"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: Sequence[str],
+            vectors: Sequence[Sequence[float]],
+            hashes: Optional[Sequence[str]] = None) -> None:
+        """Insert vectors, replacing any existing vector with the same id
+
+        ``hashes`` optionally records which content each vector belongs to,
+        so callers can tell whether a stored vector is still current.
+        """
+        if not ids:
+            return
+
+        batch = np.asarray(vectors, dtype=np.float32)
+        if batch.ndim != 2 or batch.shape[0] != len(ids):
+            raise ValueError("Expected one vector per id")
+
+        with self._lock, self._writing():
+            if self.dim is None:
+                self.dim = batch.shape[1]
+                self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            elif batch.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, "
+                                 f"got {batch.shape[1]}")
+
+            self._tombstone(doc_id for doc_id in ids if doc_id in self._rows)
+            start = len(self._row_ids)
+            self._reserve(start + len(ids))
+            rows = self._normalize(batch)
+            self._write_rows(start, rows)
+            if self._ivf is not None:
+                self._ivf.append(start, rows)
+            for offset, doc_id in enumerate(ids):
+                self._rows[doc_id] = start + offset
+                self._row_ids.append(doc_id)
+                if hashes is not None:
+                    self._hashes[doc_id] = hashes[offset]
+            self._alive[start:start + len(ids)] = True
+            self._record_added(start, ids, hashes)
+            self._maybe_compact()
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove vectors by id, ignoring unknown ids"""
+        with self._lock, self._writing():
+            self._tombstone(ids)
+            self._maybe_compact()
+
+    def clear(self) -> None:
+        """Remove every vector"""
+        with self._lock:
+            self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+            self._alive = np.zeros(0, dtype=bool)
+            self._row_ids = []
+            self._rows = {}
+            self._hashes = {}
+            self._tombstones = 0
+            self._ivf = None
+
+    def search(self, query: Sequence[float], k: int = 5,
+               nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first"""
+        with self._lock:
+            count = len(self._row_ids)
+            if k <= 0 or not self._rows or self.dim is None:
+                return []
+
+            q = np.asarray(query, dtype=np.float32).reshape(-1)
+            if q.shape[0] != self.dim:
+                raise ValueError(f"Expected query of dimension {self.dim}, "
+                                 f"got {q.shape[0]}")
+            norm = np.linalg.norm(q)
+            if norm:
+                q = q / norm
+
+            rows = self._ann_candidates(q, count, k, nprobe)
+            if rows is not None:
+                scores = np.asarray(self._matrix[rows]) @ q
+                scores[~self._alive[rows]] = -np.inf
+                return self._top_k(scores, k, rows)
+
+            scores = self._matrix[:count] @ q
+            if self._tombstones:
+                scores[~self._alive[:count]] = -np.inf
+            return self._top_k(scores, k)
+
+    def _ann_candidates(self, q: np.ndarray, count: int, k: int,
+                        nprobe: Optional[int]) -> Optional[np.ndarray]:
+        """Rows to score approximately, or None for an exact scan"""
+        if self.ann_mode != "ivf" or len(self._rows) < self.ann_threshold:
+            return None
+
+        ivf = self._ivf
+        if (ivf is None or not ivf.is_trained or
+                len(self._rows) > 4 * ivf.trained_rows):
+            live_rows = np.flatnonzero(self._alive[:count])
+            nlist = self.ann_nlist or int(math.sqrt(len(live_rows)))
+            ivf = IVFIndex(nlist)
+            ivf.train(self._matrix[:count], live_rows)
+            self._ivf = ivf
+
+        rows = ivf.candidates(q, nprobe or self.nprobe, count)
+        # Too few candidates to fill the result; scan everything instead
+        if len(rows) < k:
+            return None
+        return rows
+
+    def _top_k(self, scores: np.ndarray, k: int,
+               rows: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """Pick the k best entries of a score vector
+
+        ``rows`` maps score positions to matrix rows when only a subset of
+        the matrix was scored.
+        """
+        k = min(k, len(self._rows), len(scores))
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        results = []
+        for position in candidates[:k]:
+            if not np.isfinite(scores[position]):
+                break
+            row = position if rows is None else rows[position]
+            results.append((self._row_ids[row], float(scores[position])))
+        return results
+
+    @contextlib.contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Hook wrapped around every change, inside ``self._lock``"""
+        yield
+
+    def _tombstone(self, ids: Iterable[str]) -> None:
+        """Mark the rows of the given ids as deleted"""
+        for doc_id in list(ids):
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            self._hashes.pop(doc_id, None)
+            self._alive[row] = False
+            self._row_ids[row] = None
+            self._tombstones += 1
+
+    def _reserve(self, rows: int) -> None:
+        """Grow the matrix geometrically so appends stay amortized O(1)"""
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(self.initial_capacity, capacity * 2, rows)
+        matrix = np.empty((new_capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._row_ids)] = self._matrix[:len(self._row_ids)]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:len(self._row_ids)] = self._alive[:len(self._row_ids)]
+        self._matrix = matrix
+        self._alive = alive
+
+    def _write_rows(self, start: int, rows: np.ndarray) -> None:
+        """Store normalized rows starting at the given row number"""
+        self._matrix[start:start + len(rows)] = rows
+
+    def _record_added(self, start: int, ids: Sequence[str],
+                      hashes: Optional[Sequence[str]]) -> None:
+        """Hook called once new rows and their ids are in place"""
+
+    def _maybe_compact(self) -> None:
+        """Compact when tombstones take up too much of the matrix"""
+        if (self._tombstones and
+                self._tombstones >= self.compact_ratio * len(self._row_ids)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the matrix without tombstoned rows"""
+        with self._lock:
+            count = len(self._row_ids)
+            live = np.flatnonzero(self._alive[:count])
+            capacity = max(self.initial_capacity, len(live))
+
+            matrix = np.empty((capacity, self.dim or 0), dtype=np.float32)
+            matrix[:len(live)] = self._matrix[live]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:len(live)] = True
+
+            self._matrix = matrix
+            self._alive = alive
+            if self._ivf is not None:
+                self._ivf.remap(live)
+            self._row_ids = [self._row_ids[row] for row in live]
+            self._rows = {doc_id: row
+                          for row, doc_id in enumerate(self._row_ids)}
+            self._tombstones = 0
@@ -0,0 +1,264 @@
+"""
+Filesystem watcher that reports changed clipboard entries
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from .config import config
+from .catalog import entry_kind, parse_entry_key
+
+
+# Called with the changed entry keys, or None when everything may have
+# changed (event queue overflow, watched directory replaced)
+ChangeCallback = Callable[[Optional[Set[str]]], None]
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE |
+               IN_DELETE_SELF | IN_MOVE_SELF)
+_RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None,
+                           use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                    ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        """Watch a path and return the watch descriptor"""
+        wd = self._add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def read_events(self) -> list:
+        """Drain pending events as (mask, name) pairs"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+
+    def close(self) -> None:
+        """Release the inotify descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ClipboardWatcher:
+    """Reports created, modified and deleted clipboard entries
+
+    Uses inotify where available, so an idle clipboard costs no CPU. Events
+    are collected until the directory has been quiet for ``settle_ms`` (at
+    most ``max_delay_ms`` after the first one) and then handed to the
+    callback as one batch of entry keys, on the watcher thread. Elsewhere
+    the directory is polled every ``poll_interval`` seconds instead.
+    """
+
+    def __init__(self, path: Path, callback: ChangeCallback,
+                 settle_ms: Optional[int] = None,
+                 max_delay_ms: Optional[int] = None,
+                 poll_interval: Optional[float] = None,
+                 backend: Optional[str] = None):
+        self.path = Path(path)
+        self.callback = callback
+        if settle_ms is None:
+            settle_ms = config.get("watcher.settle_ms", 150)
+        if max_delay_ms is None:
+            max_delay_ms = config.get("watcher.max_delay_ms", 1000)
+        self.settle = settle_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.poll_interval = (poll_interval if poll_interval is not None
+                              else config.get("watcher.poll_interval", 2.0))
+        # "auto" prefers inotify, "polling" never uses it
+        self.requested_backend = backend or config.get("watcher.backend",
+                                                       "auto")
+        self.backend: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = -1, -1
+
+    @property
+    def running(self) -> bool:
+        """Whether the watcher thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start watching on a daemon thread"""
+        if self.running:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+
+        inotify = None
+        if (self.requested_backend != "polling" and
+                sys.platform.startswith("linux")):
+            try:
+                inotify = Inotify()
+                inotify.add_watch(self.path, _WATCH_MASK)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable, polling instead: {e}")
+                if inotify is not None:
+                    inotify.close()
+                inotify = None
+
+        if inotify is not None:
+            self.backend = "inotify"
+            self._wake_r, self._wake_w = os.pipe()
+            target = lambda: self._run_inotify(inotify)
+        else:
+            self.backend = "polling"
+            known = self._snapshot()
+            target = lambda: self._run_polling(known)
+        self._thread = threading.Thread(target=target, daemon=True,
+                                        name="clipsage-watcher")
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._wake_w >= 0:
+            os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._wake_r, self._wake_w = -1, -1
+
+    def _emit(self, keys: Optional[Set[str]]) -> None:
+        """Hand a batch to the callback, never letting it kill the thread"""
+        try:
+            self.callback(keys)
+        except Exception as e:
+            print(f"Error handling clipboard changes: {e}")
+
+    def _run_inotify(self, inotify: Inotify) -> None:
+        """Wait for inotify events and flush them in settled batches"""
+        pending: Set[str] = set()
+        rescan = False
+        first = last = 0.0
+        try:
+            while not self._stop.is_set():
+                timeout = None
+                if pending or rescan:
+                    now = time.monotonic()
+                    deadline = min(last + self.settle, first + self.max_delay)
+                    timeout = max(0.0, deadline - now)
+
+                ready, _, _ = select.select([inotify.fd, self._wake_r],
+                                            [], [], timeout)
+                if self._stop.is_set():
+                    break
+
+                if inotify.fd in ready:
+                    rewatch = False
+                    for mask, name in inotify.read_events():
+                        if mask & _RESCAN_MASK:
+                            rescan = True
+                            rewatch = rewatch or not mask & IN_Q_OVERFLOW
+                        else:
+                            key = (parse_entry_key(name)
+                                   if entry_kind(name) else None)
+                            if key is None:
+                                continue
+                            pending.add(key)
+                        last = time.monotonic()
+                        first = first or last
+                    if rewatch:
+                        # The directory itself was removed or replaced
+                        self.path.mkdir(parents=True, exist_ok=True)
+                        inotify.add_watch(self.path, _WATCH_MASK)
+
+                # Flush once quiet for a while, or the batch got too old
+                if not (pending or rescan):
+                    continue
+                deadline = min(last + self.settle, first + self.max_delay)
+                if time.monotonic() < deadline:
+                    continue
+                if rescan:
+                    self._emit(None)
+                elif pending:
+                    self._emit(pending)
+                pending, rescan = set(), False
+                first = 0.0
+        except OSError as e:
+            print(f"Clipboard watcher stopped: {e}")
+        finally:
+            inotify.close()
+
+    def _run_polling(self, known: Dict[str, Tuple[str, Tuple[int, int]]]
+                     ) -> None:
+        """Fallback: compare directory listings every poll_interval"""
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            changed = {key for name, (key, signature) in current.items()
+                       if known.get(name, (None, None))[1] != signature}
+            changed.update(key for name, (key, _) in known.items()
+                           if name not in current)
+            known = current
+            if changed:
+                self._emit(changed)
+
+    def _snapshot(self) -> Dict[str, Tuple[str, Tuple[int, int]]]:
+        """Signature of every clipboard file, keyed by filename"""
+        snapshot = {}
+        try:
+            with os.scandir(self.path) as it:
+                for dir_entry in it:
+                    if entry_kind(dir_entry.name) is None:
+                        continue
+                    key = parse_entry_key(dir_entry.name)
+                    if key is None:
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[dir_entry.name] = (
+                        key, (stat.st_mtime_ns, stat.st_size)
+                    )
+        except OSError as e:
+            print(f"Error scanning {self.path}: {e}")
+        return snapshot
+
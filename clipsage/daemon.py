@@ -0,0 +1,382 @@
+"""
+Search daemon sharing one warm clipboard index over a Unix socket
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+)
+
+from .core.config import config
+
+if TYPE_CHECKING:
+    from .core.semantic_search import ClipboardSemanticSearch
+
+# Longest request line accepted from a client
+_MAX_REQUEST = 1 << 20
+
+
+class DaemonError(Exception):
+    """Raised by DaemonClient when the daemon rejects a request"""
+
+
+def default_socket_path() -> Path:
+    """Socket from ``daemon.socket_path``, else in the runtime directory"""
+    configured = config.get("daemon.socket_path", "")
+    if configured:
+        return Path(configured).expanduser()
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    return (Path(runtime) if runtime else config.cache_path) / "clipsage.sock"
+
+
+def item_to_json(item: Dict[str, Any]) -> Dict[str, Any]:
+    """A search or list item as plain JSON types"""
+    result = {
+        "entry_id": item["metadata"]["entry_id"],
+        "timestamp": item["metadata"]["timestamp"],
+        "type": item["metadata"]["type"],
+        "files": {kind: str(path)
+                  for kind, path in item["metadata"]["files"].items()},
+    }
+    for key in ("preview", "content", "score", "duplicates", "passage"):
+        if key in item:
+            result[key] = item[key]
+    return result
+
+
+class DaemonClient:
+    """Blocking client for the daemon, for scripts, the CLI and plugins
+
+    Raises OSError from the constructor when no daemon is listening.
+    """
+
+    def __init__(self, path: Optional[Path] = None, timeout: float = 30.0):
+        self.path = Path(path or default_socket_path())
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(self.path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def request(self, method: str, **params: Any) -> Any:
+        """Send one request and return its result"""
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params}
+        self._file.write(json.dumps(message).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise DaemonError(reply["error"])
+        return reply.get("result")
+
+    def close(self) -> None:
+        """Close the connection"""
+        self._file.close()
+        self._sock.close()
+
+
+class ClipboardDaemon:
+    """Serves search, list and get requests from one shared index
+
+    Clients exchange JSON objects over the socket, one per line: a request
+    ``{"id": 1, "method": "search", "params": {"query": "ssh", "k": 5}}``
+    is answered by ``{"id": 1, "result": [...]}`` or
+    ``{"id": 1, "error": "..."}``. Connections are served concurrently by
+    an asyncio server, requests of one connection in order. Index work
+    runs on a thread pool; refreshes triggered by the watcher run one at
+    a time on their own thread and are coalesced while one is running.
+    """
+
+    def __init__(self, search: Optional["ClipboardSemanticSearch"] = None,
+                 socket_path: Optional[Path] = None,
+                 workers: Optional[int] = None,
+                 watch: Optional[bool] = None,
+                 snapshot_path: Optional[Path] = None):
+        self._owns_search = search is None
+        if search is None:
+            from .core.semantic_search import ClipboardSemanticSearch
+            search = ClipboardSemanticSearch(load_data=False)
+        self.search = search
+        self.socket_path = Path(socket_path or default_socket_path())
+        self.snapshot_path = Path(snapshot_path or search.snapshot_path)
+        self.workers = workers or config.get("daemon.workers", 4)
+        self.watch = (watch if watch is not None
+                      else config.get("watcher.enabled", True))
+        # Set once the socket accepts connections
+        self.ready = threading.Event()
+        self.clients = 0
+
+        self._handlers: Dict[str, Callable[..., Any]] = {
+            "ping": lambda: "pong",
+            "status": self._status,
+            "search": self._search,
+            "list": self._list,
+            "get": self._get,
+            "refresh": self._refresh_all,
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._refresher: Optional[ThreadPoolExecutor] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._full_refresh = False
+        self._refresh_keys: Set[str] = set()
+        self._watcher = None
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether a refresh is running or queued"""
+        return (self._refresh_task is not None and
+                not self._refresh_task.done())
+
+    async def serve(self) -> None:
+        """Listen until stop() is called, then release everything"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._claim_socket()
+        self._pool = ThreadPoolExecutor(self.workers,
+                                        thread_name_prefix="clipsage-daemon")
+        self._refresher = ThreadPoolExecutor(
+            1, thread_name_prefix="clipsage-daemon-refresh"
+        )
+        server = await asyncio.start_unix_server(
+            self._serve_client, path=str(self.socket_path),
+            limit=_MAX_REQUEST
+        )
+        os.chmod(self.socket_path, 0o600)
+        try:
+            # Start from the last snapshot; clients are served meanwhile
+            await self._loop.run_in_executor(
+                self._refresher, self.search.load_snapshot,
+                self.snapshot_path
+            )
+            self.request_refresh()
+            if self.watch:
+                from .core.watcher import ClipboardWatcher
+                self._watcher = ClipboardWatcher(self.search.clipboard_path,
+                                                 self._on_changed)
+                self._watcher.start()
+            self.ready.set()
+            print(f"ClipSage daemon listening on {self.socket_path}")
+            async with server:
+                await self._stopping.wait()
+        finally:
+            await self._shutdown(server)
+
+    def stop(self) -> None:
+        """Ask the daemon to shut down (from any thread)"""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def request_refresh(self, entry_keys: Optional[Set[str]] = None
+                        ) -> None:
+        """Queue a refresh of the given entries, or of everything
+
+        Must be called on the event loop; the watcher goes through
+        _on_changed.
+        """
+        if entry_keys is None:
+            self._full_refresh = True
+        else:
+            self._refresh_keys.update(entry_keys)
+        if not self.refreshing:
+            self._refresh_task = self._loop.create_task(self._refresh_loop())
+
+    def _on_changed(self, entry_keys: Optional[Set[str]]) -> None:
+        """Watcher callback, on the watcher thread"""
+        self._loop.call_soon_threadsafe(self.request_refresh, entry_keys)
+
+    async def _refresh_loop(self) -> None:
+        """Run queued refreshes until none are left"""
+        while self._full_refresh or self._refresh_keys:
+            keys = None if self._full_refresh else self._refresh_keys
+            self._full_refresh, self._refresh_keys = False, set()
+            try:
+                await self._loop.run_in_executor(self._refresher,
+                                                 self._refresh, keys)
+            except Exception as e:
+                print(f"Error refreshing clipboard data: {e}")
+
+    def _refresh(self, entry_keys: Optional[Set[str]]) -> None:
+        """One refresh, on the refresh thread"""
+        diff = self.search.refresh_data(entry_keys=entry_keys)
+        if diff and entry_keys is None:
+            # Full rescans are rare; keep the snapshot close behind them
+            self.search.save_snapshot(self.snapshot_path)
+
+    async def _serve_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection in order"""
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    reply = {"id": None, "error": "Request too long"}
+                    writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                    break
+                if not line:
+                    break
+                reply = await self._handle(line)
+                writer.write(json.dumps(reply, ensure_ascii=False
+                                        ).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # Client went away mid-reply
+        finally:
+            self.clients -= 1
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _handle(self, line: bytes) -> Dict[str, Any]:
+        """Run one request on the thread pool"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"id": None, "error": "Malformed request"}
+        if not isinstance(request, dict):
+            return {"id": None, "error": "Malformed request"}
+
+        request_id = request.get("id")
+        handler = self._handlers.get(request.get("method"))
+        params = request.get("params") or {}
+        if handler is None or not isinstance(params, dict):
+            return {"id": request_id,
+                    "error": f"Unknown method: {request.get('method')}"}
+        try:
+            result = await self._loop.run_in_executor(
+                self._pool, functools.partial(handler, **params)
+            )
+        except Exception as e:
+            return {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+        return {"id": request_id, "result": result}
+
+    def _status(self) -> Dict[str, Any]:
+        return {
+            "items": self.search.count_items(),
+            "indexed": len(self.search.entries),
+            "vectors": len(self.search.vector_index),
+            "refreshing": self.refreshing,
+            "clients": self.clients,
+            "generation": self.search.generation,
+            "model": self.search.model_name,
+        }
+
+    def _search(self, query: str, k: int = 10,
+                mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [item_to_json(item)
+                for item in self.search.search(query, k=k, mode=mode)]
+
+    def _list(self, offset: int = 0, limit: Optional[int] = 50,
+              since: Optional[str] = None, until: Optional[str] = None,
+              type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [item_to_json(item) for item in self.search.iter_items(
+            offset=offset, limit=limit, since=since, until=until,
+            types=[type] if type else None
+        )]
+
+    def _get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        item = self.search.get_item_content(entry_id)
+        return item_to_json(item) if item is not None else None
+
+    def _refresh_all(self) -> bool:
+        self._loop.call_soon_threadsafe(self.request_refresh, None)
+        return True
+
+    def _claim_socket(self) -> None:
+        """Remove a socket left by a dead daemon, refuse a live one"""
+        path = self.socket_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+        except OSError:
+            path.unlink()
+        else:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        finally:
+            probe.close()
+
+    async def _shutdown(self, server: asyncio.AbstractServer) -> None:
+        """Stop watching and refreshing and persist the index"""
+        self.ready.clear()
+        server.close()
+        if self._watcher is not None:
+            self._watcher.stop()
+        self.search.pipeline.cancel()
+        if self._refresh_task is not None:
+            self._full_refresh, self._refresh_keys = False, set()
+            with contextlib.suppress(Exception):
+                await self._refresh_task
+        self._refresher.shutdown(wait=True)
+        self._pool.shutdown(wait=True)
+        # The next start only reads what changed while we were down
+        self.search.save_snapshot(self.snapshot_path)
+        if self._owns_search:
+            self.search.cleanup()
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``clipsage-daemon``"""
+    parser = argparse.ArgumentParser(
+        prog="clipsage-daemon",
+        description="Serve ClipSage searches over a Unix socket"
+    )
+    parser.add_argument("--socket", type=Path,
+                        help="Socket path (default: daemon.socket_path, "
+                             "else $XDG_RUNTIME_DIR/clipsage.sock)")
+    parser.add_argument("--workers", type=int,
+                        help="Threads serving requests (default: 4)")
+    parser.add_argument("--no-watch", action="store_true",
+                        help="Don't watch the clipboard directory")
+    args = parser.parse_args(argv)
+
+    daemon = ClipboardDaemon(socket_path=args.socket, workers=args.workers,
+                             watch=False if args.no_watch else None)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, daemon.stop)
+        await daemon.serve()
+
+    try:
+        asyncio.run(run())
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,19 +3,27 @@ GUI components for ClipSage
 """
 
 from .main_window import ClipboardManagerUI
+from .models import ClipboardItemModel
+from .workers import SearchService
 from .widgets import (
     ModernButton,
     SearchLineEdit, 
     ClipboardItemWidget,
+    ClipboardItemDelegate,
+    ClipboardListView,
     ModernListWidget,
     ConfigurationPanel
 )
 
 __all__ = [
     "ClipboardManagerUI",
+    "SearchService",
     "ModernButton",
     "SearchLineEdit",
     "ClipboardItemWidget", 
+    "ClipboardItemDelegate",
+    "ClipboardListView",
+    "ClipboardItemModel",
     "ModernListWidget",
     "ConfigurationPanel"
 ]
\ No newline at end of file
@@ -3,25 +3,20 @@ Main window for ClipSage application
 """
 
 from PyQt6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListWidgetItem,
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTextEdit, QSplitter, QTabWidget, QLabel, QFrame, QHeaderView,
     QTableWidget, QTableWidgetItem
 )
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtGui import QPixmap, QTextCursor
 
-# Use optimized version for better performance
-try:
-    from ..core.semantic_search_optimized import (
-        OptimizedClipboardSemanticSearch as ClipboardSemanticSearch
-    )
-except ImportError:
-    from ..core.semantic_search import ClipboardSemanticSearch
+from ..backend.clipboard_manager import clipboard_manager
 from ..core.config import config
+from .models import ClipboardItemModel, ItemRole
 from .widgets import (
-    ModernButton, SearchLineEdit, ClipboardItemWidget,
-    ModernListWidget, ConfigurationPanel
+    ModernButton, SearchLineEdit, ClipboardListView, ConfigurationPanel
 )
+from .workers import SearchService
 
 
 class ClipboardManagerUI(QMainWindow):
@@ -29,19 +24,69 @@ class ClipboardManagerUI(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.clipboard_search = ClipboardSemanticSearch()
-        self.clipboard_items = []
+        # The search engine is imported, built and loaded by the worker
+        # pool so the window shows up at once
+        self.clipboard_search = None
+        self.search_service = SearchService(parent=self)
+        self.search_service.engineReady.connect(self.on_engine_ready)
+        self.search_service.refreshFinished.connect(self.on_refresh_finished)
+        self.search_service.searchFinished.connect(self.on_search_finished)
+        self.search_service.progress.connect(self.on_indexing_progress)
+        self.search_service.failed.connect(self.on_job_failed)
+        self.history_loaded = False
         self.current_search_results = []
+        self.active_query = ""
         self.setup_ui()
         self.setup_menu_bar()
         self.setup_toolbar()
         self.setup_status_bar()
-        self.load_clipboard_data()
+        # Start loading once the window had a chance to show itself
+        QTimer.singleShot(0, self.load_clipboard_data)
         
-        # Setup auto-refresh timer
+        # The watcher and retention are started along with the engine; the
+        # timer only rescans when the watcher is turned off
+        self.watcher = None
+        self.retention = None
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.refresh_clipboard_data)
-        self.refresh_timer.start(config.refresh_interval)
+        if not config.get("watcher.enabled", True):
+            self.refresh_timer.start(config.refresh_interval)
+        # A monitor started by us also pushes every clip it saves
+        clipboard_manager.subscribe(self.on_monitor_event)
+    
+    def open_search_engine(self):
+        """Build the search engine and its helpers (on a worker thread)"""
+        from ..core.semantic_search import ClipboardSemanticSearch
+        
+        search = ClipboardSemanticSearch(load_data=False)
+        # Start from the last snapshot; the first refresh then only reads
+        # entries changed since the window was last closed
+        search.load_snapshot()
+        
+        # New clips are picked up from filesystem events
+        if config.get("watcher.enabled", True):
+            from ..core.watcher import ClipboardWatcher
+            self.watcher = ClipboardWatcher(search.clipboard_path,
+                                            self.on_clipboard_changed)
+            self.watcher.start()
+        
+        # Old entries are evicted in the background to keep the history
+        # within max_items and the retention budgets, and packed into cold
+        # storage after cold_storage.after_days
+        if config.get("retention.enabled", True):
+            from ..core.retention import RetentionManager
+            self.retention = RetentionManager(
+                search.catalog,
+                cold_storage=search.cold_storage,
+                on_evicted=self.on_clipboard_changed
+            )
+            self.retention.start()
+        return search
+    
+    def on_engine_ready(self, search):
+        """Start using the search engine built by the worker pool"""
+        self.clipboard_search = search
+        self.update_statistics_table(self.stats_table)
         
     def setup_ui(self):
         """Setup the main user interface"""
@@ -118,7 +163,9 @@ class ClipboardManagerUI(QMainWindow):
         
         # Search bar
         search_layout = QHBoxLayout()
-        self.search_input = SearchLineEdit()
+        self.search_input = SearchLineEdit(
+            debounce_ms=config.get("search.debounce_ms", 300)
+        )
         search_button = ModernButton("Search")
         clear_button = ModernButton("Clear")
         refresh_button = ModernButton("Refresh")
@@ -131,10 +178,10 @@ class ClipboardManagerUI(QMainWindow):
         clear_button.setStyleSheet(red_style)
         
         # Connect search functionality
-        search_button.clicked.connect(self.perform_search)
+        search_button.clicked.connect(self.search_input.search_now)
         clear_button.clicked.connect(self.clear_search)
         refresh_button.clicked.connect(self.refresh_clipboard_data)
-        self.search_input.returnPressed.connect(self.perform_search)
+        self.search_input.searchRequested.connect(self.perform_search)
         
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_button)
@@ -151,9 +198,11 @@ class ClipboardManagerUI(QMainWindow):
         left_layout.setContentsMargins(0, 0, 0, 0)
         
         # Items list
-        self.items_list = ModernListWidget()
+        self.items_model = ClipboardItemModel(self)
+        self.items_list = ClipboardListView()
+        self.items_list.setModel(self.items_model)
         self.items_list.setMinimumWidth(400)
-        self.items_list.itemClicked.connect(self.on_item_selected)
+        self.items_list.clicked.connect(self.on_item_selected)
         
         # Control buttons
         buttons_layout = QHBoxLayout()
@@ -184,6 +233,11 @@ class ClipboardManagerUI(QMainWindow):
         
         # Preview area
         right_layout.addWidget(QLabel("Preview"))
+        # Images are shown from the thumbnail cache, never decoded in full
+        self.preview_image = QLabel()
+        self.preview_image.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_image.hide()
+        right_layout.addWidget(self.preview_image)
         self.preview_text = QTextEdit()
         self.preview_text.setReadOnly(True)
         self.preview_text.setStyleSheet("""
@@ -247,8 +301,8 @@ class ClipboardManagerUI(QMainWindow):
         header.setSectionResizeMode(1,
                                    QHeaderView.ResizeMode.ResizeToContents)
         
-        # Add some sample statistics
-        self.update_statistics_table(stats_table)
+        # Filled in once the search engine is loaded
+        self.stats_table = stats_table
         
         layout.addWidget(stats_table)
         stats_tab.setLayout(layout)
@@ -357,11 +411,10 @@ class ClipboardManagerUI(QMainWindow):
     def update_statistics_table(self, table):
         """Update statistics table with current data"""
         stats = [
-            ("Total Items", len(self.clipboard_items)),
-            ("Text Items", len([i for i in self.clipboard_items
-                               if i.get('type') == 'text'])),
-            ("Image Items", len([i for i in self.clipboard_items
-                                if i.get('type') == 'image'])),
+            ("Total Items", self.clipboard_search.count_items()),
+            ("Text Items", self.clipboard_search.count_items(types=["text"])),
+            ("Image Items",
+             self.clipboard_search.count_items(types=["image"])),
             ("Search Results", len(self.current_search_results)),
         ]
         
@@ -372,14 +425,13 @@ class ClipboardManagerUI(QMainWindow):
     
     def load_clipboard_data(self):
         """Load clipboard items from the semantic search system"""
-        try:
-            self.clipboard_search.refresh_data()
-            self.clipboard_items = self.clipboard_search.get_all_items()
-            self.update_items_display(self.clipboard_items)
-            self.update_status_bar()
-        except Exception as e:
-            print(f"Error loading clipboard data: {e}")
-            self.clipboard_items = []
+        if not self.history_loaded:
+            self.update_status_bar("Loading clipboard items...")
+        service = self.search_service
+        if service.search_engine is None and not service.refreshing:
+            service.start(self.open_search_engine)
+        else:
+            service.request_refresh()
     
     def refresh_clipboard_data(self):
         """Refresh clipboard data and update display"""
@@ -387,74 +439,135 @@ class ClipboardManagerUI(QMainWindow):
         if self.isVisible():
             self.load_clipboard_data()
     
+    def on_clipboard_changed(self, entry_keys):
+        """Index entries the watcher or retention changed (any thread)"""
+        # None means the watcher lost track and everything is rescanned
+        self.search_service.request_refresh(entry_keys=entry_keys)
+    
+    def on_monitor_event(self, event):
+        """Index a clip the monitor reported (called on its reader thread)"""
+        self.search_service.request_refresh(entry_keys=[event.entry_id])
+    
+    def on_refresh_finished(self, diff):
+        """Show the outcome of a background refresh"""
+        # Nothing changed on disk, keep the current list as it is
+        if not diff and self.history_loaded:
+            return
+        self.history_loaded = True
+        if self.active_query:
+            # Results of the active search may be stale now
+            self.perform_search(self.active_query)
+        else:
+            self.show_history()
+            self.update_status_bar()
+    
+    def on_indexing_progress(self, embedded, total):
+        """Report embedding progress of a background refresh"""
+        if embedded == 0 and not self.active_query:
+            # New entries are listed before their embeddings are ready
+            self.history_loaded = True
+            self.show_history()
+        if embedded < total:
+            self.update_status_bar(f"Indexing {embedded}/{total} items...")
+        elif not self.active_query:
+            self.update_status_bar()
+    
+    def on_job_failed(self, kind, message):
+        """Report a failed background job"""
+        if kind == "search":
+            self.update_status_bar("Search error")
+        else:
+            self.update_status_bar(f"Error loading clipboard data: {message}")
+    
     def update_items_display(self, items):
-        """Update the items list widget with given items"""
-        self.items_list.clear()
-        
-        for item_data in items:
-            list_item = QListWidgetItem()
-            
-            # Extract display information
-            preview = item_data.get("preview", "")
-            item_type = item_data.get("type", "text")
-            timestamp = item_data.get("timestamp", "Unknown")
-            
-            # Create custom widget
-            widget = ClipboardItemWidget(preview, item_type, timestamp)
-            list_item.setSizeHint(widget.sizeHint())
-            
-            # Store the full item data
-            list_item.setData(Qt.ItemDataRole.UserRole, item_data)
-            
-            self.items_list.addItem(list_item)
-            self.items_list.setItemWidget(list_item, widget)
+        """Update the items list with given items"""
+        # Only rows that differ from what is shown are inserted or removed
+        self.items_model.set_items(items)
     
-    def perform_search(self):
+    def show_history(self):
+        """Show the clipboard history, loading pages as the list scrolls"""
+        page_size = config.get("ui.page_size", 200)
+        self.items_model.show_pages(
+            lambda offset, limit: list(
+                self.clipboard_search.iter_items(offset, limit)
+            ),
+            page_size
+        )
+    
+    def perform_search(self, query=None):
         """Perform semantic search on clipboard items"""
-        query = self.search_input.text().strip()
+        if query is None:
+            query = self.search_input.text().strip()
         if not query:
             self.clear_search()
             return
         
-        try:
-            max_results = config.get("search.max_results", 10)
-            search_results = self.clipboard_search.search(query, k=max_results)
-            self.current_search_results = search_results
-            self.update_items_display(search_results)
-            self.update_status_bar(f"Found {len(search_results)} results")
-        except Exception as e:
-            print(f"Error performing search: {e}")
-            self.update_status_bar("Search error")
+        self.active_query = query
+        if self.clipboard_search is None:
+            # Searched for once the history has loaded
+            return
+        max_results = config.get("search.max_results", 10)
+        self.search_service.request_search(query, k=max_results)
+        self.update_status_bar("Searching...")
+    
+    def on_search_finished(self, seq, query, search_results):
+        """Show the results of the latest background search"""
+        if query != self.active_query:
+            return
+        self.current_search_results = search_results
+        self.update_items_display(search_results)
+        self.update_status_bar(f"Found {len(search_results)} results")
     
     def clear_search(self):
         """Clear search and show all items"""
+        self.search_input.cancel_pending()
+        self.search_service.cancel_searches()
+        self.active_query = ""
         self.search_input.clear()
         self.current_search_results = []
-        self.update_items_display(self.clipboard_items)
+        self.show_history()
         self.update_status_bar()
     
-    def on_item_selected(self, item):
+    def on_item_selected(self, index):
         """Handle item selection"""
-        item_data = item.data(Qt.ItemDataRole.UserRole)
+        item_data = index.data(ItemRole)
         if item_data:
-            content = item_data.get("content", "")
+            content = item_data.get("content")
+            if content is None:
+                # History items are listed without their content
+                entry_id = item_data["metadata"]["entry_id"]
+                full = self.clipboard_search.get_item_content(entry_id)
+                content = full["content"] if full else ""
             self.preview_text.setPlainText(content)
             
+            # Highlight the passage of a long clip that matched the search
+            passage = item_data.get("passage")
+            if passage and passage["end"] <= len(content):
+                cursor = self.preview_text.textCursor()
+                cursor.setPosition(passage["start"])
+                cursor.setPosition(passage["end"],
+                                   QTextCursor.MoveMode.KeepAnchor)
+                self.preview_text.setTextCursor(cursor)
+                self.preview_text.ensureCursorVisible()
+            
             # Update details if needed
             metadata = item_data.get("metadata", {})
             files = metadata.get("files", {})
             
             # Handle image display if it's an image item
-            if item_data.get("type") == "image" and "image" in files:
+            self.preview_image.hide()
+            if "image" in files:
                 try:
                     image_path = files["image"]
-                    pixmap = QPixmap(str(image_path))
-                    if not pixmap.isNull():
+                    thumbnail = self.clipboard_search.thumbnail(image_path)
+                    if thumbnail is not None:
+                        self.preview_image.setPixmap(QPixmap(str(thumbnail)))
+                        self.preview_image.show()
+                    if item_data.get("type") == "image":
                         # Show image info in text preview
-                        info = (f"Image: {image_path}\n"
-                                f"Size: {pixmap.width()}x{pixmap.height()}\n\n"
-                                f"{content}")
-                        self.preview_text.setPlainText(info)
+                        self.preview_text.setPlainText(
+                            f"Image: {image_path}\n\n{content}"
+                        )
                 except Exception as e:
                     print(f"Error loading image: {e}")
     
@@ -462,8 +575,10 @@ class ClipboardManagerUI(QMainWindow):
         """Update status bar with item count or custom message"""
         if message:
             self.statusBar().showMessage(message)
+        elif self.clipboard_search is None:
+            self.statusBar().showMessage("Loading clipboard items...")
         else:
-            count = len(self.clipboard_items)
+            count = self.clipboard_search.count_items()
             self.statusBar().showMessage(f"Ready - {count} items in clipboard")
     
     def closeEvent(self, event):
@@ -477,7 +592,17 @@ class ClipboardManagerUI(QMainWindow):
         config.save_config()
         
         # Cleanup resources
-        if hasattr(self.clipboard_search, 'cleanup'):
-            self.clipboard_search.cleanup()
+        clipboard_manager.unsubscribe(self.on_monitor_event)
+        self.refresh_timer.stop()
+        # Waits for a warm-up that may still be starting the helpers
+        self.search_service.shutdown()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.retention is not None:
+            self.retention.stop()
+        search = self.search_service.search_engine
+        if search is not None:
+            search.save_snapshot()
+            search.cleanup()
         
         event.accept()
@@ -0,0 +1,176 @@
+"""
+Item models for the ClipSage views
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+
+
+ItemRole = Qt.ItemDataRole.UserRole
+
+# Returns up to ``limit`` items starting at ``offset``
+Pager = Callable[[int, int], List[Dict[str, Any]]]
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Stable identity of a clipboard item across refreshes"""
+    metadata = item.get("metadata", {})
+    return metadata.get("entry_id") or item.get("preview", "")
+
+
+def _row_runs(rows: List[int]) -> List[tuple]:
+    """Group sorted row numbers into (first, last) runs"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+class ClipboardItemModel(QAbstractListModel):
+    """List model over the item dicts returned by the search layer
+
+    ``set_items`` turns a new item list into row removals and insertions
+    against the current one, so a refresh that adds a few clips only
+    touches those rows and the view keeps its selection and scroll
+    position. Views only ask for the rows they actually show.
+
+    With ``show_pages`` rows are loaded a page at a time through
+    ``fetchMore`` as the view scrolls towards the end.
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._items: List[Dict[str, Any]] = []
+        self._keys: List[str] = []
+        self._pager: Optional[Pager] = None
+        self._page_size = 200
+        self._exhausted = True
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._items)
+
+    def data(self, index: QModelIndex,
+             role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or not 0 <= index.row() < len(self._items):
+            return None
+        item = self._items[index.row()]
+        if role == ItemRole:
+            return item
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item.get("preview", "")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item.get("timestamp", "")
+        return None
+
+    def item(self, row: int) -> Optional[Dict[str, Any]]:
+        """Item dict shown in the given row"""
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    def clear(self) -> None:
+        """Remove every row"""
+        self._pager = None
+        self._exhausted = True
+        self._reset([])
+
+    def set_items(self, items: List[Dict[str, Any]]) -> None:
+        """Show a fixed list of items, updating only the rows that differ"""
+        self._pager = None
+        self._exhausted = True
+        self._sync(items)
+
+    def show_pages(self, pager: Pager, page_size: int = 200) -> None:
+        """Show items loaded lazily from a pager
+
+        Reloads as many rows as are currently loaded (at least one page),
+        so calling it again after a refresh keeps the scroll position.
+        """
+        count = max(len(self._items) if self._pager else 0, page_size)
+        items = pager(0, count)
+        self._pager = pager
+        self._page_size = page_size
+        self._exhausted = len(items) < count
+        self._sync(items)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid() or self._pager is None:
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        page = self._pager(len(self._items), self._page_size)
+        self._exhausted = len(page) < self._page_size
+        # Entries added since the last page shift offsets; skip repeats
+        known = set(self._keys)
+        page = [item for item in page if item_key(item) not in known]
+        if not page:
+            return
+        first = len(self._items)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._items.extend(page)
+        self._keys.extend(item_key(item) for item in page)
+        self.endInsertRows()
+
+    def _sync(self, items: List[Dict[str, Any]]) -> None:
+        """Turn the current rows into items with minimal row changes"""
+        keys = [item_key(item) for item in items]
+        if not self._items or len(set(keys)) != len(keys):
+            self._reset(items)
+            return
+
+        # Remaining rows must keep their order, otherwise rebuild
+        current = set(self._keys)
+        new = set(keys)
+        if ([key for key in keys if key in current] !=
+                [key for key in self._keys if key in new]):
+            self._reset(items)
+            return
+
+        # Remove rows that are gone, last first so row numbers stay valid
+        gone = [row for row, key in enumerate(self._keys) if key not in new]
+        for first, last in reversed(_row_runs(gone)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._items[first:last + 1]
+            del self._keys[first:last + 1]
+            self.endRemoveRows()
+
+        # Insert new rows and refresh the ones whose content changed
+        row = 0
+        while row < len(items):
+            if keys[row] in current:
+                if self._changed(self._items[row], items[row]):
+                    self._items[row] = items[row]
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                row += 1
+                continue
+            end = row
+            while end < len(items) and keys[end] not in current:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            self._items[row:row] = items[row:end]
+            self._keys[row:row] = keys[row:end]
+            self.endInsertRows()
+            row = end
+
+    def _reset(self, items: List[Dict[str, Any]]) -> None:
+        """Replace every row at once"""
+        self.beginResetModel()
+        self._items = list(items)
+        self._keys = [item_key(item) for item in items]
+        self.endResetModel()
+
+    @staticmethod
+    def _changed(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+        """Whether a row needs repainting"""
+        return any(old.get(field) != new.get(field)
+                   for field in ("content", "preview", "timestamp", "score"))
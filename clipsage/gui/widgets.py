@@ -4,10 +4,14 @@ Custom GUI widgets for ClipSage
 
 from PyQt6.QtWidgets import (
     QPushButton, QLineEdit, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QListWidget, QGroupBox, QGridLayout, QCheckBox,
-    QSpinBox, QComboBox, QSlider
+    QLabel, QListWidget, QListView, QGroupBox, QGridLayout, QCheckBox,
+    QSpinBox, QComboBox, QSlider, QStyledItemDelegate, QStyle,
+    QStyleOptionViewItem
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QRect, QSize, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter
+
+from .models import ItemRole
 
 
 class ModernButton(QPushButton):
@@ -42,9 +46,22 @@ class ModernButton(QPushButton):
 
 
 class SearchLineEdit(QLineEdit):
-    """Modern search input with placeholder styling"""
-    def __init__(self):
+    """Modern search input with placeholder styling
+    
+    Emits ``searchRequested`` once typing pauses for ``debounce_ms``, or
+    right away when Enter is pressed, instead of on every keystroke.
+    """
+    searchRequested = pyqtSignal(str)
+    
+    def __init__(self, debounce_ms=300):
         super().__init__()
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._emit_search)
+        self.textEdited.connect(lambda _text: self._debounce_timer.start())
+        self.returnPressed.connect(self.search_now)
+        
         self.setPlaceholderText("🔍 Search clipboard items...")
         self.setStyleSheet("""
             QLineEdit {
@@ -63,6 +80,18 @@ class SearchLineEdit(QLineEdit):
                 border-color: #bdc3c7;
             }
         """)
+    
+    def search_now(self):
+        """Request a search immediately, dropping any pending one"""
+        self._debounce_timer.stop()
+        self._emit_search()
+    
+    def cancel_pending(self):
+        """Forget a search that is still waiting for typing to pause"""
+        self._debounce_timer.stop()
+    
+    def _emit_search(self):
+        self.searchRequested.emit(self.text().strip())
 
 
 class ClipboardItemWidget(QWidget):
@@ -136,6 +165,142 @@ class ModernListWidget(QListWidget):
         self.setAlternatingRowColors(True)
 
 
+class ClipboardItemDelegate(QStyledItemDelegate):
+    """Paints clipboard items straight from the model
+    
+    Draws the same header and preview as ``ClipboardItemWidget`` without
+    creating any widgets, and only for rows the view is painting.
+    """
+    PADDING_X = 12
+    PADDING_Y = 8
+    SPACING = 4
+    PREVIEW_LINES = 2
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.header_font = QFont()
+        self.header_font.setPixelSize(12)
+        self.header_font.setWeight(QFont.Weight.Medium)
+        self.time_font = QFont()
+        self.time_font.setPixelSize(11)
+        self.preview_font = QFont()
+        self.preview_font.setPixelSize(13)
+        self._header_height = QFontMetrics(self.header_font).height()
+        self._line_height = QFontMetrics(self.preview_font).lineSpacing()
+    
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex):
+        height = (2 * self.PADDING_Y + self._header_height + self.SPACING +
+                  self.PREVIEW_LINES * self._line_height)
+        # Rows span the viewport; only the height matters
+        return QSize(0, height)
+    
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem,
+              index: QModelIndex):
+        item = index.data(ItemRole)
+        if not item:
+            return
+        
+        # Background, selection and hover as styled by the view
+        style = option.widget.style() if option.widget else None
+        if style is not None:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem,
+                                option, painter, option.widget)
+        
+        painter.save()
+        rect = option.rect.adjusted(self.PADDING_X, self.PADDING_Y,
+                                    -self.PADDING_X, -self.PADDING_Y)
+        
+        # Header with type and timestamp
+        header = QRect(rect.left(), rect.top(), rect.width(),
+                       self._header_height)
+        painter.setFont(self.time_font)
+        painter.setPen(QColor("#bdc3c7"))
+        painter.drawText(header, Qt.AlignmentFlag.AlignRight |
+                         Qt.AlignmentFlag.AlignVCenter,
+                         item.get("timestamp", ""))
+        painter.setFont(self.header_font)
+        painter.setPen(QColor("#7f8c8d"))
+        item_type = item.get("type", "text")
+        painter.drawText(header, Qt.AlignmentFlag.AlignLeft |
+                         Qt.AlignmentFlag.AlignVCenter,
+                         f"📄 {item_type.title()}")
+        
+        # Content preview, elided to the lines that fit
+        text = item.get("preview", "")
+        preview_text = text[:100] + "..." if len(text) > 100 else text
+        preview_text = " ".join(preview_text.split())
+        metrics = QFontMetrics(self.preview_font)
+        top = header.bottom() + 1 + self.SPACING
+        painter.setFont(self.preview_font)
+        painter.setPen(QColor("#2c3e50"))
+        for line in range(self.PREVIEW_LINES):
+            if not preview_text:
+                break
+            line_rect = QRect(rect.left(), top + line * self._line_height,
+                              rect.width(), self._line_height)
+            if line == self.PREVIEW_LINES - 1:
+                shown = metrics.elidedText(preview_text,
+                                           Qt.TextElideMode.ElideRight,
+                                           rect.width())
+            else:
+                shown = self._fit(metrics, preview_text, rect.width())
+            painter.drawText(line_rect, Qt.AlignmentFlag.AlignLeft |
+                             Qt.AlignmentFlag.AlignVCenter, shown)
+            preview_text = preview_text[len(shown):].lstrip()
+        painter.restore()
+    
+    @staticmethod
+    def _fit(metrics: QFontMetrics, text: str, width: int) -> str:
+        """Longest prefix of text that fits, broken at a space if possible"""
+        if metrics.horizontalAdvance(text) <= width:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if metrics.horizontalAdvance(text[:middle]) <= width:
+                low = middle
+            else:
+                high = middle - 1
+        space = text.rfind(" ", 0, low + 1)
+        return text[:space] if space > 0 else text[:max(low, 1)]
+
+
+class ClipboardListView(QListView):
+    """Virtualized list of clipboard items with modern styling"""
+    def __init__(self):
+        super().__init__()
+        self.setItemDelegate(ClipboardItemDelegate(self))
+        # Every row has the same height, so layout does not visit each row
+        self.setUniformItemSizes(True)
+        self.setHorizontalScrollBarPolicy(
+            Qt.ScrollBarPolicy.ScrollBarAlwaysOff
+        )
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setStyleSheet("""
+            QListView {
+                border: 1px solid #ecf0f1;
+                border-radius: 8px;
+                background-color: #ffffff;
+                alternate-background-color: #f8f9fa;
+                selection-background-color: #e3f2fd;
+                outline: none;
+            }
+            QListView::item {
+                border-bottom: 1px solid #ecf0f1;
+                padding: 0px;
+                margin: 0px;
+            }
+            QListView::item:selected {
+                background-color: #e3f2fd;
+                border-left: 3px solid #3498db;
+            }
+            QListView::item:hover {
+                background-color: #f5f5f5;
+            }
+        """)
+        self.setAlternatingRowColors(True)
+
+
 class ConfigurationPanel(QWidget):
     """Configuration panel widget"""
     def __init__(self):
@@ -0,0 +1,187 @@
+"""
+Background execution of refresh and search jobs for the ClipSage GUI
+"""
+
+import threading
+from typing import Any, Callable, Iterable, Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _Job(QRunnable):
+    """Runs a callable on the thread pool"""
+
+    def __init__(self, fn: Callable[[], None]):
+        super().__init__()
+        self.fn = fn
+        self.setAutoDelete(True)
+
+    def run(self):
+        self.fn()
+
+
+class SearchService(QObject):
+    """Runs refreshes and searches off the GUI thread
+
+    Results come back through signals, which Qt delivers on the thread
+    that owns the service (the GUI thread). Overlapping refresh requests
+    collapse into at most one follow-up refresh, and a search that has
+    been superseded by a newer query is skipped, or its result dropped if
+    it was already running.
+    """
+
+    engineReady = pyqtSignal(object)  # search engine
+    refreshFinished = pyqtSignal(object)  # RefreshDiff
+    searchFinished = pyqtSignal(int, str, list)  # sequence, query, results
+    progress = pyqtSignal(int, int)  # embedded, total
+    failed = pyqtSignal(str, str)  # job kind, message
+
+    def __init__(self, search_engine: Any = None,
+                 parent: Optional[QObject] = None, max_threads: int = 2):
+        super().__init__(parent)
+        self.search_engine = search_engine
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._lock = threading.Lock()
+        self._refresh_running = False
+        self._refresh_pending = False
+        self._force_pending = False
+        self._keys_pending: Optional[Set[str]] = set()
+        self._search_seq = 0
+        self._closed = False
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether a refresh is queued or running"""
+        with self._lock:
+            return self._refresh_running
+
+    def start(self, factory: Callable[[], Any]) -> None:
+        """Build the search engine on the pool, then refresh it
+
+        Keeps the import and construction of the engine off the GUI
+        thread. Refresh requests made meanwhile run once it is ready;
+        searches requested before that are skipped.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._refresh_running = True
+        self.pool.start(_Job(lambda: self._run_start(factory)))
+
+    def _run_start(self, factory: Callable[[], Any]) -> None:
+        """Build the engine and run the first refresh"""
+        try:
+            self.search_engine = factory()
+        except Exception as e:
+            print(f"Error loading search engine: {e}")
+            with self._lock:
+                self._refresh_running = False
+                self._refresh_pending = False
+            if not self._closed:
+                self.failed.emit("refresh", str(e))
+            return
+        if self._closed:
+            with self._lock:
+                self._refresh_running = False
+            return
+        self.engineReady.emit(self.search_engine)
+        self._run_refresh(False, None)
+
+    def request_refresh(self, force: bool = False,
+                        entry_keys: Optional[Iterable[str]] = None) -> None:
+        """Queue a refresh, coalescing with one already in progress
+
+        ``entry_keys`` limits the refresh to those entries; requests made
+        while a refresh runs are merged into a single follow-up. Safe to
+        call from any thread.
+        """
+        keys = set(entry_keys) if entry_keys is not None else None
+        with self._lock:
+            if self._closed:
+                return
+            if self._refresh_running:
+                self._refresh_pending = True
+                self._force_pending = self._force_pending or force
+                if keys is None or self._keys_pending is None:
+                    self._keys_pending = None
+                else:
+                    self._keys_pending |= keys
+                return
+            self._refresh_running = True
+        self.pool.start(_Job(lambda: self._run_refresh(force, keys)))
+
+    def _run_refresh(self, force: bool, keys: Optional[Set[str]]) -> None:
+        """Refresh until no further request arrived meanwhile"""
+        while True:
+            try:
+                diff = self.search_engine.refresh_data(
+                    force=force, progress=self.progress.emit,
+                    entry_keys=keys
+                )
+                if not self._closed:
+                    self.refreshFinished.emit(diff)
+            except Exception as e:
+                print(f"Error refreshing clipboard data: {e}")
+                if not self._closed:
+                    self.failed.emit("refresh", str(e))
+
+            with self._lock:
+                if not self._refresh_pending or self._closed:
+                    self._refresh_running = False
+                    return
+                force = self._force_pending
+                keys = self._keys_pending
+                self._refresh_pending = False
+                self._force_pending = False
+                self._keys_pending = set()
+
+    def request_search(self, query: str, k: int,
+                       mode: Optional[str] = None) -> int:
+        """Queue a search and return its sequence number
+
+        Only the result of the latest request is ever emitted.
+        """
+        with self._lock:
+            self._search_seq += 1
+            seq = self._search_seq
+            if self._closed:
+                return seq
+        self.pool.start(_Job(lambda: self._run_search(seq, query, k, mode)))
+        return seq
+
+    def cancel_searches(self) -> None:
+        """Drop the results of every search requested so far"""
+        with self._lock:
+            self._search_seq += 1
+
+    def _is_current(self, seq: int) -> bool:
+        """Whether seq is still the latest search request"""
+        with self._lock:
+            return seq == self._search_seq and not self._closed
+
+    def _run_search(self, seq: int, query: str, k: int,
+                    mode: Optional[str]) -> None:
+        """Run one search unless a newer one replaced it"""
+        if not self._is_current(seq) or self.search_engine is None:
+            return
+        try:
+            results = self.search_engine.search(query, k=k, mode=mode)
+        except Exception as e:
+            print(f"Error performing search: {e}")
+            if self._is_current(seq):
+                self.failed.emit("search", str(e))
+            return
+        if self._is_current(seq):
+            self.searchFinished.emit(seq, query, results)
+
+    def shutdown(self, timeout_ms: int = 5000) -> None:
+        """Stop accepting jobs and wait for running ones to finish"""
+        with self._lock:
+            self._closed = True
+            self._refresh_pending = False
+        pipeline = getattr(self.search_engine, "pipeline", None)
+        if pipeline is not None:
+            pipeline.cancel()
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
@@ -19,7 +19,7 @@ source .venv/bin/activate
 # Install basic dependencies
 echo "📦 Installing Python dependencies..."
 pip install --upgrade pip
-pip install PyQt6>=6.4.0 langchain>=0.2.0 langchain-ollama>=0.1.0 Pillow>=9.0.0 httpx>=0.25.0 psutil>=5.9.0
+pip install PyQt6>=6.4.0 langchain>=0.2.0 langchain-ollama>=0.1.0 Pillow>=9.0.0 numpy>=1.24.0 httpx>=0.25.0 psutil>=5.9.0
 
 # Test import
 echo "🧪 Testing ClipSage import..."
@@ -76,7 +76,7 @@ install_python_deps() {
         pip install -r requirements.txt
     else
         echo "   Installing basic dependencies..."
-        pip install PyQt6 langchain langchain-ollama pillow
+        pip install PyQt6 langchain langchain-ollama pillow numpy
     fi
     
     echo "✅ Python dependencies installed"
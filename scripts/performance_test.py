@@ -1,229 +1,491 @@
 #!/usr/bin/env python3
 """
-Performance test script for ClipSage
+Reproducible benchmark suite for ClipSage
+
+Builds synthetic clipboard histories in the monitor's
+clip_NNNNNN_YYYY-MM-DD_HH-MM-SS_type layout and measures ingest,
+incremental refresh, restart, search latency and memory against them,
+with a deterministic fake embedder so results do not depend on Ollama.
+Each corpus size runs in a fresh process, which keeps the RSS figures
+honest. Results are written as JSON; --baseline (or the compare command)
+flags metrics that got slower than a previous run.
+
+    python scripts/performance_test.py                  # 1k, 10k, 100k
+    python scripts/performance_test.py quick            # 1k only
+    python scripts/performance_test.py --sizes 10000 --output new.json \\
+        --baseline main.json
+    python scripts/performance_test.py compare main.json new.json
 """
 
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
 import sys
-import time
 import tempfile
-import shutil
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from clipsage.core.semantic_search_optimized import OptimizedClipboardSemanticSearch
-from clipsage.core.semantic_search import ClipboardSemanticSearch
-from clipsage.core.performance import performance_monitor
-
-
-def create_test_data(clipboard_path: Path, num_entries: int = 100) -> None:
-    """Create test clipboard data"""
-    print(f"Creating {num_entries} test clipboard entries...")
-    
-    clipboard_path.mkdir(parents=True, exist_ok=True)
-    
-    for i in range(num_entries):
-        # Create text files
-        text_content = f"Test clipboard entry {i} with some sample content for semantic search testing. This is entry number {i} of {num_entries}."
-        text_file = clipboard_path / f"clip_{i:03d}_2024-01-{(i%30)+1:02d}_10-{(i%60):02d}-00_text.txt"
-        
-        with open(text_file, 'w', encoding='utf-8') as f:
-            f.write(text_content)
-        
-        # Create some image placeholders (every 5th entry)
-        if i % 5 == 0:
-            from PIL import Image
-            import io
-            
-            # Create a small test image
-            img = Image.new('RGB', (100, 100), color='red')
-            img_file = clipboard_path / f"clip_{i:03d}_2024-01-{(i%30)+1:02d}_10-{(i%60):02d}-00_image.png"
-            img.save(img_file)
-
-
-def benchmark_search_system(search_class, test_data_path: Path, num_queries: int = 50) -> Dict[str, float]:
-    """Benchmark the search system performance"""
-    print(f"Benchmarking {search_class.__name__}...")
-    
-    # Initialize search system
-    start_time = time.time()
-    search_system = search_class(clipboard_path=test_data_path)
-    init_time = time.time() - start_time
-    
-    # Test refresh performance
-    start_time = time.time()
-    search_system.refresh_data(force=True)
-    refresh_time = time.time() - start_time
-    
-    # Test search performance
-    test_queries = [
-        "test clipboard entry",
-        "sample content",
-        "semantic search",
-        "entry number",
-        "testing data",
-        "clipboard manager",
-        "performance test",
-        "sample text content"
-    ]
-    
-    search_times = []
-    for i in range(num_queries):
-        query = test_queries[i % len(test_queries)] + f" {i}"
-        
-        start_time = time.time()
-        results = search_system.search(query, k=5)
-        search_time = time.time() - start_time
-        search_times.append(search_time)
-    
-    # Test get_all_items performance
-    start_time = time.time()
-    all_items = search_system.get_all_items()
-    get_all_time = time.time() - start_time
-    
-    # Cleanup
-    if hasattr(search_system, 'cleanup'):
-        search_system.cleanup()
-    
+DEFAULT_SIZES = (1000, 10000, 100000)
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+
+# Changes smaller than this are noise whatever the ratio, by metric unit
+NOISE_FLOOR = {"_s": 0.01, "_ms": 0.2, "_mb": 5.0}
+# Throughputs regress when they drop; every other gated metric when it grows
+HIGHER_IS_BETTER = ("_per_s",)
+
+
+# --- Synthetic corpus ---------------------------------------------------
+
+_SYLLABLES = ("ka", "lo", "mi", "ra", "te", "su", "no", "vi", "de", "po",
+              "an", "el", "or", "ux", "ti", "ba", "ze", "qu", "fi", "go")
+_HOSTS = ("db", "web", "cache", "queue", "auth", "search", "api", "ci")
+_ENVS = ("prod", "staging", "dev", "test")
+
+
+def _vocabulary(rng: random.Random, size: int = 3000) -> List[str]:
+    """Pseudo-words with a realistic number of distinct terms"""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES)
+                          for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _clip_text(rng: random.Random, words: List[str], counter: int) -> str:
+    """One clip: a command, URL, code snippet, error or prose"""
+    # Zipf-like word choice: a few words are common, most are rare
+    def word():
+        return words[min(int(rng.paretovariate(1.1)) - 1, len(words) - 1)
+                     if rng.random() < 0.5 else rng.randrange(len(words))]
+
+    kind = rng.random()
+    if kind < 0.15:
+        return (f"ssh {word()}@{rng.choice(_HOSTS)}-{rng.randint(1, 40):02d}"
+                f".{rng.choice(_ENVS)}.example.com")
+    if kind < 0.25:
+        return f"git checkout -b feature/{word()}-{word()}-{counter}"
+    if kind < 0.40:
+        return (f"https://{word()}.example.org/{word()}/{word()}"
+                f"?id={rng.randint(1, 10**6)}")
+    if kind < 0.55:
+        name = f"{word()}_{word()}"
+        return (f"def {name}(items):\n"
+                f"    \"\"\"{word()} {word()} {word()}\"\"\"\n"
+                f"    return [item.{word()} for item in items "
+                f"if item.{word()} > {rng.randint(0, 99)}]\n")
+    if kind < 0.62:
+        return (f"ERROR {rng.choice(_HOSTS)}: {word()} failed with "
+                f"E_{word().upper()}_{rng.randint(100, 999)} after "
+                f"{rng.randint(1, 30)} retries")
+    # Prose, now and then long enough to be split into passages
+    length = rng.randint(2000, 4000) if rng.random() < 0.01 else \
+        rng.randint(8, 80)
+    return " ".join(word() for _ in range(length)).capitalize() + "."
+
+
+def generate_corpus(path: Path, entries: int, seed: int = 42,
+                    images_every: int = 50, start_counter: int = 1,
+                    start_time: Optional[datetime] = None) -> List[str]:
+    """Write a synthetic clipboard history, returning the entry keys
+
+    About one clip in twenty repeats an earlier one word for word, as
+    copying the same thing twice is common. With ``images_every`` every
+    n-th entry is a small PNG instead of text.
+    """
+    from PIL import Image
+
+    rng = random.Random(seed * 1000003 + start_counter)
+    words = _vocabulary(random.Random(seed))
+    path.mkdir(parents=True, exist_ok=True)
+    moment = start_time or datetime(2025, 1, 1, 9, 0, 0)
+    keys, texts = [], []
+    for counter in range(start_counter, start_counter + entries):
+        moment += timedelta(seconds=rng.randint(1, 600))
+        key = f"{counter:06d}_{moment:%Y-%m-%d_%H-%M-%S}"
+        keys.append(key)
+        if images_every and counter % images_every == 0:
+            color = tuple(rng.randrange(256) for _ in range(3))
+            size = (rng.randint(32, 320), rng.randint(32, 240))
+            Image.new("RGB", size, color).save(path / f"clip_{key}_image.png")
+            continue
+        if texts and rng.random() < 0.05:
+            text = rng.choice(texts)
+        else:
+            text = _clip_text(rng, words, counter)
+            texts.append(text)
+        (path / f"clip_{key}_text.txt").write_text(text, encoding="utf-8")
+    return keys
+
+
+def make_queries(count: int, seed: int = 42) -> List[str]:
+    """Distinct queries drawn from the corpus vocabulary"""
+    rng = random.Random(seed + 7)
+    words = _vocabulary(random.Random(seed))
+    queries = []
+    seen = set()
+    while len(queries) < count:
+        kind = rng.random()
+        if kind < 0.2:
+            query = f"{rng.choice(_HOSTS)} {rng.choice(_ENVS)}"
+            query += f" {rng.choice(words)}"
+        elif kind < 0.3:
+            query = f"E_{rng.choice(words).upper()}"
+        else:
+            query = " ".join(rng.choice(words)
+                             for _ in range(rng.randint(1, 4)))
+        if query not in seen:  # Repeats would hit the result cache
+            seen.add(query)
+            queries.append(query)
+    return queries
+
+
+# --- Measurements -------------------------------------------------------
+
+def rss_mb() -> Tuple[Optional[float], float]:
+    """Current and peak resident set size of this process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    peak_mb = peak / 1024 if sys.platform != "darwin" else peak / 2**20
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        current = pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        pass
+    return current, peak_mb
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1,
+                       int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def open_search(root: Path, clipboard_path: Path, dimension: int,
+                load_data: bool = True):
+    """Search instance whose stores all live under the benchmark root"""
+    from clipsage.core.catalog import ClipCatalog
+    from clipsage.core.cold_storage import ColdStorage
+    from clipsage.core.embedding_cache import EmbeddingCache
+    from clipsage.core.embeddings import FakeBackend
+    from clipsage.core.images import ImageStage, ThumbnailCache
+    from clipsage.core.mapped_index import MappedVectorIndex
+    from clipsage.core.semantic_search import ClipboardSemanticSearch
+
+    backend = FakeBackend(dimension)
+    return ClipboardSemanticSearch(
+        clipboard_path=clipboard_path,
+        embeddings=backend,
+        embedding_cache=EmbeddingCache(root / "embeddings.sqlite3",
+                                       max_entries=10**7),
+        vector_index=MappedVectorIndex(root / "index" / "bench.vec",
+                                       backend.model_id),
+        catalog=ClipCatalog(root / "catalog.sqlite3", clipboard_path),
+        cold_storage=ColdStorage(root / "cold"),
+        images=ImageStage(ThumbnailCache(root / "thumbnails")),
+        load_data=load_data
+    )
+
+
+def _timed(function, *args, **kwargs) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run_size(entries: int, queries: int = 200, seed: int = 42,
+             images_every: int = 50, dimension: int = 384,
+             workdir: Optional[Path] = None) -> Dict[str, Any]:
+    """Benchmark one corpus size in this process"""
+    root = Path(tempfile.mkdtemp(prefix="clipsage-bench-", dir=workdir))
+    clipboard_path = root / "clips"
+    metrics: Dict[str, Any] = {"entries": entries}
+    try:
+        keys, seconds = _timed(generate_corpus, clipboard_path, entries,
+                               seed, images_every)
+        metrics["generate_s"] = seconds
+
+        # Cold ingest: read, fingerprint, chunk, index and embed it all
+        search, seconds = _timed(open_search, root, clipboard_path,
+                                 dimension)
+        metrics["ingest_s"] = seconds
+        metrics["ingest_entries_per_s"] = entries / seconds
+        metrics["indexed"] = len(search.entries)
+        metrics["vectors"] = len(search.vector_index)
+
+        for mode in SEARCH_MODES:
+            latencies = []
+            for query in make_queries(queries, seed + len(mode)):
+                _, seconds = _timed(search.search, query, k=10, mode=mode)
+                latencies.append(seconds * 1000)
+            metrics[f"search_{mode}_p50_ms"] = percentile(latencies, 0.50)
+            metrics[f"search_{mode}_p99_ms"] = percentile(latencies, 0.99)
+        metrics["rss_mb"], _ = rss_mb()
+
+        # Incremental refresh after new, changed and deleted clips
+        batch = max(10, entries // 100)
+        last = datetime.strptime(keys[-1][7:], "%Y-%m-%d_%H-%M-%S")
+        generate_corpus(clipboard_path, batch, seed + 1, images_every,
+                        start_counter=entries + 1, start_time=last)
+        changed = [path for path in sorted(clipboard_path.glob("*_text.txt"))
+                   [:batch // 5]]
+        for path in changed[:len(changed) // 2]:
+            path.write_text(path.read_text(encoding="utf-8") + " edited",
+                            encoding="utf-8")
+        for path in changed[len(changed) // 2:]:
+            path.unlink()
+        diff, seconds = _timed(search.refresh_data)
+        metrics["refresh_batch"] = str(diff)
+        metrics["refresh_s"] = seconds
+
+        # A single new clip as the watcher reports it
+        new_key = generate_corpus(clipboard_path, 1, seed + 2, 0,
+                                  start_counter=entries + batch + 1,
+                                  start_time=last + timedelta(days=30))[0]
+        _, seconds = _timed(search.refresh_data, entry_keys=[new_key])
+        metrics["refresh_one_s"] = seconds
+
+        # Restarts: re-reading the history vs. starting from a snapshot
+        snapshot = root / "snapshot.pickle"
+        _, seconds = _timed(search.save_snapshot, snapshot)
+        metrics["snapshot_save_s"] = seconds
+        search.cleanup()
+        search, seconds = _timed(open_search, root, clipboard_path,
+                                 dimension)
+        metrics["restart_s"] = seconds
+        search.cleanup()
+
+        def snapshot_start():
+            restored = open_search(root, clipboard_path, dimension,
+                                   load_data=False)
+            restored.load_snapshot(snapshot)
+            restored.refresh_data()
+            return restored
+
+        search, seconds = _timed(snapshot_start)
+        metrics["snapshot_start_s"] = seconds
+        search.cleanup()
+
+        _, metrics["peak_rss_mb"] = rss_mb()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return metrics
+
+
+# --- Runs, reports and comparisons --------------------------------------
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes: Sequence[int], queries: int, seed: int,
+              images_every: int, dimension: int) -> Dict[str, Any]:
+    """Benchmark every size in its own process"""
+    results: Dict[str, Any] = {}
+    for size in sizes:
+        print(f"Benchmarking {size} entries...", file=sys.stderr)
+        process = subprocess.run(
+            [sys.executable, __file__, "_worker", str(size),
+             "--queries", str(queries), "--seed", str(seed),
+             "--images-every", str(images_every),
+             "--dimension", str(dimension)],
+            stdout=subprocess.PIPE, text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Benchmark of {size} entries failed")
+        results[str(size)] = json.loads(process.stdout.splitlines()[-1])
     return {
-        "init_time": init_time,
-        "refresh_time": refresh_time,
-        "avg_search_time": sum(search_times) / len(search_times),
-        "max_search_time": max(search_times),
-        "min_search_time": min(search_times),
-        "get_all_time": get_all_time,
-        "total_items": len(all_items)
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "queries": queries,
+            "seed": seed,
+            "images_every": images_every,
+            "dimension": dimension,
+        },
+        "results": results,
     }
 
 
-def compare_implementations(test_sizes: List[int] = [50, 100, 200, 500]):
-    """Compare original vs optimized implementations"""
-    print("=== ClipSage Performance Comparison ===\n")
-    
-    results = {}
-    
-    for size in test_sizes:
-        print(f"\n--- Testing with {size} clipboard entries ---")
-        
-        # Create temporary test data
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_path = Path(temp_dir) / "clipboard_test"
-            create_test_data(test_path, size)
-            
-            # Test original implementation
-            try:
-                original_results = benchmark_search_system(ClipboardSemanticSearch, test_path)
-                print(f"Original Implementation:")
-                print(f"  Init time: {original_results['init_time']:.3f}s")
-                print(f"  Refresh time: {original_results['refresh_time']:.3f}s")
-                print(f"  Avg search time: {original_results['avg_search_time']*1000:.1f}ms")
-                print(f"  Get all items: {original_results['get_all_time']*1000:.1f}ms")
-            except Exception as e:
-                print(f"Original implementation failed: {e}")
-                original_results = None
-            
-            # Test optimized implementation
-            try:
-                optimized_results = benchmark_search_system(OptimizedClipboardSemanticSearch, test_path)
-                print(f"Optimized Implementation:")
-                print(f"  Init time: {optimized_results['init_time']:.3f}s")
-                print(f"  Refresh time: {optimized_results['refresh_time']:.3f}s")
-                print(f"  Avg search time: {optimized_results['avg_search_time']*1000:.1f}ms")
-                print(f"  Get all items: {optimized_results['get_all_time']*1000:.1f}ms")
-                
-                # Calculate improvements
-                if original_results:
-                    refresh_improvement = ((original_results['refresh_time'] - optimized_results['refresh_time']) / original_results['refresh_time']) * 100
-                    search_improvement = ((original_results['avg_search_time'] - optimized_results['avg_search_time']) / original_results['avg_search_time']) * 100
-                    
-                    print(f"Improvements:")
-                    print(f"  Refresh time: {refresh_improvement:+.1f}%")
-                    print(f"  Search time: {search_improvement:+.1f}%")
-            except Exception as e:
-                print(f"Optimized implementation failed: {e}")
-                optimized_results = None
-            
-            results[size] = {
-                "original": original_results,
-                "optimized": optimized_results
-            }
-    
-    return results
-
-
-def memory_usage_test(duration_minutes: int = 2):
-    """Test memory usage over time"""
-    print(f"\n--- Memory Usage Test ({duration_minutes} minutes) ---")
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_path = Path(temp_dir) / "clipboard_test"
-        create_test_data(test_path, 200)
-        
-        search_system = OptimizedClipboardSemanticSearch(clipboard_path=test_path)
-        
-        start_time = time.time()
-        end_time = start_time + (duration_minutes * 60)
-        
-        memory_samples = []
-        
-        print("Monitoring memory usage...")
-        while time.time() < end_time:
-            # Trigger refresh and search operations
-            search_system.refresh_data()
-            
-            # Perform some searches
-            for query in ["test", "content", "clipboard", "entry"]:
-                search_system.search(query, k=5)
-            
-            # Update performance monitor
-            performance_monitor.update_system_metrics()
-            
-            current_metrics = performance_monitor.get_current_metrics()
-            if current_metrics:
-                memory_samples.append(current_metrics.memory_mb)
-                print(f"Memory: {current_metrics.memory_mb:.1f}MB, CPU: {current_metrics.cpu_percent:.1f}%")
-            
-            time.sleep(10)  # Sample every 10 seconds
-        
-        search_system.cleanup()
-        
-        if memory_samples:
-            print(f"\nMemory Usage Summary:")
-            print(f"  Average: {sum(memory_samples)/len(memory_samples):.1f}MB")
-            print(f"  Peak: {max(memory_samples):.1f}MB")
-            print(f"  Samples: {len(memory_samples)}")
-
-
-def main():
-    """Run performance tests"""
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "memory":
-            memory_usage_test(int(sys.argv[2]) if len(sys.argv) > 2 else 2)
-            return
-        elif sys.argv[1] == "quick":
-            compare_implementations([50, 100])
-            return
-    
-    # Full performance test
-    results = compare_implementations()
-    
-    print("\n=== Performance Summary ===")
-    for size, data in results.items():
-        if data["original"] and data["optimized"]:
-            orig = data["original"]
-            opt = data["optimized"]
-            
-            refresh_improvement = ((orig['refresh_time'] - opt['refresh_time']) / orig['refresh_time']) * 100
-            search_improvement = ((orig['avg_search_time'] - opt['avg_search_time']) / orig['avg_search_time']) * 100
-            
-            print(f"{size} entries: Refresh {refresh_improvement:+.1f}%, Search {search_improvement:+.1f}%")
-    
-    # Run a quick memory test
-    memory_usage_test(1)
+def _gated(metric: str) -> bool:
+    """Whether the metric takes part in gating"""
+    return any(metric.endswith(suffix) for suffix in NOISE_FLOOR) and \
+        metric != "generate_s"
+
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith(HIGHER_IS_BETTER)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Metrics of every size run in both, with regressions flagged
+
+    A metric regresses when it got worse by more than ``tolerance``
+    (0.2 = 20%) and, for timings and memory, by more than the noise floor
+    of its unit. Throughputs get worse by dropping, the rest by growing.
+    """
+    rows = []
+    for size, metrics in current["results"].items():
+        before = baseline["results"].get(size)
+        if before is None:
+            continue
+        for metric, value in metrics.items():
+            old = before.get(metric)
+            if not _gated(metric) or old is None or value is None:
+                continue
+            change = (value - old) / old if old else 0.0
+            if _higher_is_better(metric):
+                regression = -change > tolerance
+            else:
+                floor = next(amount for suffix, amount
+                             in NOISE_FLOOR.items()
+                             if metric.endswith(suffix))
+                regression = change > tolerance and value - old > floor
+            rows.append({
+                "size": int(size), "metric": metric, "baseline": old,
+                "current": value, "change": change,
+                "regression": regression,
+            })
+    return rows
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    """Human-readable table of one run"""
+    sizes = list(report["results"])
+    metrics = [metric for metric in report["results"][sizes[0]]
+               if metric != "refresh_batch"]
+    print(f"{'metric':<26}" + "".join(f"{size:>14}" for size in sizes))
+    for metric in metrics:
+        cells = []
+        for size in sizes:
+            value = report["results"][size].get(metric)
+            cells.append(f"{value:>14.3f}" if isinstance(value, float)
+                         else f"{value!s:>14}")
+        print(f"{metric:<26}" + "".join(cells))
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> int:
+    """Print a comparison, returning the number of regressions"""
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['size']:>7} {row['metric']:<24} "
+              f"{row['baseline']:>10.3f} -> {row['current']:>10.3f} "
+              f"{row['change']:>+8.1%} {flag}")
+    print(f"{len(regressions)} regression(s) in {len(rows)} metrics")
+    return len(regressions)
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="ClipSage benchmark suite",
+        epilog="Commands: run (default), quick, compare BASELINE RESULTS"
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    def add_run_options(command):
+        command.add_argument("--queries", type=int, default=200,
+                             help="Queries per search mode")
+        command.add_argument("--seed", type=int, default=42)
+        command.add_argument("--images-every", type=int, default=50,
+                             help="Every n-th entry is an image, 0 = none")
+        command.add_argument("--dimension", type=int, default=384,
+                             help="Fake embedding size")
+
+    def add_report_options(command):
+        command.add_argument("--output", type=Path,
+                             default=Path("benchmark.json"),
+                             help="Where to write the JSON results")
+        command.add_argument("--baseline", type=Path,
+                             help="Results to compare against; exits 1 on "
+                                  "regressions")
+        command.add_argument("--tolerance", type=float, default=0.2,
+                             help="Allowed slowdown (0.2 = 20%%)")
+
+    run = commands.add_parser("run", help="Benchmark the given sizes")
+    run.add_argument("--sizes", type=int, nargs="+",
+                     default=list(DEFAULT_SIZES))
+    add_run_options(run)
+    add_report_options(run)
+
+    quick = commands.add_parser("quick", help="Benchmark 1000 entries")
+    add_run_options(quick)
+    add_report_options(quick)
+
+    comparison = commands.add_parser("compare",
+                                     help="Compare two result files")
+    comparison.add_argument("baseline", type=Path)
+    comparison.add_argument("results", type=Path)
+    comparison.add_argument("--tolerance", type=float, default=0.2)
+
+    worker = commands.add_parser("_worker")
+    worker.add_argument("size", type=int)
+    add_run_options(worker)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run benchmarks"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0].startswith("-"):
+        argv.insert(0, "run")
+    args = build_parser().parse_args(argv)
+
+    if args.command == "_worker":
+        # Progress output of the index goes to stderr, results to stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            metrics = run_size(args.size, args.queries, args.seed,
+                               args.images_every, args.dimension)
+        print(json.dumps(metrics))
+        return 0
+
+    if args.command == "compare":
+        rows = compare(_load(args.baseline), _load(args.results),
+                       args.tolerance)
+        return 1 if print_comparison(rows) else 0
+
+    sizes = [1000] if args.command == "quick" else args.sizes
+    report = run_suite(sizes, args.queries, args.seed, args.images_every,
+                       args.dimension)
+    args.output.write_text(json.dumps(report, indent=2) + "\n",
+                           encoding="utf-8")
+    print_results(report)
+    print(f"Results written to {args.output}")
+    if args.baseline is not None:
+        rows = compare(_load(args.baseline), report, args.tolerance)
+        return 1 if print_comparison(rows) else 0
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
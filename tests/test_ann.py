@@ -0,0 +1,81 @@
+"""
+Test approximate nearest neighbour search
+"""
+
+import unittest
+
+import numpy as np
+
+from clipsage.core.vector_index import VectorIndex
+
+
+def clustered_vectors(count, dim=16, clusters=20, seed=1):
+    """Generate vectors scattered around a few random directions"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.3 * rng.normal(size=(count, dim))
+
+
+class TestIVFSearch(unittest.TestCase):
+
+    def setUp(self):
+        """Build an exact and an IVF index over the same vectors"""
+        self.vectors = clustered_vectors(3000)
+        ids = [f"v{i}" for i in range(len(self.vectors))]
+        self.exact = VectorIndex()
+        self.exact.add(ids, self.vectors)
+        self.ivf = VectorIndex()
+        self.ivf.configure_ann(mode="ivf", threshold=1000, nlist=32,
+                               nprobe=6)
+        self.ivf.add(ids, self.vectors)
+        self.queries = clustered_vectors(50, seed=2)
+
+    def recall(self, k=10, nprobe=None):
+        """Average overlap between IVF and exact top-k"""
+        hits = 0
+        for query in self.queries:
+            truth = {doc_id for doc_id, _ in self.exact.search(query, k)}
+            found = {doc_id for doc_id, _ in
+                     self.ivf.search(query, k, nprobe=nprobe)}
+            hits += len(truth & found)
+        return hits / (k * len(self.queries))
+
+    def test_recall(self):
+        """IVF finds most of the exact neighbours and improves with nprobe"""
+        low = self.recall(nprobe=1)
+        high = self.recall(nprobe=12)
+        self.assertGreater(high, 0.9)
+        self.assertGreaterEqual(high, low)
+        self.assertTrue(self.ivf._ivf.is_trained)
+
+    def test_all_probes_match_exact(self):
+        """Probing every cluster gives exact results"""
+        self.assertEqual(self.recall(nprobe=32), 1.0)
+
+    def test_exact_below_threshold(self):
+        """Small indexes never train an IVF partitioning"""
+        index = VectorIndex()
+        index.configure_ann(mode="ivf", threshold=5000)
+        index.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+        self.assertEqual(index.search([1.0, 0.0], k=1)[0][0], "a")
+        self.assertIsNone(index._ivf)
+
+    def test_updates_after_training(self):
+        """Added, removed and compacted rows stay consistent"""
+        self.recall()
+        self.ivf.add(["new"], [self.queries[0] * 10])
+        self.assertEqual(self.ivf.search(self.queries[0], 1)[0][0], "new")
+
+        removed = {f"v{i}" for i in range(1500)}
+        self.ivf.remove(removed)
+        self.ivf.compact()
+        self.assertEqual(self.ivf.search(self.queries[0], 1)[0][0], "new")
+        found = {doc_id for doc_id, _ in
+                 self.ivf.search(self.queries[1], 10, nprobe=32)}
+        self.assertEqual(found & removed, set())
+        self.assertEqual(len(found), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
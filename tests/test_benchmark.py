@@ -0,0 +1,113 @@
+"""
+Tests for the benchmark suite in scripts/performance_test.py
+"""
+
+import importlib.util
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clipsage.core.catalog import parse_entry_key
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "performance_test.py"
+spec = importlib.util.spec_from_file_location("performance_test", SCRIPT)
+benchmark = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(benchmark)
+
+
+def report(**metrics):
+    return {"meta": {}, "results": {"1000": metrics}}
+
+
+class TestCorpus(unittest.TestCase):
+    """Synthetic clipboard histories"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_layout_and_determinism(self):
+        keys = benchmark.generate_corpus(self.temp_dir / "a", 120,
+                                         images_every=40)
+        again = benchmark.generate_corpus(self.temp_dir / "b", 120,
+                                          images_every=40)
+        files = sorted(path.name for path in (self.temp_dir / "a").iterdir())
+
+        self.assertEqual(len(files), 120)
+        self.assertEqual(sorted(parse_entry_key(name) for name in files),
+                         keys)
+        self.assertEqual(len([name for name in files
+                              if name.endswith("_image.png")]), 3)
+        self.assertEqual(keys, again)
+        for name in files:
+            self.assertEqual((self.temp_dir / "a" / name).read_bytes(),
+                             (self.temp_dir / "b" / name).read_bytes())
+
+    def test_queries_are_distinct(self):
+        queries = benchmark.make_queries(100)
+        self.assertEqual(len(set(queries)), 100)
+        self.assertEqual(queries, benchmark.make_queries(100))
+
+
+class TestCompare(unittest.TestCase):
+    """Regression gating between two runs"""
+
+    def test_regressions(self):
+        baseline = report(ingest_s=1.0, search_hybrid_p50_ms=2.0,
+                          rss_mb=100.0, refresh_one_s=0.001, indexed=1000)
+        current = report(ingest_s=1.5, search_hybrid_p50_ms=2.1,
+                         rss_mb=103.0, refresh_one_s=0.004, indexed=1200)
+        rows = {row["metric"]: row
+                for row in benchmark.compare(baseline, current, 0.2)}
+
+        self.assertTrue(rows["ingest_s"]["regression"])
+        self.assertFalse(rows["search_hybrid_p50_ms"]["regression"])
+        # Larger ratios than the tolerance, but within the noise floor
+        self.assertFalse(rows["rss_mb"]["regression"])
+        self.assertFalse(rows["refresh_one_s"]["regression"])
+        self.assertNotIn("indexed", rows)
+
+    def test_throughput_regresses_when_it_drops(self):
+        baseline = report(ingest_entries_per_s=1000.0, ingest_s=1.0)
+        faster = report(ingest_entries_per_s=2000.0, ingest_s=0.5)
+        slower = report(ingest_entries_per_s=100.0, ingest_s=10.0)
+
+        rows = {row["metric"]: row
+                for row in benchmark.compare(baseline, faster)}
+        self.assertFalse(rows["ingest_entries_per_s"]["regression"])
+        self.assertFalse(rows["ingest_s"]["regression"])
+        rows = {row["metric"]: row
+                for row in benchmark.compare(baseline, slower)}
+        self.assertTrue(rows["ingest_entries_per_s"]["regression"])
+        self.assertTrue(rows["ingest_s"]["regression"])
+
+    def test_sizes_missing_from_baseline(self):
+        current = {"meta": {}, "results": {"5000": {"ingest_s": 9.0}}}
+        self.assertEqual(benchmark.compare(report(ingest_s=1.0), current),
+                         [])
+
+
+class TestRunSize(unittest.TestCase):
+    """One small benchmark run end to end"""
+
+    def test_metrics(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            metrics = benchmark.run_size(200, queries=5, images_every=0,
+                                         dimension=16, workdir=temp_dir)
+            self.assertEqual(list(temp_dir.iterdir()), [])
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(metrics["indexed"], 200)
+        self.assertEqual(metrics["refresh_batch"], "+10 ~1 -1")
+        for mode in benchmark.SEARCH_MODES:
+            self.assertGreater(metrics[f"search_{mode}_p99_ms"], 0)
+        self.assertGreater(metrics["peak_rss_mb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
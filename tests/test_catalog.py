@@ -0,0 +1,118 @@
+"""
+Tests for the clipboard metadata catalog
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clipsage.core.catalog import (
+    CatalogEntry, ClipCatalog, entry_kind, open_default_catalog,
+    parse_entry_key, parse_entry_time
+)
+from clipsage.core.config import config
+
+
+def make_entry(counter, day, kind="text"):
+    entry_id = f"{counter:06d}_2025-09-{day:02d}_10-30-00"
+    return CatalogEntry(
+        entry_id=entry_id,
+        counter=counter,
+        created=parse_entry_time(entry_id),
+        type=kind,
+        preview=f"entry {counter}",
+        text_bytes=10,
+        text_path=f"/clips/clip_{entry_id}_text.txt"
+    )
+
+
+class TestFilenameParsing(unittest.TestCase):
+
+    def test_parse_entry_key(self):
+        self.assertEqual(
+            parse_entry_key("clip_000042_2025-09-28_10-30-45_text.txt"),
+            "000042_2025-09-28_10-30-45"
+        )
+        self.assertIsNone(parse_entry_key("notes_text.txt"))
+        self.assertIsNone(parse_entry_key("clip_000042_text.txt"))
+
+    def test_entry_kind(self):
+        self.assertEqual(entry_kind("clip_1_a_b_text.txt"), "text")
+        self.assertEqual(entry_kind("clip_1_a_b_image.png"), "image")
+        self.assertIsNone(entry_kind("clip_1_a_b_formats.txt"))
+
+    def test_parse_entry_time(self):
+        self.assertEqual(parse_entry_time("000042_2025-09-28_10-30-45"),
+                         "2025-09-28 10:30:45")
+
+
+class TestClipCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "catalog.sqlite3"
+        self.catalog = ClipCatalog(self.db_path, self.temp_dir / "clips")
+        self.catalog.upsert_many([
+            make_entry(1, 1), make_entry(2, 2, "image"), make_entry(3, 3)
+        ])
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.temp_dir)
+
+    def ids(self, entries):
+        return [entry.counter for entry in entries]
+
+    def test_list_newest_first(self):
+        self.assertEqual(self.ids(self.catalog.list()), [3, 2, 1])
+        self.assertEqual(self.ids(self.catalog.list(offset=1, limit=1)), [2])
+
+    def test_filters(self):
+        self.assertEqual(self.ids(self.catalog.list(types=["text"])), [3, 1])
+        self.assertEqual(
+            self.ids(self.catalog.list(since="2025-09-02",
+                                       until="2025-09-03")),
+            [2]
+        )
+        self.assertEqual(self.catalog.count(types=["image"]), 1)
+
+    def test_get_and_remove(self):
+        entry = self.catalog.get("000001_2025-09-01_10-30-00")
+        self.assertEqual(entry.preview, "entry 1")
+        self.assertEqual(entry.files["text"].name,
+                         "clip_000001_2025-09-01_10-30-00_text.txt")
+
+        self.catalog.remove_many([entry.entry_id])
+        self.assertNotIn(entry.entry_id, self.catalog)
+        self.assertEqual(self.catalog.retain(["000003_2025-09-03_10-30-00"]),
+                         1)
+        self.assertEqual(len(self.catalog), 1)
+
+    def test_persists_per_clipboard_directory(self):
+        self.catalog.close()
+        self.catalog = ClipCatalog(self.db_path, self.temp_dir / "clips")
+        self.assertEqual(len(self.catalog), 3)
+
+        # A catalog opened for another directory starts over
+        self.catalog.close()
+        self.catalog = ClipCatalog(self.db_path, self.temp_dir / "other")
+        self.assertEqual(len(self.catalog), 0)
+
+    def test_default_catalog_per_directory(self):
+        self.addCleanup(config.set, "cache_path", config.get("cache_path"))
+        config.set("cache_path", str(self.temp_dir / "cache"))
+        first = open_default_catalog(self.temp_dir / "clips")
+        first.upsert_many([make_entry(1, 1)])
+        first.close()
+
+        other = open_default_catalog(self.temp_dir / "other")
+        self.assertEqual(len(other), 0)
+        other.close()
+        first = open_default_catalog(self.temp_dir / "clips")
+        self.assertEqual(len(first), 1)
+        first.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Tests for splitting long clips into passages
+"""
+
+import unittest
+
+from clipsage.core.chunking import TextChunker, chunk_id, split_vector_id
+
+
+class TestTextChunker(unittest.TestCase):
+
+    def test_short_text_is_one_chunk(self):
+        chunks = TextChunker(window=10, overlap=2).split("just a few words")
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].text, "just a few words")
+
+    def test_windows_overlap_on_token_boundaries(self):
+        text = " ".join(f"w{n}" for n in range(20))
+        chunks = TextChunker(window=8, overlap=3).split(text)
+
+        self.assertEqual([chunk.text.split()[0] for chunk in chunks],
+                         ["w0", "w5", "w10", "w15"])
+        self.assertEqual(chunks[0].text.split()[-3:],
+                         chunks[1].text.split()[:3])
+        self.assertEqual(chunks[-1].text.split()[-1], "w19")
+        for chunk in chunks:
+            self.assertEqual(text[chunk.start:chunk.end], chunk.text)
+
+    def test_max_chunks(self):
+        text = " ".join(f"w{n}" for n in range(1000))
+        chunks = TextChunker(window=10, overlap=0, max_chunks=3).split(text)
+        self.assertEqual([chunk.text.split()[0] for chunk in chunks],
+                         ["w0", "w10", "w20"])
+
+    def test_vector_ids(self):
+        self.assertEqual(split_vector_id(chunk_id("clip_1", 4)),
+                         ("clip_1", 4))
+        self.assertEqual(split_vector_id("clip_1"), ("clip_1", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
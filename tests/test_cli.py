@@ -0,0 +1,129 @@
+"""
+Tests for the headless command line interface
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from argparse import ArgumentTypeError
+from datetime import datetime
+from pathlib import Path
+
+from clipsage.cli import parse_since
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestParseSince(unittest.TestCase):
+    """Time bounds given on the command line"""
+
+    def test_durations(self):
+        now = datetime(2025, 9, 28, 12, 0, 0)
+        self.assertEqual(parse_since("1h", now), "2025-09-28 11:00:00")
+        self.assertEqual(parse_since("90m", now), "2025-09-28 10:30:00")
+        self.assertEqual(parse_since("2d", now), "2025-09-26 12:00:00")
+
+    def test_dates(self):
+        self.assertEqual(parse_since("2025-09-28"), "2025-09-28 00:00:00")
+        self.assertEqual(parse_since("2025-09-28 10:30:00"),
+                         "2025-09-28 10:30:00")
+
+    def test_invalid(self):
+        with self.assertRaises(ArgumentTypeError):
+            parse_since("yesterday")
+
+
+class TestCommands(unittest.TestCase):
+    """search and list run end to end without Qt or an embedding server"""
+
+    def setUp(self):
+        self.home = Path(tempfile.mkdtemp())
+        self.clipboard_path = self.home / "clips"
+        self.clipboard_path.mkdir()
+        config_dir = self.home / ".config" / "clipsage"
+        config_dir.mkdir(parents=True)
+        (config_dir / "config.json").write_text(json.dumps({
+            "clipboard_path": str(self.clipboard_path),
+            "cache_path": str(self.home / "cache"),
+        }))
+        for counter, text in ((1, "ssh deploy@db-01.prod.local"),
+                              (2, "git rebase --onto main"),
+                              (3, "ssh root@web-02.prod.local")):
+            (self.clipboard_path /
+             f"clip_{counter:06d}_2025-09-28_10-30-{counter:02d}_text.txt"
+             ).write_text(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.home)
+
+    def clipsage(self, *args, entry_point=("-m", "clipsage")):
+        """Run the command as installed (clipsage.__main__:main)"""
+        env = dict(os.environ, HOME=str(self.home),
+                   XDG_RUNTIME_DIR=str(self.home),  # No daemon here
+                   OLLAMA_HOST="http://127.0.0.1:9",  # Nor Ollama
+                   PYTHONPATH=str(PROJECT_ROOT))
+        result = subprocess.run(
+            [sys.executable, *entry_point, *args],
+            capture_output=True, text=True, env=env, cwd=self.home,
+            timeout=60
+        )
+        return result
+
+    def test_search_json(self):
+        for _ in range(2):  # Second run starts from the saved snapshot
+            result = self.clipsage("search", "ssh prod", "-k", "5",
+                                   "--mode", "lexical", "--json")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            results = json.loads(result.stdout)
+            self.assertEqual(
+                sorted(item["entry_id"] for item in results),
+                ["000001_2025-09-28_10-30-01", "000003_2025-09-28_10-30-03"]
+            )
+        self.assertTrue(list((self.home / "cache" / "snapshots").iterdir()))
+
+    def test_search_without_embedding_backend(self):
+        for mode in ("hybrid", "semantic"):
+            result = self.clipsage("search", "rebase", "--mode", mode,
+                                   "--json")
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual([item["entry_id"]
+                              for item in json.loads(result.stdout)],
+                             ["000002_2025-09-28_10-30-02"])
+
+    def test_search_does_not_import_langchain(self):
+        code = (
+            "import sys\n"
+            "from clipsage import cli\n"
+            "cli.main(['search', 'ssh prod', '--mode', 'lexical'])\n"
+            "cli.main(['list', '-n', '1'])\n"
+            "print(sorted(name for name in sys.modules\n"
+            "             if name.startswith('langchain')))\n"
+        )
+        for _ in range(2):  # Second run starts from the saved snapshot
+            result = self.clipsage(entry_point=["-c", code])
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.splitlines()[-1], "[]")
+
+    def test_list(self):
+        result = self.clipsage("list", "--since", "2025-09-28 10:30:02",
+                               "--json")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual([item["entry_id"]
+                          for item in json.loads(result.stdout)],
+                         ["000003_2025-09-28_10-30-03",
+                          "000002_2025-09-28_10-30-02"])
+
+    def test_checkout_entry_point(self):
+        result = self.clipsage("list", "-n", "1", "--json",
+                               entry_point=[str(PROJECT_ROOT / "__main__.py")])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(len(json.loads(result.stdout)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the compressed cold storage tier
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clipsage.core.catalog import CatalogEntry, parse_entry_time
+from clipsage.core.cold_storage import ColdStorage
+
+
+class TestColdStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.clipboard_path = self.temp_dir / "clipboard_manager"
+        self.clipboard_path.mkdir()
+        self.storage = ColdStorage(self.temp_dir / "cold", codec="gzip",
+                                   segment_bytes=64)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.temp_dir)
+
+    def make_entry(self, counter, text, image=None):
+        entry_id = f"{counter:06d}_2025-09-01_10-30-00"
+        text_path = self.clipboard_path / f"clip_{entry_id}_text.txt"
+        text_path.write_text(text)
+        image_path = None
+        if image is not None:
+            image_path = self.clipboard_path / f"clip_{entry_id}_image.png"
+            image_path.write_bytes(image)
+        return CatalogEntry(
+            entry_id=entry_id, counter=counter,
+            created=parse_entry_time(entry_id), type="text",
+            preview=text[:100], text_bytes=len(text),
+            text_path=str(text_path),
+            image_path=str(image_path) if image_path else None
+        )
+
+    def test_pack_and_read(self):
+        entry = self.make_entry(1, "hello " * 100, image=b"\x89PNG fake")
+        signature = entry.files["text"].stat()
+
+        self.assertEqual(self.storage.pack([entry]), [entry.entry_id])
+
+        self.assertEqual(list(self.clipboard_path.iterdir()), [])
+        self.assertIn(entry.entry_id, self.storage)
+        text_name = entry.files["text"].name
+        self.assertEqual(self.storage.read(text_name), b"hello " * 100)
+        self.assertEqual(self.storage.read(entry.files["image"].name),
+                         b"\x89PNG fake")
+        self.assertIsNone(self.storage.read("missing"))
+
+        stored = {f.kind: f for f in self.storage.files([entry.entry_id])}
+        self.assertEqual(stored["text"].size, signature.st_size)
+        self.assertEqual(stored["text"].mtime_ns, signature.st_mtime_ns)
+        self.assertLess(stored["text"].length, signature.st_size)
+
+        # Packing again is a no-op
+        self.assertEqual(self.storage.pack([entry]), [])
+
+    def test_segments_roll_over_and_compact(self):
+        entries = [self.make_entry(n, f"clip number {n} " * 40)
+                   for n in range(1, 7)]
+        self.storage.pack(entries)
+        segments = sorted((self.temp_dir / "cold").glob("segment_*.seg"))
+        self.assertGreater(len(segments), 1)
+
+        self.storage.remove([entry.entry_id for entry in entries[:5]])
+        self.assertEqual(len(self.storage), 1)
+        self.assertGreater(self.storage.compact(), 0)
+
+        self.assertLess(
+            len(list((self.temp_dir / "cold").glob("segment_*.seg"))),
+            len(segments)
+        )
+        name = entries[5].files["text"].name
+        self.assertEqual(self.storage.read(name),
+                         b"clip number 6 " * 40)
+
+    def test_reopen(self):
+        entry = self.make_entry(1, "persisted clip")
+        self.storage.pack([entry])
+        self.storage.close()
+
+        self.storage = ColdStorage(self.temp_dir / "cold")
+        self.assertEqual(self.storage.read(entry.files["text"].name),
+                         b"persisted clip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for the search daemon and its client
+"""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from clipsage.core.catalog import ClipCatalog
+from clipsage.core.cold_storage import ColdStorage
+from clipsage.core.embedding_cache import EmbeddingCache
+from clipsage.core.images import ImageStage, ThumbnailCache
+from clipsage.core.mapped_index import MappedVectorIndex
+from clipsage.core.semantic_search import ClipboardSemanticSearch
+from clipsage.daemon import ClipboardDaemon, DaemonClient, DaemonError
+
+
+class TestClipboardDaemon(unittest.TestCase):
+    """Requests over the socket against one shared index"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.clipboard_path = self.temp_dir / "clipboard_manager"
+        self.clipboard_path.mkdir()
+        self.write_clip(1, "ssh deploy@db-01.prod.local")
+        self.write_clip(2, "git rebase --onto main feature")
+
+        self.search = ClipboardSemanticSearch(
+            clipboard_path=self.clipboard_path,
+            embeddings=DeterministicFakeEmbedding(size=16),
+            embedding_cache=EmbeddingCache(self.temp_dir / "embeddings.db"),
+            vector_index=MappedVectorIndex(
+                self.temp_dir / "index" / "test.vec", "test"
+            ),
+            catalog=ClipCatalog(self.temp_dir / "catalog.sqlite3",
+                                self.clipboard_path),
+            cold_storage=ColdStorage(self.temp_dir / "cold"),
+            images=ImageStage(ThumbnailCache(self.temp_dir / "thumbs")),
+            load_data=False
+        )
+        self.socket_path = self.temp_dir / "clipsage.sock"
+        self.daemon = ClipboardDaemon(
+            self.search, self.socket_path, watch=False,
+            snapshot_path=self.temp_dir / "snapshot.pickle"
+        )
+        self.thread = threading.Thread(
+            target=lambda: asyncio.run(self.daemon.serve()), daemon=True
+        )
+        self.thread.start()
+        self.assertTrue(self.daemon.ready.wait(10))
+        self.client = DaemonClient(self.socket_path, timeout=10)
+        self.wait_until_indexed(2)
+
+    def tearDown(self):
+        self.client.close()
+        self.daemon.stop()
+        self.thread.join(10)
+        self.search.cleanup()
+        shutil.rmtree(self.temp_dir)
+
+    def write_clip(self, counter, text):
+        (self.clipboard_path /
+         f"clip_{counter:06d}_2025-09-28_10-30-{counter:02d}_text.txt"
+         ).write_text(text)
+
+    def wait_until_indexed(self, count):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            status = self.client.request("status")
+            if status["indexed"] == count and not status["refreshing"]:
+                return
+            time.sleep(0.05)
+        self.fail(f"Index never reached {count} entries")
+
+    def test_search_list_get(self):
+        self.assertEqual(self.client.request("ping"), "pong")
+
+        results = self.client.request("search", query="prod.local", k=5,
+                                      mode="lexical")
+        self.assertEqual([item["entry_id"] for item in results],
+                         ["000001_2025-09-28_10-30-01"])
+
+        items = self.client.request("list", limit=1)
+        self.assertEqual(items[0]["entry_id"], "000002_2025-09-28_10-30-02")
+
+        item = self.client.request("get",
+                                   entry_id="000002_2025-09-28_10-30-02")
+        self.assertIn("git rebase", item["content"])
+        self.assertIsNone(self.client.request("get", entry_id="missing"))
+
+    def test_errors_keep_the_connection(self):
+        with self.assertRaises(DaemonError):
+            self.client.request("drop_tables")
+        with self.assertRaises(DaemonError):
+            self.client.request("search", q="no such parameter")
+        self.assertEqual(self.client.request("ping"), "pong")
+
+    def test_concurrent_clients(self):
+        errors, counts = [], []
+
+        def run():
+            try:
+                with DaemonClient(self.socket_path, timeout=10) as client:
+                    for _ in range(20):
+                        counts.append(len(client.request(
+                            "search", query="rebase main", mode="hybrid"
+                        )))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(counts, [2] * 160)
+
+    def test_refresh_request(self):
+        self.write_clip(3, "kubectl get pods --all-namespaces")
+        self.assertTrue(self.client.request("refresh"))
+        self.wait_until_indexed(3)
+
+        results = self.client.request("search", query="kubectl",
+                                      mode="lexical")
+        self.assertEqual(results[0]["entry_id"], "000003_2025-09-28_10-30-03")
+
+    def test_second_daemon_is_refused(self):
+        other = ClipboardDaemon(self.search, self.socket_path, watch=False,
+                                snapshot_path=self.temp_dir / "other")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(other.serve())
+
+
+if __name__ == "__main__":
+    unittest.main()
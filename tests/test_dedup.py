@@ -0,0 +1,51 @@
+"""
+Tests for clipboard content fingerprints
+"""
+
+import unittest
+
+from PIL import Image
+
+from clipsage.core.dedup import (fingerprint, group_id, image_dhash,
+                                 normalize_text)
+
+
+def gradient(width, height):
+    """A horizontal gradient image"""
+    image = Image.new("RGB", (width, height))
+    image.putdata([(x * 255 // width, 0, 0)
+                   for y in range(height) for x in range(width)])
+    return image
+
+
+class TestFingerprints(unittest.TestCase):
+    """Fingerprints of text and image clips"""
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  a\tb\n\nc  "), "a b c")
+        # Composed and decomposed forms are the same text
+        self.assertEqual(normalize_text("é"), normalize_text("é"))
+
+    def test_text_fingerprint_ignores_whitespace(self):
+        self.assertEqual(fingerprint("hello  world\n", None),
+                         fingerprint("hello world", None))
+        self.assertNotEqual(fingerprint("hello world", None),
+                            fingerprint("hello there", None))
+
+    def test_image_hash_survives_rescaling(self):
+        image = gradient(64, 48)
+        self.assertEqual(image_dhash(image),
+                         image_dhash(image.resize((128, 96))))
+        self.assertNotEqual(image_dhash(image),
+                            image_dhash(image.transpose(
+                                Image.Transpose.FLIP_LEFT_RIGHT)))
+
+    def test_text_and_image_are_kept_apart(self):
+        text_only = fingerprint("caption", None)
+        both = fingerprint("caption", image_dhash(gradient(16, 16)))
+        self.assertNotEqual(text_only, both)
+        self.assertTrue(group_id(both).startswith("dup_"))
+
+
+if __name__ == "__main__":
+    unittest.main()
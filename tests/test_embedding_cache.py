@@ -0,0 +1,87 @@
+"""
+Test the persistent embedding cache
+"""
+
+import unittest
+import tempfile
+from pathlib import Path
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from clipsage.core.embedding_cache import (
+    CachedEmbeddings, EmbeddingCache, content_hash
+)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a cache in a temporary directory"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "embeddings.sqlite3"
+        self.cache = EmbeddingCache(self.db_path, max_entries=3)
+
+    def test_roundtrip(self):
+        """Stored vectors come back as float32 values"""
+        key = content_hash("hello")
+        self.cache.put_many("model-a", [key], [[0.5, -1.0, 2.0]])
+        self.assertEqual(self.cache.get_many("model-a", [key]),
+                         {key: [0.5, -1.0, 2.0]})
+
+    def test_keyed_by_model(self):
+        """The same content under another model is a miss"""
+        key = content_hash("hello")
+        self.cache.put_many("model-a", [key], [[1.0]])
+        self.assertEqual(self.cache.get_many("model-b", [key]), {})
+
+    def test_persists_across_instances(self):
+        """Vectors survive closing and reopening the database"""
+        key = content_hash("persisted")
+        self.cache.put_many("model-a", [key], [[1.0, 2.0]])
+        self.cache.close()
+
+        self.cache = EmbeddingCache(self.db_path, max_entries=3)
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn(key, self.cache.get_many("model-a", [key]))
+
+    def test_lru_eviction(self):
+        """The least recently used vector is evicted first"""
+        keys = [content_hash(str(i)) for i in range(4)]
+        for key in keys[:3]:
+            self.cache.put_many("m", [key], [[1.0]])
+        # Touch the oldest entry so the second one becomes the LRU
+        self.cache.get_many("m", [keys[0]])
+        self.cache.put_many("m", [keys[3]], [[1.0]])
+
+        self.assertEqual(len(self.cache), 3)
+        found = self.cache.get_many("m", keys)
+        self.assertNotIn(keys[1], found)
+        self.assertIn(keys[0], found)
+
+    def test_cached_embeddings_only_embed_unseen_content(self):
+        """Only texts missing from the cache reach the backend"""
+        calls = []
+
+        class Recording(DeterministicFakeEmbedding):
+            def embed_documents(self, texts):
+                calls.append(list(texts))
+                return super().embed_documents(texts)
+
+        embeddings = CachedEmbeddings(Recording(size=8), self.cache, "m")
+        first = embeddings.embed_documents(["a", "b", "a"])
+        second = embeddings.embed_documents(["b", "c"])
+
+        self.assertEqual(calls, [["a", "b"], ["c"]])
+        self.assertEqual(first[0], first[2])
+        for expected, cached in zip(first[1], second[0]):
+            self.assertAlmostEqual(expected, cached, places=5)
+
+    def tearDown(self):
+        """Clean up test environment"""
+        import shutil
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Test the batched embedding pipeline
+"""
+
+import threading
+import time
+import unittest
+
+from clipsage.core.embedding_pipeline import Document, EmbeddingPipeline
+
+
+class SlowEmbeddings:
+    """Embeddings that track concurrency and can fail a few times"""
+
+    def __init__(self, failures=0, delay=0.01):
+        self.failures = failures
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("temporarily unavailable")
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.batch_sizes.append(len(texts))
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+
+def make_documents(count):
+    """Create numbered test documents"""
+    return [Document(id=f"doc_{i}", page_content="x" * (i + 1))
+            for i in range(count)]
+
+
+class TestEmbeddingPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """Collect sink output"""
+        self.stored = {}
+
+    def sink(self, documents, vectors):
+        for doc, vector in zip(documents, vectors):
+            self.stored[doc.id] = vector
+
+    def test_batches_and_concurrency(self):
+        """Documents are embedded in bounded, concurrent batches"""
+        embeddings = SlowEmbeddings()
+        pipeline = EmbeddingPipeline(embeddings, self.sink, batch_size=4,
+                                     max_in_flight=2, retry_delay=0)
+        progress = []
+        stats = pipeline.run(make_documents(10),
+                             progress=lambda done, total:
+                             progress.append((done, total)))
+
+        self.assertEqual(stats.embedded, 10)
+        self.assertEqual(stats.batches, 3)
+        self.assertEqual(sorted(embeddings.batch_sizes), [2, 4, 4])
+        self.assertLessEqual(embeddings.peak, 2)
+        self.assertEqual(self.stored["doc_9"], [10.0])
+        self.assertEqual(progress[-1], (10, 10))
+
+    def test_retries_transient_failures(self):
+        """A batch that fails a few times is retried"""
+        pipeline = EmbeddingPipeline(SlowEmbeddings(failures=2), self.sink,
+                                     batch_size=8, max_in_flight=1,
+                                     max_retries=3, retry_delay=0)
+        stats = pipeline.run(make_documents(3))
+        self.assertEqual(stats.embedded, 3)
+        self.assertEqual(stats.retries, 2)
+        self.assertEqual(stats.failed_ids, [])
+
+    def test_reports_failed_documents(self):
+        """Batches that exhaust their retries are reported as failed"""
+        pipeline = EmbeddingPipeline(SlowEmbeddings(failures=10), self.sink,
+                                     batch_size=8, max_in_flight=1,
+                                     max_retries=1, retry_delay=0)
+        stats = pipeline.run(make_documents(2))
+        self.assertEqual(stats.embedded, 0)
+        self.assertEqual(sorted(stats.failed_ids), ["doc_0", "doc_1"])
+        self.assertEqual(self.stored, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
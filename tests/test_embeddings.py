@@ -0,0 +1,108 @@
+"""
+Tests for the embedding backends
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from clipsage.core.catalog import ClipCatalog
+from clipsage.core.cold_storage import ColdStorage
+from clipsage.core.embedding_cache import EmbeddingCache
+from clipsage.core.embeddings import (
+    FakeBackend, HashingBackend, OllamaBackend, create_backend
+)
+from clipsage.core.images import ImageStage
+from clipsage.core.mapped_index import MappedVectorIndex
+from clipsage.core.semantic_search import ClipboardSemanticSearch
+
+
+def cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestBackends(unittest.TestCase):
+    """Vectors of the in-process backends"""
+
+    def test_fake_is_deterministic(self):
+        backend = FakeBackend(dimension=32)
+        first = backend.embed_documents(["alpha", "beta"])
+        again = FakeBackend(dimension=32).embed_query("alpha")
+
+        self.assertEqual(first[0], again)
+        self.assertEqual(len(again), 32)
+        self.assertAlmostEqual(float(np.linalg.norm(again)), 1.0, places=5)
+        self.assertLess(abs(cosine(first[0], first[1])), 0.9)
+        self.assertEqual(backend.model_id, "fake-d32")
+
+    def test_hashing_ranks_overlap(self):
+        backend = HashingBackend(dimension=256)
+        query = backend.embed_query("postgres connection refused")
+        close = backend.embed_query("psql: connection to postgres refused")
+        far = backend.embed_query("banana bread recipe with walnuts")
+
+        self.assertGreater(cosine(query, close), cosine(query, far) + 0.2)
+        self.assertEqual(backend.embed_documents(["same"])[0],
+                         HashingBackend(dimension=256).embed_query("same"))
+        self.assertEqual(len(query), 256)
+
+    def test_hashing_empty_text(self):
+        vector = HashingBackend(dimension=64).embed_query("")
+        self.assertEqual(vector, [0.0] * 64)
+
+    def test_create_backend(self):
+        self.assertIsInstance(create_backend("hashing"), HashingBackend)
+        backend = create_backend("ollama", model="nomic-embed-text")
+        self.assertIsInstance(backend, OllamaBackend)
+        self.assertEqual(backend.model_id, "nomic-embed-text")
+        with self.assertRaises(ValueError):
+            create_backend("word2vec")
+
+
+class TestOfflineSearch(unittest.TestCase):
+    """Semantic search with the hashing backend needs no server"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        clipboard_path = self.temp_dir / "clipboard_manager"
+        clipboard_path.mkdir()
+        for counter, text in ((1, "kubectl rollout restart deployment/api"),
+                              (2, "SELECT * FROM invoices WHERE paid = 0"),
+                              (3, "Meeting notes: quarterly planning")):
+            (clipboard_path /
+             f"clip_{counter:06d}_2025-09-28_10-30-{counter:02d}_text.txt"
+             ).write_text(text)
+
+        backend = HashingBackend(dimension=256)
+        self.search = ClipboardSemanticSearch(
+            clipboard_path=clipboard_path,
+            embeddings=backend,
+            embedding_cache=EmbeddingCache(self.temp_dir / "cache.db"),
+            vector_index=MappedVectorIndex(
+                self.temp_dir / "index.vec", backend.model_id
+            ),
+            catalog=ClipCatalog(self.temp_dir / "catalog.sqlite3",
+                                clipboard_path),
+            cold_storage=ColdStorage(self.temp_dir / "cold"),
+            images=ImageStage()
+        )
+
+    def tearDown(self):
+        self.search.cleanup()
+        shutil.rmtree(self.temp_dir)
+
+    def test_semantic_search(self):
+        self.assertEqual(self.search.model_name, "hashing-v1-35-d256")
+        self.assertEqual(len(self.search.vector_index), 3)
+
+        results = self.search.search("unpaid invoice query", k=1,
+                                     mode="semantic")
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000002_2025-09-28_10-30-02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for the clipboard monitor event stream
+"""
+
+import io
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from clipsage.backend.clipboard_manager import ClipboardManager
+from clipsage.backend.events import EventReader, parse_event
+
+
+FAKE_MONITOR = """#!{python}
+import json, sys
+assert "--events" in sys.argv
+sys.stderr.write("log line\\n" * 20000)  # More than a pipe buffer
+sys.stderr.flush()
+print(json.dumps({{"event": "ready", "dir": "/tmp/clips"}}), flush=True)
+for n in (1, 2):
+    key = f"00000{{n}}_2025-09-28_10-30-45-000"
+    print(json.dumps({{
+        "event": "clip", "entry_id": key, "types": ["text", "formats"],
+        "paths": {{"text": f"/tmp/clips/clip_{{key}}_text.txt"}}
+    }}), flush=True)
+"""
+
+
+class TestParseEvent(unittest.TestCase):
+
+    def test_clip_event(self):
+        event = parse_event(
+            b'{"event": "clip", "entry_id": "000001_2025-09-28_10-30-45",'
+            b' "types": ["text"], "paths": {"text": "/t/clip_x_text.txt"}}\n'
+        )
+        self.assertEqual(event.entry_id, "000001_2025-09-28_10-30-45")
+        self.assertEqual(event.types, ("text",))
+        self.assertEqual(event.paths["text"], Path("/t/clip_x_text.txt"))
+
+    def test_entry_id_from_path(self):
+        event = parse_event(
+            b'{"event": "clip", "paths": {"image":'
+            b' "/t/clip_000007_2025-09-28_10-30-45-120_image.png"}}'
+        )
+        self.assertEqual(event.entry_id, "000007_2025-09-28_10-30-45-120")
+        self.assertEqual(event.types, ("image",))
+
+    def test_other_lines_are_skipped(self):
+        self.assertIsNone(parse_event(b'{"event": "ready"}'))
+        self.assertIsNone(parse_event(b"Saved text clip: clip_1"))
+        self.assertIsNone(parse_event(b'{"event": "clip", "paths": {}}'))
+
+
+class TestEventReader(unittest.TestCase):
+
+    def test_reads_until_end_of_stream(self):
+        stream = io.BytesIO(
+            b'{"event": "clip", "entry_id": "a"}\n'
+            b"garbage\n"
+            b'{"event": "clip", "entry_id": "b"}\n'
+        )
+        events = []
+        reader = EventReader(stream, events.append)
+        reader.start()
+        reader.join(timeout=5)
+        self.assertEqual([event.entry_id for event in events], ["a", "b"])
+        self.assertFalse(reader.running)
+
+
+class TestClipboardManagerEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.binary = self.temp_dir / "fake_monitor"
+        self.binary.write_text(FAKE_MONITOR.format(python=sys.executable))
+        self.binary.chmod(self.binary.stat().st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_events_reach_subscribers(self):
+        manager = ClipboardManager(self.binary)
+        received = []
+        done = threading.Event()
+
+        def on_event(event):
+            received.append(event.entry_id)
+            if len(received) == 2:
+                done.set()
+
+        manager.subscribe(on_event)
+        manager.is_running = lambda: False  # Ignore other monitors
+        self.assertTrue(manager.start())
+        self.assertTrue(done.wait(timeout=10))
+        manager.process.wait(timeout=10)
+        manager.events.join(timeout=5)
+
+        self.assertEqual(received, ["000001_2025-09-28_10-30-45-000",
+                                    "000002_2025-09-28_10-30-45-000"])
+        self.assertEqual(manager.log[-1], "log line")
+        manager.process = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for image metadata extraction and the thumbnail cache
+"""
+
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from clipsage.core.images import (
+    ImageStage, ThumbnailCache, analyze_image, png_size
+)
+
+
+def write_png(path, size=(640, 480)):
+    image = Image.new("RGB", size)
+    image.putdata([(x % 256, y % 256, 0)
+                   for y in range(size[1]) for x in range(size[0])])
+    image.save(path, format="PNG")
+    return path
+
+
+class TestImages(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.thumbnails = ThumbnailCache(self.temp_dir / "thumbs", size=64)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_png_size_reads_the_header(self):
+        path = write_png(self.temp_dir / "a.png", (300, 200))
+        self.assertEqual(png_size(path), (300, 200))
+        self.assertEqual(png_size(path.read_bytes()), (300, 200))
+        self.assertIsNone(png_size(b"not a png"))
+        self.assertIsNone(png_size(self.temp_dir / "missing.png"))
+
+    def test_thumbnail_is_cached_by_mtime(self):
+        path = write_png(self.temp_dir / "a.png")
+        stage = ImageStage(self.thumbnails, workers=1)
+        mtime = path.stat().st_mtime_ns
+
+        job = stage.job(path.name, str(path), mtime, want_hash=True)
+        info = stage.analyze([job])[path.name]
+        self.assertEqual((info.width, info.height), (640, 480))
+        self.assertEqual(Path(info.thumbnail),
+                         self.thumbnails.get(path.name, mtime))
+        with Image.open(info.thumbnail) as thumb:
+            self.assertEqual(max(thumb.size), 64)
+
+        # A cached thumbnail gives the same answer without a decode
+        self.assertEqual(analyze_image(job, 64), info)
+        self.assertIsNone(self.thumbnails.get(path.name, mtime + 1))
+
+    def test_packed_images_are_read_from_bytes(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (32, 16)).save(buffer, format="PNG")
+        stage = ImageStage(None, workers=1)
+        job = stage.job("b.png", buffer.getvalue(), 0, want_hash=False)
+        info = stage.analyze([job])["b.png"]
+        self.assertEqual((info.width, info.height, info.thumbnail),
+                         (32, 16, None))
+
+    def test_process_pool(self):
+        paths = [write_png(self.temp_dir / f"{n}.png", (64 + n, 48))
+                 for n in range(4)]
+        stage = ImageStage(self.thumbnails, workers=2, parallel_threshold=2)
+        try:
+            results = stage.analyze(
+                stage.job(path.name, str(path), path.stat().st_mtime_ns,
+                          want_hash=True)
+                for path in paths
+            )
+        finally:
+            stage.close()
+        self.assertEqual([results[path.name].width for path in paths],
+                         [64, 65, 66, 67])
+        self.assertTrue(all(Path(results[path.name].thumbnail).exists()
+                            for path in paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
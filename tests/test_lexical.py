@@ -0,0 +1,62 @@
+"""
+Test the BM25 lexical index
+"""
+
+import unittest
+
+from clipsage.core.lexical import (
+    BM25Index, reciprocal_rank_fusion, tokenize
+)
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_compound_tokens(self):
+        """Hostnames and error codes are kept whole and split into parts"""
+        tokens = tokenize("Ping db-01.prod.local failed: ERR_CONN_RESET")
+        for token in ("db-01.prod.local", "db", "01", "prod", "local",
+                      "err_conn_reset", "conn", "failed"):
+            self.assertIn(token, tokens)
+
+    def test_hashes(self):
+        """Hex digests survive as single terms"""
+        self.assertEqual(tokenize("commit 9F3a1C0"), ["commit", "9f3a1c0"])
+
+
+class TestBM25Index(unittest.TestCase):
+
+    def setUp(self):
+        """Index a few clipboard-like documents"""
+        self.index = BM25Index()
+        self.index.add("a", "curl https://api.example.com/v1/users")
+        self.index.add("b", "Traceback: ERR_CONN_RESET while connecting")
+        self.index.add("c", "meeting notes about the users api redesign")
+
+    def test_exact_token_ranks_first(self):
+        """A rare exact token wins"""
+        hits = self.index.search("ERR_CONN_RESET")
+        self.assertEqual(hits[0][0], "b")
+        self.assertEqual(len(hits), 1)
+
+    def test_partial_tokens(self):
+        """Parts of compound tokens match too"""
+        ids = [doc_id for doc_id, _ in self.index.search("users api")]
+        self.assertEqual(sorted(ids), ["a", "c"])
+
+    def test_update_and_remove(self):
+        """Re-adding replaces a document and removal forgets it"""
+        self.index.add("b", "nothing to see here")
+        self.assertEqual(self.index.search("ERR_CONN_RESET"), [])
+        self.index.remove("a")
+        self.assertEqual([d for d, _ in self.index.search("example")], [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_reciprocal_rank_fusion(self):
+        """Items ranked well by both lists come first"""
+        fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "x", "w"]])
+        self.assertEqual({doc_id for doc_id, _ in fused[:2]}, {"x", "y"})
+        self.assertEqual(fused[-1][0], "w")
+
+
+if __name__ == '__main__':
+    unittest.main()
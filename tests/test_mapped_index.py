@@ -0,0 +1,147 @@
+"""
+Test the memory-mapped vector index
+"""
+
+import unittest
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from clipsage.core.config import config
+from clipsage.core.mapped_index import MappedVectorIndex, index_path_for
+
+
+class TestMappedVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Create an index file with three vectors"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "index" / "model.vec"
+        self.index = self.open()
+        self.index.add(["a", "b", "c"],
+                       [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+                       hashes=["ha", "hb", "hc"])
+
+    def open(self, model_name="model"):
+        """Open the index file"""
+        return MappedVectorIndex(self.path, model_name)
+
+    def reopen(self, model_name="model"):
+        """Close and reopen the index file"""
+        self.index.close()
+        self.index = self.open(model_name)
+        return self.index
+
+    def test_roundtrip(self):
+        """Vectors, ids and hashes survive a reopen"""
+        index = self.reopen()
+        self.assertIsInstance(index._matrix, np.memmap)
+        self.assertEqual(sorted(index.ids), ["a", "b", "c"])
+        self.assertEqual(index.content_hash("b"), "hb")
+        self.assertEqual(index.search([0.0, 1.0], k=1)[0][0], "b")
+
+    def test_removals_and_replacements_persist(self):
+        """Journalled deletions and replacements are replayed"""
+        self.index.compact_ratio = 1.0  # Keep the tombstones around
+        self.index.remove(["a"])
+        self.index.add(["b"], [[1.0, 0.0]], hashes=["hb2"])
+        index = self.reopen()
+
+        self.assertEqual(sorted(index.ids), ["b", "c"])
+        self.assertEqual(index.content_hash("b"), "hb2")
+        self.assertEqual(index.search([1.0, 0.0], k=1)[0][0], "b")
+
+    def test_compaction(self):
+        """Compaction drops tombstones and bumps the generation"""
+        self.index.compact_ratio = 1.0
+        self.index.remove(["a", "b"])
+        self.index.compact()
+        size = self.path.stat().st_size
+        index = self.reopen()
+
+        self.assertEqual(index.ids, ["c"])
+        self.assertEqual(size, 256 + 2 * 4)
+        self.assertEqual(index._generation, 1)
+
+    def test_unreferenced_rows_are_ignored(self):
+        """Rows written without a journal entry stay invisible"""
+        self.index.close()
+        with open(self.path.with_suffix(".ids"), "a") as f:
+            f.write("+\t9\tghost")  # Torn, unterminated line
+        index = self.reopen()
+        self.assertNotIn("ghost", index)
+        index.add(["d"], [[0.5, 0.5]])
+        self.assertEqual(len(self.reopen()), 4)
+
+    def test_other_model_discards_index(self):
+        """An index built by another embedding model is not reused"""
+        index = self.reopen(model_name="other-model")
+        self.assertEqual(len(index), 0)
+        self.assertFalse(self.path.exists())
+
+    def test_generation_mismatch_discards_index(self):
+        """A half-finished compaction is detected on open"""
+        self.index.close()
+        ids_path = self.path.with_suffix(".ids")
+        lines = ids_path.read_text().splitlines(keepends=True)
+        ids_path.write_text("CLIPSIDS 7\n" + "".join(lines[1:]))
+        self.assertEqual(len(self.reopen()), 0)
+
+    def test_two_writers_share_the_files(self):
+        """Instances on one path see each other's appends and removals"""
+        other = self.open()
+        try:
+            self.index.add(["a1"], [[1.0, 0.2]])
+            other.add(["b1"], [[0.2, 1.0]])
+            other.remove(["c"])
+            self.index.add(["a2"], [[-1.0, 0.0]])
+
+            index = self.reopen()
+            self.assertEqual(sorted(index.ids), ["a", "a1", "a2", "b", "b1"])
+            self.assertEqual(index.search([1.0, 0.2], k=1)[0][0], "a1")
+            self.assertEqual(index.search([0.2, 1.0], k=1)[0][0], "b1")
+            self.assertEqual(index.search([-1.0, 0.0], k=1)[0][0], "a2")
+        finally:
+            other.close()
+
+    def test_compaction_by_another_writer(self):
+        """A writer reloads the files another instance compacted"""
+        other = self.open()
+        try:
+            other.compact_ratio = 1.0
+            other.remove(["a"])
+            other.compact()
+            self.index.add(["d"], [[0.0, -1.0]])
+
+            self.assertEqual(self.index._generation, 1)
+            index = self.reopen()
+            self.assertEqual(sorted(index.ids), ["b", "c", "d"])
+            self.assertEqual(index.search([0.0, -1.0], k=1)[0][0], "d")
+            self.assertEqual(index.search([1.0, 1.0], k=1)[0][0], "c")
+        finally:
+            other.close()
+
+    def test_index_path_per_clipboard_directory(self):
+        """Histories in different directories never share an index"""
+        self.addCleanup(config.set, "cache_path", config.get("cache_path"))
+        config.set("cache_path", str(self.temp_dir / "cache"))
+        first = index_path_for("all-minilm:22m", self.temp_dir / "clips")
+        other = index_path_for("all-minilm:22m", self.temp_dir / "other")
+
+        self.assertNotEqual(first, other)
+        self.assertEqual(first.name, "all-minilm_22m.vec")
+        self.assertEqual(
+            first, index_path_for("all-minilm:22m",
+                                  self.temp_dir / "clips" / ".." / "clips")
+        )
+
+    def tearDown(self):
+        """Clean up test environment"""
+        import shutil
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
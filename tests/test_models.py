@@ -0,0 +1,98 @@
+"""
+Tests for the clipboard item list model
+"""
+
+import unittest
+
+from PyQt6.QtCore import QCoreApplication
+
+from clipsage.gui.models import ClipboardItemModel, ItemRole
+
+
+def make_item(key, content=None):
+    return {
+        "content": content or f"Text: {key}",
+        "metadata": {"entry_id": key},
+        "preview": content or key,
+        "type": "text",
+        "timestamp": key,
+        "files": {},
+    }
+
+
+class TestClipboardItemModel(unittest.TestCase):
+    """Incremental updates of ClipboardItemModel"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.model = ClipboardItemModel()
+        self.model.set_items([make_item(key) for key in "cba"])
+        self.events = []
+        self.model.rowsInserted.connect(
+            lambda parent, first, last: self.events.append(("+", first, last))
+        )
+        self.model.rowsRemoved.connect(
+            lambda parent, first, last: self.events.append(("-", first, last))
+        )
+        self.model.dataChanged.connect(
+            lambda first, last: self.events.append(("~", first.row()))
+        )
+        self.model.modelReset.connect(lambda: self.events.append("reset"))
+
+    def keys(self):
+        return [self.model.item(row)["metadata"]["entry_id"]
+                for row in range(self.model.rowCount())]
+
+    def test_new_items_are_inserted(self):
+        self.model.set_items([make_item(key) for key in "edcba"])
+
+        self.assertEqual(self.keys(), list("edcba"))
+        self.assertEqual(self.events, [("+", 0, 1)])
+
+    def test_missing_items_are_removed(self):
+        self.model.set_items([make_item(key) for key in "ca"])
+
+        self.assertEqual(self.keys(), ["c", "a"])
+        self.assertEqual(self.events, [("-", 1, 1)])
+
+    def test_changed_items_are_repainted(self):
+        self.model.set_items([make_item("c"), make_item("b", "edited"),
+                              make_item("a")])
+
+        self.assertEqual(self.events, [("~", 1)])
+        index = self.model.index(1)
+        self.assertEqual(index.data(ItemRole)["preview"], "edited")
+
+    def test_pages_load_on_demand(self):
+        keys = [f"{n:03d}" for n in range(25)]
+        pager = lambda offset, limit: [make_item(key)
+                                       for key in keys[offset:offset + limit]]
+        model = ClipboardItemModel()
+        model.show_pages(pager, page_size=10)
+        self.assertEqual(model.rowCount(), 10)
+
+        while model.canFetchMore():
+            model.fetchMore()
+        self.assertEqual(model.rowCount(), 25)
+
+        # Reloading keeps as many rows as were loaded
+        keys.insert(0, "new")
+        model.show_pages(pager, page_size=10)
+        self.assertEqual(model.rowCount(), 25)
+        self.assertEqual(model.item(0)["metadata"]["entry_id"], "new")
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual(model.rowCount(), 26)
+
+    def test_reordered_items_reset_the_model(self):
+        self.model.set_items([make_item(key) for key in "abc"])
+
+        self.assertEqual(self.keys(), list("abc"))
+        self.assertEqual(self.events, ["reset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests for the clipboard retention policy
+"""
+
+import gzip
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from clipsage.core.catalog import CatalogEntry, ClipCatalog, parse_entry_time
+from clipsage.core.cold_storage import ColdStorage
+from clipsage.core.retention import (
+    RetentionManager, RetentionPolicy, select_evictions
+)
+
+
+def make_entry(counter, day, clipboard_path=None, size=10):
+    entry_id = f"{counter:06d}_2025-09-{day:02d}_10-30-00"
+    text_path = None
+    if clipboard_path is not None:
+        path = clipboard_path / f"clip_{entry_id}_text.txt"
+        path.write_text("x" * size)
+        text_path = str(path)
+    return CatalogEntry(
+        entry_id=entry_id,
+        counter=counter,
+        created=parse_entry_time(entry_id),
+        type="text",
+        preview=f"entry {counter}",
+        text_bytes=size,
+        text_path=text_path
+    )
+
+
+def newest_first(entries):
+    return sorted(entries, key=lambda entry: entry.created, reverse=True)
+
+
+class TestSelectEvictions(unittest.TestCase):
+    """Choice of entries that fall outside the budgets"""
+
+    def setUp(self):
+        self.entries = newest_first(make_entry(n, n) for n in range(1, 11))
+
+    def evicted(self, policy, now=None):
+        return [entry.counter for entry in
+                select_evictions(self.entries, policy, now)]
+
+    def test_no_budget_keeps_everything(self):
+        self.assertEqual(self.evicted(RetentionPolicy()), [])
+
+    def test_count_budget(self):
+        self.assertEqual(self.evicted(RetentionPolicy(max_items=7)),
+                         [3, 2, 1])
+
+    def test_byte_budget(self):
+        self.assertEqual(self.evicted(RetentionPolicy(max_bytes=85)),
+                         [2, 1])
+
+    def test_entry_over_byte_budget(self):
+        self.entries.insert(0, make_entry(11, 11, size=1000))
+        self.entries.insert(3, make_entry(12, 8, size=500))
+        self.assertEqual(self.evicted(RetentionPolicy(max_bytes=85)),
+                         [2, 1])
+        # They still count as items
+        self.assertEqual(
+            self.evicted(RetentionPolicy(max_items=9, max_bytes=85)),
+            [3, 2, 1]
+        )
+
+    def test_age_budget(self):
+        now = datetime(2025, 9, 10, 12, 0, 0)
+        self.assertEqual(self.evicted(RetentionPolicy(max_age_days=3), now),
+                         [7, 6, 5, 4, 3, 2, 1])
+
+
+class TestRetentionManager(unittest.TestCase):
+    """Eviction of files and catalog rows"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.clipboard_path = self.temp_dir / "clipboard_manager"
+        self.clipboard_path.mkdir()
+        self.catalog = ClipCatalog(self.temp_dir / "catalog.sqlite3",
+                                   self.clipboard_path)
+        self.catalog.upsert_many(make_entry(n, n, self.clipboard_path)
+                                 for n in range(1, 6))
+        self.notified = []
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.temp_dir)
+
+    def manager(self, **policy):
+        return RetentionManager(
+            self.catalog, RetentionPolicy(max_items=3, **policy),
+            archive_path=self.temp_dir / "archive",
+            on_evicted=self.notified.append
+        )
+
+    def test_archive(self):
+        evicted = self.manager().enforce()
+
+        self.assertEqual(sorted(evicted), ["000001_2025-09-01_10-30-00",
+                                           "000002_2025-09-02_10-30-00"])
+        self.assertEqual(self.notified, [set(evicted)])
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(len(list(self.clipboard_path.iterdir())), 3)
+        archived = (self.temp_dir / "archive" /
+                    "clip_000001_2025-09-01_10-30-00_text.txt.gz")
+        with gzip.open(archived, "rt") as f:
+            self.assertEqual(f.read(), "x" * 10)
+
+        # Nothing left to do once the budget is met
+        self.assertEqual(self.manager().enforce(), [])
+        self.assertEqual(len(self.notified), 1)
+
+    def test_delete(self):
+        self.manager(action="delete").enforce()
+
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(len(list(self.clipboard_path.iterdir())), 3)
+        self.assertFalse((self.temp_dir / "archive").exists())
+
+    def test_old_entries_move_to_cold_storage(self):
+        storage = ColdStorage(self.temp_dir / "cold", codec="gzip")
+        manager = RetentionManager(
+            self.catalog, RetentionPolicy(max_items=4),
+            archive_path=self.temp_dir / "archive",
+            cold_storage=storage, cold_after_days=30
+        )
+        try:
+            manager.enforce()
+
+            # Kept entries are packed, not evicted
+            self.assertEqual(len(self.catalog), 4)
+            self.assertEqual(len(storage), 4)
+            self.assertEqual(list(self.clipboard_path.iterdir()), [])
+
+            # Evicting a packed entry archives it from storage
+            manager.policy.max_items = 3
+            manager.enforce()
+            self.assertEqual(len(storage), 3)
+            self.assertTrue((self.temp_dir / "archive" /
+                             "clip_000002_2025-09-02_10-30-00_text.txt.gz"
+                             ).exists())
+        finally:
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,13 +2,34 @@
 Test the semantic search functionality
 """
 
+import os
 import unittest
 import tempfile
 from pathlib import Path
 
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from PIL import Image
+
+from clipsage.core.catalog import ClipCatalog
+from clipsage.core.chunking import TextChunker
+from clipsage.core.cold_storage import ColdStorage
+from clipsage.core.config import config
+from clipsage.core.dedup import group_id
+from clipsage.core.embedding_cache import EmbeddingCache
+from clipsage.core.images import ImageStage, ThumbnailCache
+from clipsage.core.mapped_index import MappedVectorIndex
 from clipsage.core.semantic_search import ClipboardSemanticSearch
 
 
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that remember how many texts were embedded"""
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
 class TestSemanticSearch(unittest.TestCase):
     
     def setUp(self):
@@ -20,6 +41,10 @@ class TestSemanticSearch(unittest.TestCase):
         # Create some test clipboard files
         self.create_test_files()
         
+        # Keep the default stores away from the real cache
+        self.addCleanup(config.set, "cache_path", config.get("cache_path"))
+        config.set("cache_path", str(self.temp_dir / "cache"))
+        
         # Initialize semantic search with test directory
         self.search = ClipboardSemanticSearch(
             clipboard_path=self.clipboard_path
@@ -76,5 +101,388 @@ class TestSemanticSearch(unittest.TestCase):
         shutil.rmtree(self.temp_dir)
 
 
+
+class TestIncrementalRefresh(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a clipboard directory with two entries"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.clipboard_path = self.temp_dir / "clipboard_manager"
+        self.clipboard_path.mkdir(parents=True)
+        self.write_clip(1, "First clip about databases")
+        self.write_clip(2, "Second clip about networking")
+
+        self.embeddings = CountingEmbeddings(size=16)
+        self.cache = EmbeddingCache(self.temp_dir / "embeddings.sqlite3")
+        self.search = self.open_search(self.embeddings)
+
+    def open_search(self, embeddings, load_data=True):
+        """Create a search instance over the temporary directory"""
+        return ClipboardSemanticSearch(
+            clipboard_path=self.clipboard_path,
+            embeddings=embeddings,
+            embedding_cache=self.cache,
+            vector_index=MappedVectorIndex(
+                self.temp_dir / "index" / "test.vec", "test"
+            ),
+            catalog=ClipCatalog(self.temp_dir / "catalog.sqlite3",
+                                self.clipboard_path),
+            cold_storage=ColdStorage(self.temp_dir / "cold"),
+            images=ImageStage(ThumbnailCache(self.temp_dir / "thumbs")),
+            load_data=load_data
+        )
+
+    def write_clip(self, counter, text):
+        """Write a text clip and return its path"""
+        path = (self.clipboard_path /
+                f"clip_{counter:06d}_2025-09-28_10-30-{counter:02d}_text.txt")
+        path.write_text(text)
+        return path
+
+    def group_of(self, doc_id):
+        """Index id of the duplicate group holding a document"""
+        return group_id(self.search.entries[doc_id].fingerprint)
+
+    def test_unchanged_refresh_is_empty(self):
+        """Refreshing without changes does not re-embed anything"""
+        self.assertEqual(self.embeddings.embedded, 2)
+        diff = self.search.refresh_data()
+        self.assertFalse(diff)
+        self.assertEqual(self.embeddings.embedded, 2)
+        self.assertEqual(len(self.search.vector_index), 2)
+
+    def test_added_updated_removed(self):
+        """Only new and changed entries are embedded, deleted ones dropped"""
+        self.write_clip(3, "Third clip about compilers")
+        updated = self.write_clip(2, "Second clip, now about routing tables")
+        stat = updated.stat()
+        os.utime(updated, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (self.clipboard_path /
+         "clip_000001_2025-09-28_10-30-01_text.txt").unlink()
+
+        diff = self.search.refresh_data()
+
+        self.assertEqual(diff.added, ["000003_2025-09-28_10-30-03"])
+        self.assertEqual(diff.updated, ["000002_2025-09-28_10-30-02"])
+        self.assertEqual(diff.removed, ["000001_2025-09-28_10-30-01"])
+        self.assertEqual(self.embeddings.embedded, 4)
+        self.assertEqual(len(self.search.vector_index), 2)
+        contents = [item["content"] for item in self.search.get_all_items()]
+        self.assertIn("Text: Second clip, now about routing tables",
+                      contents)
+
+    def test_refresh_given_entry_keys(self):
+        """A partial refresh only looks at the entries it is given"""
+        self.write_clip(3, "Third clip about compilers")
+        (self.clipboard_path /
+         "clip_000001_2025-09-28_10-30-01_text.txt").unlink()
+
+        diff = self.search.refresh_data(
+            entry_keys=["000003_2025-09-28_10-30-03"]
+        )
+        self.assertEqual(diff.added, ["000003_2025-09-28_10-30-03"])
+        self.assertEqual(diff.removed, [])
+
+        diff = self.search.refresh_data(
+            entry_keys=["000001_2025-09-28_10-30-01"]
+        )
+        self.assertEqual(diff.removed, ["000001_2025-09-28_10-30-01"])
+        self.assertEqual(len(self.search.get_all_items()), 2)
+
+    def test_iter_items(self):
+        """Items stream newest first, filtered and without content"""
+        self.write_clip(3, "Third clip about compilers")
+        self.search.refresh_data()
+
+        items = list(self.search.iter_items())
+        self.assertEqual([item["metadata"]["entry_id"] for item in items],
+                         ["000003_2025-09-28_10-30-03",
+                          "000002_2025-09-28_10-30-02",
+                          "000001_2025-09-28_10-30-01"])
+        self.assertNotIn("content", items[0])
+        self.assertEqual(items[0]["preview"], "Third clip about compilers")
+
+        page = list(self.search.iter_items(offset=1, limit=1))
+        self.assertEqual(page[0]["metadata"]["entry_id"],
+                         "000002_2025-09-28_10-30-02")
+        self.assertEqual(
+            len(list(self.search.iter_items(since="2025-09-28 10:30:02"))),
+            2
+        )
+        self.assertEqual(list(self.search.iter_items(types=["image"])), [])
+        self.assertEqual(self.search.count_items(types=["text"]), 3)
+
+    def test_content_is_loaded_on_demand(self):
+        """Results carry previews only; full content is read from disk"""
+        big = "log line about kernels\n" * 60000  # Above the mmap threshold
+        self.write_clip(3, big)
+        self.search.refresh_data()
+
+        entry = self.search.entries["clip_000003_2025-09-28_10-30-03"]
+        self.assertFalse(hasattr(entry, "__dict__"))
+        self.assertEqual(entry.text_bytes, len(big))
+
+        results = self.search.search("kernels", k=1, mode="lexical")
+        self.assertNotIn("content", results[0])
+        content = self.search.load_content("000003_2025-09-28_10-30-03")
+        self.assertEqual(content, f"Text: {big.strip()}")
+        self.assertIsNone(self.search.load_content("missing"))
+
+    def test_long_clips_are_chunked(self):
+        """Long clips are embedded as passages and hits point at one"""
+        self.search.chunker = TextChunker(window=8, overlap=2)
+        words = " ".join(f"filler{n}" for n in range(30))
+        self.write_clip(3, f"{words} quantum entanglement experiment")
+        self.search.refresh_data()
+
+        group = self.group_of("clip_000003_2025-09-28_10-30-03")
+        spans = self.search.chunk_spans[group]
+        self.assertGreater(len(spans), 1)
+        self.assertIn(f"{group}#0", self.search.vector_index)
+        self.assertNotIn(group, self.search.vector_index)
+
+        content = self.search.load_content("000003_2025-09-28_10-30-03")
+        start, end = spans[-1]
+        results = self.search.search(content[start:end], k=1,
+                                     mode="semantic")
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000003_2025-09-28_10-30-03")
+        self.assertEqual(results[0]["passage"],
+                         {"chunk": len(spans) - 1, "start": start,
+                          "end": end})
+
+        # Removing the entry drops every passage vector
+        (self.clipboard_path /
+         "clip_000003_2025-09-28_10-30-03_text.txt").unlink()
+        self.search.refresh_data()
+        self.assertEqual(len(self.search.vector_index), 2)
+        self.assertNotIn(group, self.search.chunk_spans)
+
+    def test_duplicates_are_indexed_once(self):
+        """Identical clips share one vector and come back as one result"""
+        self.write_clip(3, "Second clip  about\nnetworking")
+        self.search.refresh_data()
+
+        self.assertEqual(self.embeddings.embedded, 2)
+        self.assertEqual(len(self.search.vector_index), 2)
+        self.assertEqual(self.search.count_items(), 3)
+
+        results = self.search.search("networking", k=5, mode="lexical")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000003_2025-09-28_10-30-03")
+        self.assertEqual(results[0]["duplicates"],
+                         ["000002_2025-09-28_10-30-02"])
+        self.assertEqual(len(results[0]["timestamps"]), 2)
+
+        # The group outlives the entry it was first indexed from
+        (self.clipboard_path /
+         "clip_000002_2025-09-28_10-30-02_text.txt").unlink()
+        self.search.refresh_data()
+        results = self.search.search("networking", k=5, mode="semantic")
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000003_2025-09-28_10-30-03")
+        self.assertNotIn("duplicates", results[0])
+        self.assertEqual(self.embeddings.embedded, 2)
+
+    def test_updates_without_deduplication(self):
+        """Edited entries are re-indexed when groups are keyed by entry"""
+        self.addCleanup(config.set, "dedup.enabled",
+                        config.get("dedup.enabled", True))
+        config.set("dedup.enabled", False)
+        self.search.cleanup()
+        self.cache = EmbeddingCache(self.temp_dir / "undeduplicated.sqlite3")
+        self.search = self.open_search(self.embeddings)
+        self.search.chunker = TextChunker(window=8, overlap=2)
+        words = " ".join(f"filler{n}" for n in range(30))
+        long_clip = self.write_clip(1, f"{words} databases")
+        self.write_clip(2, "Second clip about firewalls")
+        for path in self.clipboard_path.iterdir():
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        doc_id = "clip_000002_2025-09-28_10-30-02"
+        before = self.search.vector_index.content_hash(doc_id)
+        self.search.refresh_data()
+
+        self.assertEqual(self.search.search("networking", mode="lexical"),
+                         [])
+        results = self.search.search("firewalls", mode="lexical")
+        self.assertEqual(results[0]["metadata"]["entry_id"], doc_id[5:])
+        self.assertNotIn(self.search.vector_index.content_hash(doc_id),
+                         (None, before))
+        self.assertGreater(len(self.search.chunk_spans), 0)
+
+        # A long clip edited down to one passage loses its passage vectors
+        long_clip.write_text("Short again")
+        stat = long_clip.stat()
+        os.utime(long_clip,
+                 ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.search.refresh_data()
+        self.assertEqual(sorted(self.search.vector_index.ids),
+                         ["clip_000001_2025-09-28_10-30-01", doc_id])
+        self.assertEqual(self.search.chunk_spans, {})
+
+    def test_cold_storage_is_read_transparently(self):
+        """Packed entries stay listed, searchable and readable"""
+        entry_id = "000001_2025-09-28_10-30-01"
+        packed = self.search.cold_storage.pack(
+            [self.search.catalog.get(entry_id)]
+        )
+        self.assertEqual(packed, [entry_id])
+        self.assertFalse(
+            (self.clipboard_path / f"clip_{entry_id}_text.txt").exists()
+        )
+
+        # Same signatures as the files they replaced: nothing changed
+        self.assertFalse(self.search.refresh_data(entry_keys=[entry_id]))
+        self.assertFalse(self.search.refresh_data())
+        self.assertEqual(self.embeddings.embedded, 2)
+
+        self.assertEqual(self.search.get_item_content(entry_id)["content"],
+                         "Text: First clip about databases")
+        results = self.search.search("databases", k=1, mode="lexical")
+        self.assertEqual(results[0]["metadata"]["entry_id"], entry_id)
+
+        # A restart rebuilds the entry from storage
+        self.search.cleanup()
+        self.cache = EmbeddingCache(self.temp_dir / "embeddings.sqlite3")
+        self.search = self.open_search(CountingEmbeddings(size=16))
+        self.assertEqual(self.search.count_items(), 2)
+        self.assertEqual(self.search.load_content(entry_id),
+                         "Text: First clip about databases")
+
+    def test_images_get_cached_thumbnails(self):
+        """Image clips are sized from the header and thumbnailed once"""
+        path = (self.clipboard_path /
+                "clip_000003_2025-09-28_10-30-03_image.png")
+        Image.new("RGB", (800, 600), "red").save(path)
+        self.search.refresh_data()
+
+        item = next(self.search.iter_items(types=["image"]))
+        self.assertEqual(item["preview"], "Image (800x600)")
+        thumbnail = self.search.thumbnail(path)
+        self.assertIsNotNone(thumbnail)
+        self.assertEqual(list((self.temp_dir / "thumbs").iterdir()),
+                         [thumbnail])
+        self.assertEqual(self.search.load_content(item["metadata"]
+                                                  ["entry_id"]),
+                         f"Image: 800x600 pixels from {path.name}")
+
+    def test_force_refresh(self):
+        """A forced refresh re-processes every entry from the cache"""
+        diff = self.search.refresh_data(force=True)
+        self.assertEqual(len(diff.updated), 2)
+        self.assertEqual(self.embeddings.embedded, 2)
+        self.assertEqual(len(self.search.vector_index), 2)
+
+    def test_search_ranks_by_similarity(self):
+        """The vector index returns the closest entry first"""
+        results = self.search.search("Text: Second clip about networking",
+                                     k=2, mode="semantic")
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000002_2025-09-28_10-30-02")
+        self.assertAlmostEqual(results[0]["score"], 1.0, places=5)
+
+    def test_lexical_mode_skips_embeddings(self):
+        """Lexical search answers without embedding the query"""
+        calls = []
+        self.search.embed.embed_query = calls.append
+        results = self.search.search("networking", k=5, mode="lexical")
+        self.assertEqual([r["metadata"]["entry_id"] for r in results],
+                         ["000002_2025-09-28_10-30-02"])
+        self.assertEqual(calls, [])
+
+    def test_hybrid_mode(self):
+        """Hybrid search fuses lexical and semantic rankings"""
+        results = self.search.search("Text: Second clip about networking",
+                                     k=2, mode="hybrid")
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000002_2025-09-28_10-30-02")
+
+    def test_query_caches(self):
+        """Repeated queries reuse the query vector and cached results"""
+        calls = []
+        embed_query = self.search.embed.embed_query
+        self.search.embed.embed_query = lambda text: (
+            calls.append(text) or embed_query(text)
+        )
+
+        first = self.search.search("routing", mode="semantic")
+        self.assertEqual(self.search.search("routing", mode="semantic"),
+                         first)
+        self.assertEqual(self.search.query_results.hits, 1)
+
+        # An index change invalidates results but not the query vector
+        self.write_clip(3, "Third clip about routing")
+        self.search.refresh_data()
+        results = self.search.search("routing", mode="semantic")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(calls, ["routing"])
+
+    def test_restart_uses_embedding_cache(self):
+        """A new instance over unchanged clips embeds nothing"""
+        embeddings = CountingEmbeddings(size=16)
+        self.search.cleanup()
+        self.cache = EmbeddingCache(self.temp_dir / "embeddings.sqlite3")
+        self.search = self.open_search(embeddings)
+        self.assertEqual(embeddings.embedded, 0)
+
+    def test_restart_reuses_persisted_vectors(self):
+        """Vectors are loaded from disk and deleted entries pruned"""
+        self.search.cleanup()
+        (self.clipboard_path /
+         "clip_000001_2025-09-28_10-30-01_text.txt").unlink()
+        self.cache = EmbeddingCache(self.temp_dir / "embeddings.sqlite3")
+        self.search = self.open_search(CountingEmbeddings(size=16))
+
+        self.assertEqual(self.search.vector_index.ids,
+                         [self.group_of("clip_000002_2025-09-28_10-30-02")])
+        results = self.search.search("Text: Second clip about networking",
+                                     mode="semantic")
+        self.assertAlmostEqual(results[0]["score"], 1.0, places=5)
+
+    def test_snapshot_restores_index(self):
+        """A restart from a snapshot only reads entries changed since"""
+        snapshot = self.temp_dir / "snapshot.pickle"
+        self.search.save_snapshot(snapshot)
+        self.search.cleanup()
+        self.write_clip(3, "Third clip about compilers")
+
+        self.cache = EmbeddingCache(self.temp_dir / "embeddings.sqlite3")
+        embeddings = CountingEmbeddings(size=16)
+        self.search = self.open_search(embeddings, load_data=False)
+        self.assertTrue(self.search.load_snapshot(snapshot))
+        diff = self.search.refresh_data()
+
+        self.assertEqual(diff.added, ["000003_2025-09-28_10-30-03"])
+        self.assertEqual(embeddings.embedded, 1)
+        results = self.search.search("databases", mode="lexical")
+        self.assertEqual(results[0]["metadata"]["entry_id"],
+                         "000001_2025-09-28_10-30-01")
+
+    def test_refresh_without_embedding(self):
+        """New entries are lexically searchable before they are embedded"""
+        self.write_clip(3, "Third clip about compilers")
+
+        self.search.refresh_data(embed=False)
+        self.assertEqual(self.embeddings.embedded, 2)
+        results = self.search.search("compilers", mode="lexical")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(self.search.unembedded), 1)
+
+        # The next refresh that may embed catches up
+        self.search.refresh_data()
+        self.assertEqual(self.embeddings.embedded, 3)
+        self.assertEqual(self.search.unembedded, set())
+        self.assertEqual(len(self.search.vector_index), 3)
+
+    def tearDown(self):
+        """Clean up test environment"""
+        import shutil
+        self.search.cleanup()
+        shutil.rmtree(self.temp_dir)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Tests for the import cost of the package
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+CHECK_IMPORTS = """
+import json, sys
+import clipsage
+import clipsage.core
+import clipsage.core.semantic_search as semantic_search
+print(json.dumps({
+    "modules": sorted(name for name in sys.modules
+                      if name.split(".")[0] in
+                      ("langchain_core", "langchain_ollama", "ollama",
+                       "PyQt6")),
+    "built": semantic_search._clipboard_search is not None,
+}))
+"""
+
+CHECK_WINDOW = """
+import json, sys, time
+from pathlib import Path
+from PyQt6.QtWidgets import QApplication
+from clipsage.core.config import config
+from clipsage.gui.main_window import ClipboardManagerUI
+
+HEAVY = ("langchain_core", "numpy", "PIL")
+
+
+def loaded():
+    return sorted(name for name in HEAVY if name in sys.modules)
+
+
+config.set("clipboard_path", str(Path.home() / "clips"))
+config.set("embeddings.backend", "hashing")
+app = QApplication([])
+window = ClipboardManagerUI()
+window.show()
+shown = loaded()
+finished = []
+window.search_service.refreshFinished.connect(finished.append)
+deadline = time.monotonic() + 30
+while not finished and time.monotonic() < deadline:
+    app.processEvents()
+    time.sleep(0.01)
+ready = window.clipboard_search is not None
+window.close()
+
+from clipsage.core.semantic_search import ClipboardSemanticSearch
+restored = ClipboardSemanticSearch(load_data=False).load_snapshot()
+print(json.dumps({"shown": shown, "loaded": loaded(), "ready": ready,
+                  "watching": window.watcher is not None,
+                  "restored": restored}))
+"""
+
+
+class TestLazyImports(unittest.TestCase):
+    """Importing the package must not pull in the heavy dependencies"""
+
+    def run_python(self, code, **environ):
+        with tempfile.TemporaryDirectory() as home:
+            env = dict(os.environ, HOME=home,
+                       PYTHONPATH=str(PROJECT_ROOT), **environ)
+            result = subprocess.run([sys.executable, "-c", code],
+                                    capture_output=True, text=True,
+                                    env=env, cwd=str(PROJECT_ROOT),
+                                    timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_import_is_cheap(self):
+        report = self.run_python(CHECK_IMPORTS)
+
+        self.assertEqual(report["modules"], [])
+        self.assertFalse(report["built"])
+
+    def test_window_shows_before_search_engine(self):
+        report = self.run_python(CHECK_WINDOW, QT_QPA_PLATFORM="offscreen")
+
+        self.assertEqual(report["shown"], [])
+        # Loaded by the warm-up on the worker pool
+        self.assertIn("numpy", report["loaded"])
+        self.assertNotIn("langchain_core", report["loaded"])
+        self.assertTrue(report["ready"])
+        self.assertTrue(report["watching"])
+        # Saved on close for the next start
+        self.assertTrue(report["restored"])
+
+    def test_lazy_names_resolve(self):
+        report = self.run_python("""
+import json
+from clipsage import ClipboardSemanticSearch
+from clipsage.core import RetentionPolicy
+print(json.dumps({"names": [ClipboardSemanticSearch.__name__,
+                            RetentionPolicy.__name__]}))
+""")
+
+        self.assertEqual(report["names"],
+                         ["ClipboardSemanticSearch", "RetentionPolicy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
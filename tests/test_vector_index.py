@@ -0,0 +1,56 @@
+"""
+Test the NumPy vector index
+"""
+
+import unittest
+
+import numpy as np
+
+from clipsage.core.vector_index import VectorIndex
+
+
+class TestVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Create an index with three orthogonal-ish vectors"""
+        self.index = VectorIndex(initial_capacity=2)
+        self.index.add(["a", "b", "c"],
+                       [[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 0.0]])
+
+    def test_top_k_order(self):
+        """Results are ordered by cosine similarity"""
+        hits = self.index.search([1.0, 0.1, 0.0], k=2)
+        self.assertEqual([doc_id for doc_id, _ in hits], ["a", "c"])
+        self.assertAlmostEqual(hits[0][1], 0.995, places=3)
+
+    def test_grows_beyond_initial_capacity(self):
+        """Appending past the capacity keeps earlier rows intact"""
+        ids = [f"v{i}" for i in range(50)]
+        self.index.add(ids, np.eye(50, 3, dtype=np.float32) + 0.01)
+        self.assertEqual(len(self.index), 53)
+        self.assertEqual(self.index.search([0.0, 1.0, 0.0], k=1)[0][0], "b")
+
+    def test_remove_and_compact(self):
+        """Removed vectors are never returned, before or after compaction"""
+        self.index.remove(["a"])
+        self.assertNotIn("a", self.index)
+        self.assertNotIn("a", [d for d, _ in self.index.search([1, 0, 0])])
+
+        self.index.compact()
+        self.assertEqual(sorted(self.index.ids), ["b", "c"])
+        self.assertEqual(self.index.search([1.0, 0.0, 0.0], k=1)[0][0], "c")
+
+    def test_replace_existing_id(self):
+        """Adding an existing id replaces its vector"""
+        self.index.add(["a"], [[0.0, 0.0, 1.0]])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.search([0.0, 0.0, 1.0], k=1)[0][0], "a")
+
+    def test_dimension_mismatch(self):
+        """Vectors of the wrong dimension are rejected"""
+        with self.assertRaises(ValueError):
+            self.index.add(["d"], [[1.0, 0.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the clipboard directory watcher
+"""
+
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from clipsage.core.watcher import ClipboardWatcher
+
+
+class TestClipboardWatcher(unittest.TestCase):
+    """Batching of filesystem events into entry keys"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.batches = []
+        self.received = threading.Event()
+        self.watcher = None
+
+    def tearDown(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def on_change(self, keys):
+        self.batches.append(keys)
+        self.received.set()
+
+    def start(self, **kwargs):
+        self.watcher = ClipboardWatcher(self.temp_dir, self.on_change,
+                                        settle_ms=50, **kwargs)
+        self.watcher.start()
+
+    def write_entry(self, counter):
+        stem = f"clip_{counter:06d}_2025-09-28_10-30-{counter:02d}"
+        (self.temp_dir / f"{stem}_text.txt").write_text("text")
+        (self.temp_dir / f"{stem}_formats.txt").write_text("formats")
+        (self.temp_dir / f"{stem}_image.png").write_bytes(b"png")
+
+    def test_events_are_batched_by_entry(self):
+        """Several files and entries arrive as one batch of keys"""
+        self.start()
+        if self.watcher.backend != "inotify":
+            self.skipTest("inotify not available")
+        self.write_entry(1)
+        self.write_entry(2)
+        (self.temp_dir / "notes.txt").write_text("ignored")
+
+        self.assertTrue(self.received.wait(5))
+        self.assertEqual(self.batches, [{"000001_2025-09-28_10-30-01",
+                                         "000002_2025-09-28_10-30-02"}])
+
+    def test_deletions_are_reported(self):
+        self.write_entry(1)
+        self.start()
+        for path in self.temp_dir.iterdir():
+            path.unlink()
+
+        self.assertTrue(self.received.wait(5))
+        self.assertEqual(self.batches[0], {"000001_2025-09-28_10-30-01"})
+
+    def test_polling_fallback(self):
+        """Without inotify the directory is polled for changes"""
+        self.start(poll_interval=0.05, backend="polling")
+        self.assertEqual(self.watcher.backend, "polling")
+        self.write_entry(3)
+
+        self.assertTrue(self.received.wait(5))
+        self.assertEqual(self.batches[0], {"000003_2025-09-28_10-30-03"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for the background refresh/search service
+"""
+
+import threading
+import time
+import unittest
+
+from PyQt6.QtCore import QCoreApplication
+
+from clipsage.gui.workers import SearchService
+
+
+class SlowEngine:
+    """Search engine stand-in whose refreshes block until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.refreshes = 0
+        self.searches = []
+
+    def refresh_data(self, force=False, progress=None, entry_keys=None):
+        self.release.wait(5)
+        self.refreshes += 1
+        return self.refreshes
+
+    def search(self, query, k=5, mode=None):
+        time.sleep(0.05)
+        self.searches.append(query)
+        return [query]
+
+
+class TestSearchService(unittest.TestCase):
+    """Coalescing and result delivery of SearchService"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.engine = SlowEngine()
+        self.service = SearchService(self.engine)
+
+    def tearDown(self):
+        self.engine.release.set()
+        self.service.shutdown()
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.app.processEvents()
+
+    def test_overlapping_refreshes_coalesce(self):
+        finished = []
+        self.service.refreshFinished.connect(finished.append)
+        for _ in range(5):
+            self.service.request_refresh()
+        self.engine.release.set()
+        self.wait_for(lambda: not self.service.refreshing)
+
+        # One running refresh plus a single follow-up for the other four
+        self.assertEqual(self.engine.refreshes, 2)
+        self.assertEqual(finished, [1, 2])
+
+    def test_only_latest_search_is_delivered(self):
+        delivered = []
+        self.service.searchFinished.connect(
+            lambda seq, query, results: delivered.append(query)
+        )
+        for query in ("a", "ab", "abc"):
+            self.service.request_search(query, k=5)
+        self.wait_for(lambda: delivered)
+        self.service.pool.waitForDone(5000)
+        self.app.processEvents()
+
+        self.assertEqual(delivered, ["abc"])
+
+    def test_cancelled_search_is_dropped(self):
+        delivered = []
+        self.service.searchFinished.connect(
+            lambda seq, query, results: delivered.append(query)
+        )
+        self.service.request_search("query", k=5)
+        self.service.cancel_searches()
+        self.service.pool.waitForDone(5000)
+        self.app.processEvents()
+
+        self.assertEqual(delivered, [])
+
+    def test_start_builds_engine_off_the_gui_thread(self):
+        service = SearchService()
+        self.addCleanup(service.shutdown)
+        built_on = []
+        ready = []
+        finished = []
+        service.engineReady.connect(ready.append)
+        service.refreshFinished.connect(finished.append)
+
+        def factory():
+            built_on.append(threading.current_thread())
+            return self.engine
+
+        service.start(factory)
+        service.request_refresh()  # Queued behind the first refresh
+        self.engine.release.set()
+        self.wait_for(lambda: not service.refreshing)
+
+        self.assertIsNot(built_on[0], threading.main_thread())
+        self.assertEqual(ready, [self.engine])
+        self.assertEqual(finished, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()